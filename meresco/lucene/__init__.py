@@ -43,11 +43,7 @@ if not isfile(sofile) or stat(sofile).st_mtime < lastMtime:
 sysPath.insert(0, libDir)                                                        #DO_NOT_DISTRIBUTE
 
 
-from meresco.pylucene import getJVM
-VM = getJVM()
-from meresco_lucene import initVM
-VMM = initVM()
-
+from _jvm import getJVM, VM, VMM
 from fieldregistry import SORTED_PREFIX, UNTOKENIZED_PREFIX, KEY_PREFIX, NUMERIC_PREFIX, RANGE_DOUBLE_PREFIX
 from _version import version
 from luceneresponse import LuceneResponse
@@ -55,7 +51,10 @@ from _lucene import Lucene
 from lucenesettings import LuceneSettings
 from fields2lucenedoc import Fields2LuceneDoc
 from multilucene import MultiLucene
+from exportkeys import ExportKeys
+from embeddedlucene import EmbeddedLuceneServer, EmbeddedLucene, EmbeddedMultiLucene, EmbeddedLuceneCommit
 from composedquery import ComposedQuery
 from drilldownfield import DrilldownField
 from fieldslisttolucenedocument import FieldsListToLuceneDocument
 from utils import readOpenBitSet
+from keyset import KeySet, readKeySet, readRoaringKeySet
@@ -24,15 +24,17 @@
 
 
 from simplejson import loads
+from zlib import decompress, MAX_WBITS
 
 
 
 class _Connect(object):
-    def __init__(self, host, port, observable, pathPrefix=None):
+    def __init__(self, host, port, observable, pathPrefix=None, compress=False):
         self._host = host
         self._port = port
         self._pathPrefix = pathPrefix or ''
         self._observable = observable
+        self._requestKwargs = dict(headers={'Accept-Encoding': 'gzip'}) if compress else {}
 
     def send(self, path, jsonDict=None, data=None, parse=True):
         post = lambda: self._post(path=self._pathPrefix + path, data=jsonDict.dumps() if jsonDict else data)
@@ -45,6 +47,15 @@ class _Connect(object):
             body = loads(body)
         raise StopIteration(body if body is not None else None)
 
+    def sendIfModified(self, path, etag=None, jsonDict=None, data=None):
+        post = lambda: self._postIfModified(path=self._pathPrefix + path, data=jsonDict.dumps() if jsonDict else data, etag=etag)
+        try:
+            result = yield post()
+        except UninitializedException:
+            yield self._observable.initialize()
+            result = yield post()
+        raise StopIteration(result)
+
     def read(self, path, parse=True):
         get = lambda: self._get(path=self._pathPrefix + path)
         try:
@@ -57,14 +68,34 @@ class _Connect(object):
         raise StopIteration(body if body is not None else None)
 
     def _post(self, path, data):
-        statusAndHeaders, body = yield self._observable.any.httprequest1_1(method='POST', host=self._host, port=self._port, request=path, body=data)
+        statusAndHeaders, body = yield self._observable.any.httprequest1_1(method='POST', host=self._host, port=self._port, request=path, body=data, **self._requestKwargs)
         self._verify20x(statusAndHeaders, body)
-        raise StopIteration(body)
+        raise StopIteration(self._decode(statusAndHeaders, body))
+
+    def _postIfModified(self, path, data, etag):
+        headers = dict(self._requestKwargs.get('headers', {}))
+        if etag:
+            headers['If-None-Match'] = etag
+        statusAndHeaders, body = yield self._observable.any.httprequest1_1(method='POST', host=self._host, port=self._port, request=path, body=data, headers=headers)
+        if statusAndHeaders['StatusCode'] == '304':
+            raise StopIteration((etag, None))
+        self._verify20x(statusAndHeaders, body)
+        raise StopIteration((self._header(statusAndHeaders, 'ETag'), self._decode(statusAndHeaders, body)))
 
     def _get(self, path):
-        statusAndHeaders, body = yield self._observable.any.httprequest1_1(method='GET', host=self._host, port=self._port, request=path)
+        statusAndHeaders, body = yield self._observable.any.httprequest1_1(method='GET', host=self._host, port=self._port, request=path, **self._requestKwargs)
         self._verify20x(statusAndHeaders, body)
-        raise StopIteration(body)
+        raise StopIteration(self._decode(statusAndHeaders, body))
+
+    def _decode(self, statusAndHeaders, body):
+        if self._header(statusAndHeaders, 'Content-Encoding') == 'gzip':
+            return decompress(body, 16 + MAX_WBITS)
+        return body
+
+    def _header(self, statusAndHeaders, name):
+        for key, value in statusAndHeaders.get('Headers', {}).items():
+            if key.lower() == name.lower():
+                return value
 
     def _verify20x(self, statusAndHeaders, body):
         if statusAndHeaders['StatusCode'] == "409":
@@ -0,0 +1,60 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+_vm = None
+_vmm = None
+
+def getJVM():
+    """Starts the JVM (with the meresco_lucene classes) on first use; only
+    the components that use Java classes in this process need it."""
+    global _vm, _vmm
+    if _vm is None:
+        from meresco.pylucene import getJVM as getPyLuceneJVM
+        vm = getPyLuceneJVM()
+        from meresco_lucene import initVM
+        _vmm = initVM()
+        _vm = vm
+    return _vm
+
+def _getMerescoLuceneVM():
+    getJVM()
+    return _vmm
+
+
+class _LazyVM(object):
+    """Stands in for the VM and VMM module attributes that used to start the
+    JVM on import; the JVM is now started on first attribute access."""
+
+    def __init__(self, get):
+        self._get = get
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __repr__(self):
+        return repr(self._get())
+
+VM = _LazyVM(getJVM)
+VMM = _LazyVM(_getMerescoLuceneVM)
@@ -23,6 +23,7 @@
 #
 ## end license ##
 
+from functools import partial
 from urllib import urlencode
 
 from weightless.core import consume
@@ -30,16 +31,16 @@ from weightless.io.utils import asProcess
 from meresco.core import Observable
 from meresco.components.json import JsonList, JsonDict
 from meresco.lucene import LuceneResponse
-from meresco.lucene.hit import Hit
+from meresco.lucene.hit import Hits
 
 from .utils import simplifiedDict
 from _connect import _Connect
 
 
 class Lucene(Observable):
-    def __init__(self, host, port, settings, name, **kwargs):
+    def __init__(self, host, port, settings, name, compress=False, **kwargs):
         Observable.__init__(self, name=name)
-        self._connect = _Connect(host, port, pathPrefix = "/" + name, observable=self)
+        self._connect = _Connect(host, port, pathPrefix = "/" + name, observable=self, compress=compress)
         self.settings = settings
         self._fieldRegistry = settings.fieldRegistry
         self._name = name
@@ -50,7 +51,7 @@ class Lucene(Observable):
     def initialize(self):
         yield self._connect.send(jsonDict=self.settings.asPostDict(), path="/settings/")
 
-    def setSettings(self, numberOfConcurrentTasks=None, similarity=None, clustering=None):
+    def setSettings(self, numberOfConcurrentTasks=None, similarity=None, clustering=None, commitTimeout=None, commitCount=None, refreshInterval=None):
         settingsDict = JsonDict()
         if numberOfConcurrentTasks:
             settingsDict["numberOfConcurrentTasks"] = numberOfConcurrentTasks
@@ -58,6 +59,12 @@ class Lucene(Observable):
             settingsDict["similarity"] = dict(type="BM25Similarity", k1=similarity['k1'], b=similarity['b'])
         if clustering:
             settingsDict["clustering"] = clustering
+        if commitTimeout:
+            settingsDict["commitTimeout"] = commitTimeout
+        if commitCount:
+            settingsDict["commitCount"] = commitCount
+        if refreshInterval is not None:
+            settingsDict["refreshInterval"] = refreshInterval
         if settingsDict:
             yield self._connect.send(jsonDict=settingsDict, path="/settings/")
 
@@ -68,6 +75,16 @@ class Lucene(Observable):
         args = urlencode(dict(identifier=identifier)) if identifier else ''
         yield self._connect.send(jsonDict=JsonList(fields), path='/update/?{}'.format(args))
 
+    def addDocuments(self, batch):
+        lines = []
+        for item in batch:
+            if item.get('delete'):
+                lines.append(JsonDict(identifier=item['identifier'], delete=True).dumps())
+            else:
+                lines.append(JsonDict(identifier=item['identifier'], fields=item['fields']).dumps())
+        result = yield self._connect.send(data='\n'.join(lines), path='/bulkUpdate/')
+        raise StopIteration(result)
+
     def delete(self, identifier):
         yield self._connect.send(path='/delete/?{}'.format(urlencode(dict(identifier=identifier))))
 
@@ -77,7 +94,28 @@ class Lucene(Observable):
             sortKey["missingValue"] = missingValue
         sortKey["type"] = self._fieldRegistry.sortFieldType(sortKey["sortBy"])
 
-    def executeQuery(self, luceneQuery, start=None, stop=None, facets=None, sortKeys=None, suggestionRequest=None, dedupField=None, dedupSortField=None, groupingField=None, clustering=False, **kwargs):
+    def executeQuery(self, luceneQuery, **kwargs):
+        jsonDict, info = self._queryRequest(luceneQuery, **kwargs)
+        responseDict = (yield self._connect.send(jsonDict=jsonDict, path='/query/'))
+        response = luceneResponseFromDict(responseDict)
+        response.info = info
+        raise StopIteration(response)
+        yield
+
+    def executeQueries(self, queries):
+        if not queries:
+            raise StopIteration([])
+        requests = [self._queryRequest(**query) for query in queries]
+        responseDicts = (yield self._connect.send(jsonDict=JsonList([jsonDict for jsonDict, info in requests]), path='/multiQuery/'))
+        responses = []
+        for (jsonDict, info), responseDict in zip(requests, responseDicts):
+            response = luceneResponseFromDict(responseDict)
+            response.info = info
+            responses.append(response)
+        raise StopIteration(responses)
+        yield
+
+    def _queryRequest(self, luceneQuery, start=None, stop=None, facets=None, sortKeys=None, suggestionRequest=None, dedupField=None, dedupSortField=None, groupingField=None, clustering=False, timeAllowed=None, cursor=None, **kwargs):
         stop = 10 if stop is None else stop
         start = 0 if start is None else start
 
@@ -96,21 +134,19 @@ class Lucene(Observable):
         )
         if suggestionRequest:
             jsonDict["suggestionRequest"] = suggestionRequest
-        responseDict = (yield self._connect.send(jsonDict=jsonDict, path='/query/'))
-        response = luceneResponseFromDict(responseDict)
-        response.info = {
-            'type': 'Query',
-            'query': simplifiedDict(dict(
-                    luceneQuery=luceneQuery,
-                    start=start,
-                    stop=stop,
-                    facets=facets,
-                    suggestionRequest=suggestionRequest,
-                    **kwargs
-                ))
-            }
-        raise StopIteration(response)
-        yield
+        if timeAllowed:
+            jsonDict["timeAllowed"] = timeAllowed
+        if cursor:
+            jsonDict["cursor"] = cursor
+        info = partial(_queryInfo, dict(
+                luceneQuery=luceneQuery,
+                start=start,
+                stop=stop,
+                facets=facets,
+                suggestionRequest=suggestionRequest,
+                **kwargs
+            ))
+        return jsonDict, info
 
     def prefixSearch(self, fieldname, prefix, showCount=False, limit=10, **kwargs):
         jsonDict = JsonDict(
@@ -153,6 +189,9 @@ class Lucene(Observable):
     def numDocs(self):
         raise StopIteration((yield self._connect.send(path='/numDocs/')))
 
+    def stats(self):
+        raise StopIteration((yield self._connect.send(path='/stats/')))
+
     def coreInfo(self):
         yield self.LuceneInfo(self)
 
@@ -163,9 +202,14 @@ class Lucene(Observable):
             inner.numDocs = self.numDocs
 
 
+def _queryInfo(queryArguments):
+    return {
+        'type': 'Query',
+        'query': simplifiedDict(queryArguments)
+    }
+
 def luceneResponseFromDict(responseDict):
-    hits = [Hit(**hit) for hit in responseDict['hits']]
-    response = LuceneResponse(total=responseDict["total"], queryTime=responseDict["queryTime"], hits=hits, drilldownData=[])
+    response = LuceneResponse(total=responseDict["total"], queryTime=responseDict["queryTime"], hits=Hits(responseDict['hits']), drilldownData=[])
     if "totalWithDuplicates" in responseDict:
         response.totalWithDuplicates = responseDict['totalWithDuplicates']
     if "drilldownData" in responseDict:
@@ -174,6 +218,13 @@ def luceneResponseFromDict(responseDict):
         response.suggestions = responseDict['suggestions']
     if "times" in responseDict:
         response.times = responseDict['times']
+    if "partial" in responseDict:
+        response.partial = responseDict['partial']
+    if "cursor" in responseDict:
+        response.cursor = responseDict['cursor']
+    if "passes" in responseDict:
+        response.passes = responseDict['passes']
+        response.hitsCollected = responseDict['hitsCollected']
     return response
 
 millis = lambda seconds: int(seconds * 1000) or 1 # nobody believes less than 1 millisecs
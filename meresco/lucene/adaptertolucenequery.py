@@ -24,10 +24,10 @@
 #
 ## end license ##
 
-from cqlparser.cqltoexpression import cqlToExpression
-
 from meresco.core import Transparent
 
+from meresco.lucene.utils import cachedCqlToExpression as cqlToExpression
+
 
 class AdapterToLuceneQuery(Transparent):
     def __init__(self, defaultCore, coreConverters, **kwargs):
@@ -61,6 +61,8 @@ class ComposedQuery(object):
     storedFields = _makeProperty('_storedFields')
     clustering = _makeProperty('_clustering')
     clusteringConfig = _makeProperty('_clusteringConfig')
+    timeAllowed = _makeProperty('_timeAllowed')
+    cursor = _makeProperty('_cursor')
 
     _makeProperty = None
 
@@ -206,7 +208,7 @@ class ComposedQuery(object):
         self._otherCoreFacetFilters = dict((core, [convertQuery(core, v) for v in values]) for core, values in self._otherCoreFacetFilters.items())
 
     def otherKwargs(self):
-        return dict(start=self.start, stop=self.stop, sortKeys=self.sortKeys, suggestionRequest=self.suggestionRequest, dedupField=self.dedupField, dedupSortField=self.dedupSortField, groupingField=self.groupingField, clustering=self.clustering, storedFields=self.storedFields, clusteringConfig=self.clusteringConfig)
+        return dict(start=self.start, stop=self.stop, sortKeys=self.sortKeys, suggestionRequest=self.suggestionRequest, dedupField=self.dedupField, dedupSortField=self.dedupSortField, groupingField=self.groupingField, clustering=self.clustering, storedFields=self.storedFields, clusteringConfig=self.clusteringConfig, timeAllowed=self.timeAllowed, cursor=self.cursor)
 
     def asDict(self):
         result = dict(vars(self))
@@ -236,10 +238,11 @@ class ComposedQuery(object):
     def __repr__(self):
         return "%s%s" % (self.__class__.__name__, self.asDict())
 
-    def infoDict(self):
+    def infoDict(self, queryDict=None):
+        queryDict = self.asDict() if queryDict is None else queryDict
         return {
             'type': self.__class__.__name__,
-            'query': simplifiedDict(dict((k.replace('_', ''), v) for k,v in self.asDict().items()))
+            'query': simplifiedDict(dict((k.replace('_', ''), v) for k,v in queryDict.items()))
         }
 
 
@@ -27,12 +27,12 @@
 
 from collections import defaultdict
 
-from cqlparser import cqlToExpression
 from cqlparser.cqltoexpression import QueryExpression
 
 from meresco.core import Observable, asyncnoreturnvalue
 from meresco.lucene import ComposedQuery
 from meresco.lucene.extractfilterqueries import ExtractFilterQueries
+from meresco.lucene.utils import cachedCqlToExpression as cqlToExpression
 
 
 class ConvertToComposedQuery(Observable):
@@ -0,0 +1,240 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from collections import deque
+from os import pipe, read, write, close
+from Queue import Queue
+from sys import exc_info
+from threading import Thread
+from urlparse import urlparse, parse_qs
+
+from simplejson import loads
+
+from weightless.io import Suspend
+
+from _connect import UninitializedException
+from _jvm import getJVM
+from _lucene import Lucene
+from multilucene import MultiLucene
+from lucenecommit import LuceneCommit
+
+
+class EmbeddedLuceneServer(object):
+    """Runs the Lucene cores inside this process instead of in a separate
+    Lucene server; EmbeddedLucene, EmbeddedMultiLucene and
+    EmbeddedLuceneCommit use it in place of the HTTP connection.
+
+    With a reactor, requests run on a pool of (JVM attached) threads and the
+    calling generator is suspended until the result is there; without one
+    requests run in the calling thread."""
+
+    def __init__(self, stateDir, cores, reactor=None, numberOfThreads=4):
+        getJVM()
+        from org.meresco.lucene import EmbeddedLucene as JavaEmbeddedLucene
+        self._lucene = JavaEmbeddedLucene(stateDir, list(cores))
+        self._pool = _ThreadPool(reactor, numberOfThreads, initThread=lambda: getJVM().attachCurrentThread()) if reactor is not None else None
+
+    def call(self, methodName, *args):
+        if self._pool is None:
+            raise StopIteration(self.callNow(methodName, *args))
+        try:
+            result = yield self._pool.call(getattr(self._lucene, methodName), *args)
+        except Exception, e:
+            _raiseUninitialized(e)
+            raise
+        raise StopIteration(result)
+
+    def callNow(self, methodName, *args):
+        """Calls methodName in the calling thread, also with a reactor."""
+        try:
+            return getattr(self._lucene, methodName)(*args)
+        except Exception, e:
+            _raiseUninitialized(e)
+            raise
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+        self._lucene.close()
+
+
+class EmbeddedLucene(Lucene):
+    def __init__(self, server, settings, name, **kwargs):
+        Lucene.__init__(self, host=None, port=None, settings=settings, name=name, **kwargs)
+        self._connect = _EmbeddedConnect(server, observable=self, core=name)
+        self._server = server
+
+    def observer_init(self):
+        # synchronous, like Lucene.observer_init; the thread pool could only
+        # hand the result back through the reactor, which does not run yet
+        self._server.callNow('updateSettings', self._name, self.settings.asPostDict().dumps())
+
+
+class EmbeddedMultiLucene(MultiLucene):
+    def __init__(self, server, defaultCore):
+        MultiLucene.__init__(self, host=None, port=None, defaultCore=defaultCore)
+        self._connect = _EmbeddedConnect(server, observable=self)
+
+
+class EmbeddedLuceneCommit(LuceneCommit):
+    def __init__(self, server, **kwargs):
+        LuceneCommit.__init__(self, host=None, port=None, **kwargs)
+        self._server = server
+
+    def commit(self):
+        # synchronous, like LuceneCommit.commit (see observer_init above)
+        self._server.callNow('commit')
+
+
+class _EmbeddedConnect(object):
+    """Maps the requests of the HTTP client (_Connect) to calls on the
+    embedded server; the JSON bodies are passed on as they are."""
+
+    def __init__(self, server, observable, core=None):
+        self._server = server
+        self._observable = observable
+        self._core = core
+
+    def send(self, path, jsonDict=None, data=None, parse=True):
+        request = lambda: self._request(path, jsonDict.dumps() if jsonDict else data)
+        try:
+            body = yield request()
+        except UninitializedException:
+            yield self._observable.initialize()
+            body = yield request()
+        if body and parse:
+            body = loads(body)
+        raise StopIteration(body if body is not None else None)
+
+    def read(self, path, parse=True):
+        body = yield self.send(path, parse=parse)
+        raise StopIteration(body)
+
+    def _request(self, path, data):
+        parsed = urlparse(path)
+        multiArguments = parse_qs(parsed.query)
+        arguments = dict((key, values[0]) for key, values in multiArguments.items())
+        call = self._server.call
+        core = self._core
+        if core is None:
+            if parsed.path == '/query/':
+                result = yield call('executeComposedQuery', data)
+            elif parsed.path == '/multiQuery/':
+                result = yield call('executeComposedQueries', data)
+            elif parsed.path == '/commit/':
+                result = yield call('commit')
+            else:
+                raise NotImplementedError("Not supported by the embedded Lucene: %s" % path)
+        elif parsed.path == '/settings/':
+            if data is None:
+                result = yield call('getSettings', core)
+            else:
+                result = yield call('updateSettings', core, data)
+        elif parsed.path == '/update/':
+            result = yield call('addDocument', core, arguments.get('identifier'), data)
+        elif parsed.path == '/bulkUpdate/':
+            result = yield call('bulkUpdate', core, data)
+        elif parsed.path == '/delete/':
+            result = yield call('deleteDocument', core, arguments['identifier'])
+        elif parsed.path == '/query/':
+            result = yield call('executeQuery', core, data)
+        elif parsed.path == '/multiQuery/':
+            result = yield call('executeQueries', core, data)
+        elif parsed.path == '/prefixSearch/':
+            result = yield call('prefixSearch', core, arguments['fieldname'], arguments['prefix'], int(arguments['limit']))
+        elif parsed.path == '/fieldnames/':
+            result = yield call('fieldnames', core)
+        elif parsed.path == '/drilldownFieldnames/':
+            result = yield call('drilldownFieldnames', core, arguments.get('dim'), multiArguments.get('path', []), int(arguments['limit']))
+        elif parsed.path == '/similarDocuments/':
+            result = yield call('similarDocuments', core, arguments['identifier'])
+        elif parsed.path == '/stats/':
+            result = yield call('stats', core)
+        elif parsed.path == '/numDocs/':
+            result = str((yield call('numDocs', core)))
+        else:
+            raise NotImplementedError("Not supported by the embedded Lucene: %s" % path)
+        raise StopIteration(result)
+
+
+class _ThreadPool(object):
+    def __init__(self, reactor, numberOfThreads, initThread=lambda: None):
+        self._reactor = reactor
+        self._initThread = initThread
+        self._tasks = Queue()
+        self._done = deque()
+        self._readFd, self._writeFd = pipe()
+        reactor.addReader(self._readFd, self._resumeDone)
+        self._threads = []
+        for _ in xrange(numberOfThreads):
+            thread = Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def call(self, method, *args):
+        suspend = Suspend(doNext=lambda this: self._tasks.put((this, method, args)))
+        yield suspend
+        raise StopIteration(suspend.getResult())
+
+    def close(self):
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._reactor.removeReader(self._readFd)
+        close(self._readFd)
+        close(self._writeFd)
+
+    def _work(self):
+        self._initThread()
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            suspend, method, args = task
+            try:
+                outcome = (True, method(*args))
+            except Exception:
+                outcome = (False, exc_info())
+            self._done.append((suspend, outcome))
+            write(self._writeFd, 'x')
+
+    def _resumeDone(self):
+        read(self._readFd, 4096)
+        while self._done:
+            suspend, (succeeded, value) = self._done.popleft()
+            if succeeded:
+                suspend.resume(value)
+            else:
+                suspend.throw(*value)
+
+
+def _raiseUninitialized(exception):
+    # Lucene.UninitializedException from the JVM (a JCC JavaError) becomes
+    # the one _Connect raises for a 409, so the caller initializes and retries
+    getJavaException = getattr(exception, 'getJavaException', None)
+    if getJavaException is not None and getJavaException().getClass().getName() == 'org.meresco.lucene.Lucene$UninitializedException':
+        raise UninitializedException()
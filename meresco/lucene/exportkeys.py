@@ -0,0 +1,98 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from collections import OrderedDict
+from urllib import urlencode
+
+from simplejson import dumps
+
+from meresco.core import Observable
+
+from _connect import _Connect
+from keyset import readRoaringKeySet
+
+
+class ExportKeys(Observable):
+    """Exports the keys of a ComposedQuery's results through /exportkeys.
+
+    Results are cached per canonical query and export key together with the
+    index generation (ETag) reported by the server; a cached result is
+    revalidated with If-None-Match and only transferred again when one of
+    the cores involved changed.
+
+    exportKeys fetches the (compact) roaring format; updateFilterKeySet the
+    OpenBitSet format the observers (e.g. the suggestion server) expect."""
+
+    def __init__(self, host, port, maxCacheSize=100, compress=False, **kwargs):
+        super(ExportKeys, self).__init__(**kwargs)
+        self._connect = _Connect(host, port, observable=self, compress=compress)
+        self._maxCacheSize = maxCacheSize
+        self._cache = OrderedDict()
+        self._registered = {}
+
+    def initialize(self):
+        yield self.all.initialize()
+
+    def exportKeys(self, query, exportKey):
+        entry = yield self._export(query, exportKey, format='roaring')
+        raise StopIteration(entry.keySet().copy())
+
+    def updateFilterKeySet(self, name, query, exportKey):
+        entry = yield self._export(query, exportKey, format=None)
+        if self._registered.get(name) is entry:
+            return
+        yield self.all.registerFilterKeySet(name=name, keySet=entry.data)
+        self._registered[name] = entry
+
+    def _export(self, query, exportKey, format):
+        queryString = dumps(query.asDict(), sort_keys=True)
+        cacheKey = (exportKey, format, queryString)
+        entry = self._cache.get(cacheKey)
+        arguments = [('exportKey', exportKey)]
+        if format:
+            arguments.append(('format', format))
+        etag, data = yield self._connect.sendIfModified(
+                path='/exportkeys/?{}'.format(urlencode(arguments)),
+                etag=entry.etag if entry else None,
+                data=queryString)
+        if data is not None:
+            entry = _Entry(etag, data)
+        self._cache.pop(cacheKey, None)
+        self._cache[cacheKey] = entry
+        if len(self._cache) > self._maxCacheSize:
+            self._cache.popitem(last=False)
+        raise StopIteration(entry)
+
+
+class _Entry(object):
+    def __init__(self, etag, data):
+        self.etag = etag
+        self.data = data
+        self._keySet = None
+
+    def keySet(self):
+        if self._keySet is None:
+            self._keySet = readRoaringKeySet(self.data)
+        return self._keySet
@@ -24,6 +24,8 @@
 #
 ## end license ##
 
+from copy import copy
+
 from cqlparser.cqltoexpression import QueryExpression
 
 class TooComplexQueryExpression(Exception):
@@ -40,19 +42,19 @@ class ExtractFilterQueries(object):
             e.operands.append(expression)
             expression = e
         if expression.operator == 'AND':
-            oldOperands = expression.operands
-            expression.operands = []
-            for operand in oldOperands:
+            operands = []
+            for operand in expression.operands:
                 operandCores = list(self.coresInExpression(expression=operand, core=core))
                 if len(operandCores) == 1 and operandCores[0] != core:
-                    removeCoreFromFieldname(operandCores[0], operand)
-                    filterQueries.setdefault(operandCores[0], []).append(operand)
+                    filterQueries.setdefault(operandCores[0], []).append(removeCoreFromFieldname(operandCores[0], operand))
                 else:
-                    expression.operands.append(operand)
-            if len(expression.operands) == 1:
-                expression = expression.operands[0]
-            elif len(expression.operands) == 0:
+                    operands.append(operand)
+            if len(operands) == 1:
+                expression = operands[0]
+            elif len(operands) == 0:
                 expression = None
+            elif len(operands) != len(expression.operands):
+                expression = _withOperands(expression, operands)
         if expression and self.coresInExpression(expression=expression, core=core) != set([core]):
             raise TooComplexQueryExpression('Multiple core query detected, but unable to convert to a correct composed query')
         return expression, filterQueries
@@ -75,10 +77,18 @@ class ExtractFilterQueries(object):
                 return possibleCore
         return core
 
+# Expressions are never changed in place; they may be shared through the
+# parse cache (utils.cachedCqlToExpression).
+
 def removeCoreFromFieldname(core, expression):
     if expression.operator:
-        for operand in expression.operands:
-            removeCoreFromFieldname(core, operand)
-        return
+        return _withOperands(expression, [removeCoreFromFieldname(core, operand) for operand in expression.operands])
     if expression.index and expression.index.startswith(core + "."):
-        expression.index = expression.index[len(core)+1:]
\ No newline at end of file
+        expression = copy(expression)
+        expression.index = expression.index[len(core)+1:]
+    return expression
+
+def _withOperands(expression, operands):
+    result = copy(expression)
+    result.operands = operands
+    return result
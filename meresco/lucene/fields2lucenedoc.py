@@ -25,7 +25,6 @@
 ## end license ##
 
 from meresco.core import Observable
-from org.apache.lucene.document import Document
 
 from fieldregistry import IDFIELD, KEY_PREFIX
 
@@ -24,27 +24,105 @@
 #
 ## end license ##
 
-from hashlib import md5
+from collections import Sequence
+
 
 class Hit(object):
+    __slots__ = ('id', '_fields')
 
     def __init__(self, id, **kwargs):
         self.id = id
-        self.__dict__.update(kwargs)
+        self._fields = kwargs
+
+    @classmethod
+    def fromDict(cls, hitDict):
+        hit = cls.__new__(cls)
+        hit.id = hitDict['id']
+        hit._fields = hitDict
+        return hit
+
+    def __getattr__(self, name):
+        if name == '_fields':
+            raise AttributeError(name)
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in Hit.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            self._fields[name] = value
+
+    def __getstate__(self):
+        return self.id, self._fields
+
+    def __setstate__(self, state):
+        self.id, self._fields = state
+
+    def asDict(self):
+        result = dict((k, v) for k, v in self._fields.items() if k != 'id')
+        result['id'] = self.id
+        return result
 
     def __eq__(self, other):
         return self.__class__.__name__ == other.__class__.__name__ and \
-            self.__dict__ == other.__dict__
+            self.asDict() == other.asDict()
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        h = md5()
-        for k,v in sorted(self.__dict__.items()):
-            h.update(k)
-            h.update(str(v))
-        return hash(h.digest())
+        return hash(self.id)
 
     def __str__(self):
         return str(self.id)
 
     def __repr__(self):
-        return "%s(%s)" % (self.__class__.__name__, ', '.join("%s=%s" % (k, repr(v)) for k, v in self.__dict__.items()))
+        return "%s(%s)" % (self.__class__.__name__, ', '.join("%s=%s" % (k, repr(v)) for k, v in self.asDict().items()))
+
+
+class Hits(Sequence):
+    """Hits from a response, each created from its dict on first access."""
+    __slots__ = ('_hitDicts', '_hits')
+
+    def __init__(self, hitDicts):
+        self._hitDicts = hitDicts
+        self._hits = [None] * len(hitDicts)
+
+    def __getstate__(self):
+        return (self._hitDicts,)
+
+    def __setstate__(self, state):
+        self._hitDicts, = state
+        self._hits = [None] * len(self._hitDicts)
+
+    def __len__(self):
+        return len(self._hitDicts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(len(self)))]
+        hit = self._hits[index]
+        if hit is None:
+            hit = self._hits[index] = Hit.fromDict(self._hitDicts[index])
+        return hit
+
+    def __iter__(self):
+        for i in xrange(len(self._hitDicts)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, Hits)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
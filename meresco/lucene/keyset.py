@@ -0,0 +1,274 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from array import array
+from bisect import bisect_left
+from itertools import imap
+from operator import and_, or_
+from struct import unpack_from
+from sys import byteorder
+
+try:
+    from numpy import frombuffer
+except ImportError:
+    frombuffer = None
+
+
+_WORDTYPE = 'l' if array('l').itemsize == 8 else None
+_ARRAY_MAX = 4096
+_WORDBITS = array('L').itemsize * 8
+_BITMAP_LENGTH = 65536 / _WORDBITS
+
+
+class KeySet(object):
+    """Set of non negative keys, stored like the RoaringBitSet of the server:
+    per 16 high bits of a key one container with the 16 low bits, either a
+    sorted array('H') (at most 4096 keys) or a bitmap of array('L') words.
+    Membership is a lookup in one container, iterating visits only the
+    containers that hold keys."""
+    __slots__ = ['_containers']
+
+    def __init__(self, keys=None):
+        self._containers = {}
+        if keys:
+            lowsPerHigh = {}
+            for key in keys:
+                lowsPerHigh.setdefault(key >> 16, set()).add(key & 0xffff)
+            for high, lows in lowsPerHigh.iteritems():
+                self._containers[high] = _fromLows(sorted(lows))
+
+    @classmethod
+    def _fromContainers(cls, containers):
+        keySet = cls()
+        keySet._containers = containers
+        return keySet
+
+    def copy(self):
+        return KeySet._fromContainers(dict((high, container[:]) for high, container in self._containers.iteritems()))
+
+    def add(self, key):
+        high, low = key >> 16, key & 0xffff
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array('H', [low])
+        elif container.typecode == 'H':
+            i = bisect_left(container, low)
+            if i == len(container) or container[i] != low:
+                container.insert(i, low)
+                if len(container) > _ARRAY_MAX:
+                    self._containers[high] = _bitmap(container)
+        else:
+            container[low / _WORDBITS] |= 1 << (low % _WORDBITS)
+
+    def __contains__(self, key):
+        if key < 0:
+            return False
+        container = self._containers.get(key >> 16)
+        if container is None:
+            return False
+        low = key & 0xffff
+        if container.typecode == 'H':
+            i = bisect_left(container, low)
+            return i < len(container) and container[i] == low
+        return bool(container[low / _WORDBITS] >> (low % _WORDBITS) & 1)
+
+    def intersect(self, other):
+        self._containers = _intersection(self._containers, other._containers)
+        return self
+
+    def union(self, other):
+        containers = self._containers
+        for high, container in other._containers.iteritems():
+            mine = containers.get(high)
+            containers[high] = container[:] if mine is None else _or(mine, container)
+        return self
+
+    __iand__ = intersect
+    __ior__ = union
+
+    def __and__(self, other):
+        return KeySet._fromContainers(_intersection(self._containers, other._containers))
+
+    def __or__(self, other):
+        return self.copy().union(other)
+
+    def cardinality(self):
+        return sum(_cardinality(container) for container in self._containers.itervalues())
+
+    __len__ = cardinality
+
+    def __iter__(self):
+        for high in sorted(self._containers):
+            base = high << 16
+            container = self._containers[high]
+            lows = container if container.typecode == 'H' else _lowsFromWords(container)
+            for low in lows:
+                yield base + low
+
+    def __nonzero__(self):
+        return bool(self._containers)
+
+    def __eq__(self, other):
+        # containers are kept in one form for a given content: arrays up to
+        # _ARRAY_MAX keys, bitmaps above that, no empty containers
+        return isinstance(other, KeySet) and self._containers == other._containers
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(cardinality=%s)" % (self.__class__.__name__, self.cardinality())
+
+
+def readWords(data, offset=0, count=None):
+    if count is None:
+        count = (len(data) - offset) / 8
+    if frombuffer is not None:
+        return frombuffer(data, dtype='>i8', count=count, offset=offset).tolist()
+    if _WORDTYPE is None:
+        return list(unpack_from('>%sq' % count, data, offset))
+    words = array(_WORDTYPE)
+    words.fromstring(data[offset:offset + count * 8])
+    if byteorder == 'little':
+        words.byteswap()
+    return words.tolist()
+
+def readKeySet(data):
+    """KeySet from the (default) OpenBitSet format of /exportkeys."""
+    length = unpack_from('>i', data, 4)[0]
+    containers = {}
+    perContainer = 65536 / 64
+    for high, start in enumerate(xrange(0, length, perContainer)):
+        words = _wordsFromData(data, 8 + start * 8, min(perContainer, length - start))
+        words.extend([0] * (_BITMAP_LENGTH - len(words)))
+        container = _optimized(words)
+        if container is not None:
+            containers[high] = container
+    return KeySet._fromContainers(containers)
+
+def readRoaringKeySet(data):
+    """KeySet from the format=roaring format of /exportkeys."""
+    size = unpack_from('>i', data, 0)[0]
+    offset = 4
+    containers = {}
+    for _ in xrange(size):
+        high, cardinality = unpack_from('>Hi', data, offset)
+        offset += 6
+        if cardinality <= _ARRAY_MAX:
+            lows = array('H')
+            lows.fromstring(data[offset:offset + 2 * cardinality])
+            if byteorder == 'little':
+                lows.byteswap()
+            offset += 2 * cardinality
+            if lows:
+                containers[high] = lows
+        else:
+            containers[high] = _wordsFromData(data, offset, 65536 / 64)
+            offset += 65536 / 8
+    return KeySet._fromContainers(containers)
+
+def _wordsFromData(data, offset, count):
+    # count big endian 64 bit words, as array('L') words (low word first
+    # where those are 32 bits)
+    if _WORDBITS == 64:
+        words = array('L')
+        words.fromstring(data[offset:offset + count * 8])
+        if byteorder == 'little':
+            words.byteswap()
+        return words
+    words = array('L')
+    for word in unpack_from('>%sQ' % count, data, offset):
+        words.append(word & 0xffffffff)
+        words.append(word >> 32)
+    return words
+
+def _fromLows(lows):
+    if len(lows) <= _ARRAY_MAX:
+        return array('H', lows)
+    return _bitmap(lows)
+
+def _bitmap(lows):
+    words = array('L', [0]) * _BITMAP_LENGTH
+    for low in lows:
+        words[low / _WORDBITS] |= 1 << (low % _WORDBITS)
+    return words
+
+def _optimized(words):
+    cardinality = _cardinality(words)
+    if cardinality == 0:
+        return None
+    if cardinality <= _ARRAY_MAX:
+        return array('H', _lowsFromWords(words))
+    return words
+
+def _cardinality(container):
+    if container.typecode == 'H':
+        return len(container)
+    return sum(bin(word).count('1') for word in container if word)
+
+def _lowsFromWords(words):
+    for i, word in enumerate(words):
+        base = i * _WORDBITS
+        while word:
+            lowest = word & -word
+            yield base + lowest.bit_length() - 1
+            word ^= lowest
+
+def _intersection(containers, otherContainers):
+    if len(otherContainers) < len(containers):
+        containers, otherContainers = otherContainers, containers
+    result = {}
+    for high, container in containers.iteritems():
+        other = otherContainers.get(high)
+        if other is not None:
+            container = _and(container, other)
+            if container is not None:
+                result[high] = container
+    return result
+
+def _and(a, b):
+    if a.typecode != 'H' and b.typecode != 'H':
+        return _optimized(array('L', imap(and_, a, b)))
+    if a.typecode != 'H':
+        a, b = b, a
+    if b.typecode == 'H':
+        lows = sorted(set(a).intersection(b))
+    else:
+        lows = [low for low in a if b[low / _WORDBITS] >> (low % _WORDBITS) & 1]
+    return array('H', lows) if lows else None
+
+def _or(a, b):
+    if a.typecode == 'H' and b.typecode == 'H':
+        return _fromLows(sorted(set(a).union(b)))
+    if a.typecode == 'H':
+        a, b = b, a
+    if b.typecode != 'H':
+        return array('L', imap(or_, a, b))
+    words = a[:]
+    for low in b:
+        words[low / _WORDBITS] |= 1 << (low % _WORDBITS)
+    return words
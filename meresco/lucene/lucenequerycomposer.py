@@ -25,8 +25,8 @@
 ## end license ##
 
 
-from cqlparser.cqltoexpression import cqlToExpression
 from meresco.lucene.queryexpressiontolucenequerydict import QueryExpressionToLuceneQueryDict
+from meresco.lucene.utils import cachedCqlToExpression as cqlToExpression
 
 
 class LuceneQueryComposer(object):
@@ -24,7 +24,7 @@
 ## end license ##
 
 from simplejson import loads, dumps, JSONEncoder, JSONDecoder
-from hit import Hit
+from hit import Hit, Hits
 
 class LuceneResponse(object):
     def __init__(self, **kwargs):
@@ -34,16 +34,36 @@ class LuceneResponse(object):
     def fromJson(cls, json):
         return cls(**loads(json, cls=LuceneResponseJsonDecoder))
 
+    @property
+    def info(self):
+        try:
+            info = self.__dict__['info']
+        except KeyError:
+            raise AttributeError('info')
+        if callable(info):
+            info = self.__dict__['info'] = info()
+        return info
+
+    @info.setter
+    def info(self, info):
+        # a callable is only called, and its result kept, on first access
+        self.__dict__['info'] = info
+
     def asJson(self, **kwargs):
-        return dumps(vars(self), cls=LuceneResponseJsonEncoder, **kwargs)
+        values = dict(vars(self))
+        if 'info' in values:
+            values['info'] = self.info
+        return dumps(values, cls=LuceneResponseJsonEncoder, **kwargs)
 
 
 class LuceneResponseJsonEncoder(JSONEncoder):
     def default(self, o):
         if type(o) is Hit:
             d = {"__class__": Hit.__name__}
-            d.update(o.__dict__)
+            d.update(o.asDict())
             return d
+        if type(o) is Hits:
+            return list(o)
         return JSONEncoder.default(self, o)
 
 class LuceneResponseJsonDecoder(JSONDecoder):
@@ -25,41 +25,69 @@
 ## end license ##
 
 from copy import copy
-from org.meresco.lucene.analysis import MerescoStandardAnalyzer
 from meresco.components.json import JsonDict
 from meresco.lucene.fieldregistry import FieldRegistry
-from org.apache.lucene.search.similarities import BM25Similarity
+from meresco.lucene._jvm import getJVM
 
 class LuceneSettings(object):
     def __init__(self,
                 commitTimeout=10,
                 commitCount=100000,
+                refreshInterval=0.0,
+                groupCommitWindow=0.0,
                 readonly=False,
                 lruTaxonomyWriterCacheSize=4000,
-                analyzer=MerescoStandardAnalyzer(),
+                analyzer=None,
                 _analyzer=dict(type="MerescoStandardAnalyzer"),
-                similarity=BM25Similarity(),
+                similarity=None,
                 _similarity=dict(type="BM25Similarity"),
                 fieldRegistry=FieldRegistry(),
                 maxMergeAtOnce=2,
                 segmentsPerTier=8.0,
                 numberOfConcurrentTasks=6,
+                indexingThreads=1,
+                indexingQueueSize=1000,
+                queryResultCacheSize=100,
+                queryResultCacheMaxBytes=32 * 1024 * 1024,
+                warmKeyFields=None,
+                warmQueries=None,
                 verbose=True,
             ):
         self.commitTimeout = commitTimeout
         self.commitCount = commitCount
+        self.refreshInterval = refreshInterval
+        self.groupCommitWindow = groupCommitWindow
         self.readonly = readonly
         self.lruTaxonomyWriterCacheSize = lruTaxonomyWriterCacheSize
-        self.analyzer = analyzer
+        if analyzer is not None:
+            self.analyzer = analyzer
         self._analyzer = _analyzer
-        self.similarity = similarity
+        if similarity is not None:
+            self.similarity = similarity
         self._similarity = _similarity
         self.fieldRegistry = fieldRegistry
         self.maxMergeAtOnce = maxMergeAtOnce
         self.segmentsPerTier = segmentsPerTier
         self.numberOfConcurrentTasks = numberOfConcurrentTasks
+        self.indexingThreads = indexingThreads
+        self.indexingQueueSize = indexingQueueSize
+        self.queryResultCacheSize = queryResultCacheSize
+        self.queryResultCacheMaxBytes = queryResultCacheMaxBytes
+        self.warmKeyFields = list(warmKeyFields or [])
+        self.warmQueries = list(warmQueries or [])
         self.verbose = verbose
 
+    def __getattr__(self, name):
+        # The Java defaults are only created when used, so that settings
+        # can be made without a JVM.
+        if name == 'analyzer':
+            self.analyzer = _defaultAnalyzer()
+            return self.analyzer
+        if name == 'similarity':
+            self.similarity = _defaultSimilarity()
+            return self.similarity
+        raise AttributeError(name)
+
     def clone(self, **kwargs):
         arguments = copy(self.__dict__)
         arguments.update(kwargs)
@@ -78,11 +106,35 @@ class LuceneSettings(object):
         return JsonDict(
                 commitTimeout=self.commitTimeout,
                 commitCount=self.commitCount,
+                refreshInterval=self.refreshInterval,
+                groupCommitWindow=self.groupCommitWindow,
                 lruTaxonomyWriterCacheSize=self.lruTaxonomyWriterCacheSize,
                 analyzer=self._analyzer,
                 similarity=self._similarity,
                 maxMergeAtOnce=self.maxMergeAtOnce,
                 segmentsPerTier=self.segmentsPerTier,
                 numberOfConcurrentTasks=self.numberOfConcurrentTasks,
+                indexingThreads=self.indexingThreads,
+                indexingQueueSize=self.indexingQueueSize,
+                queryResultCacheSize=self.queryResultCacheSize,
+                queryResultCacheMaxBytes=self.queryResultCacheMaxBytes,
+                warmKeyFields=self.warmKeyFields,
+                warmQueries=self.warmQueries,
                 drilldownFields=drilldownFields
-            )
\ No newline at end of file
+            )
+
+_defaults = {}
+
+def _defaultAnalyzer():
+    if 'analyzer' not in _defaults:
+        getJVM()
+        from org.meresco.lucene.analysis import MerescoStandardAnalyzer
+        _defaults['analyzer'] = MerescoStandardAnalyzer()
+    return _defaults['analyzer']
+
+def _defaultSimilarity():
+    if 'similarity' not in _defaults:
+        getJVM()
+        from org.apache.lucene.search.similarities import BM25Similarity
+        _defaults['similarity'] = BM25Similarity()
+    return _defaults['similarity']
@@ -24,19 +24,21 @@
 #
 ## end license ##
 
+from functools import partial
+
 from weightless.core import DeclineMessage
 from meresco.core import Observable
-from meresco.components.json import JsonDict
+from meresco.components.json import JsonDict, JsonList
 
 from _connect import _Connect
 from _lucene import luceneResponseFromDict
 
 
 class MultiLucene(Observable):
-    def __init__(self, host, port, defaultCore):
+    def __init__(self, host, port, defaultCore, compress=False):
         Observable.__init__(self)
         self._defaultCore = defaultCore
-        self._connect = _Connect(host, port, observable=self)
+        self._connect = _Connect(host, port, observable=self, compress=compress)
 
     def initialize(self):
         yield self.all.initialize()
@@ -50,12 +52,30 @@ class MultiLucene(Observable):
         for sortKey in query.sortKeys:
             coreName = sortKey.get('core', query.resultsFrom)
             self.call[coreName].updateSortKey(sortKey)
-        responseDict = (yield self._connect.send(jsonDict=JsonDict(query.asDict()), path='/query/'))
+        queryDict = query.asDict()
+        responseDict = (yield self._connect.send(jsonDict=JsonDict(queryDict), path='/query/'))
         response = luceneResponseFromDict(responseDict)
-        response.info = query.infoDict()
+        response.info = partial(query.infoDict, queryDict)
         raise StopIteration(response)
         yield
 
+    def executeQueries(self, queries):
+        if not queries:
+            raise StopIteration([])
+        for query in queries:
+            for sortKey in query.sortKeys:
+                coreName = sortKey.get('core', query.resultsFrom)
+                self.call[coreName].updateSortKey(sortKey)
+        queryDicts = [query.asDict() for query in queries]
+        responseDicts = (yield self._connect.send(jsonDict=JsonList(queryDicts), path='/multiQuery/'))
+        responses = []
+        for query, queryDict, responseDict in zip(queries, queryDicts, responseDicts):
+            response = luceneResponseFromDict(responseDict)
+            response.info = partial(query.infoDict, queryDict)
+            responses.append(response)
+        raise StopIteration(responses)
+        yield
+
     def any_unknown(self, message, **kwargs):
         if message in ['prefixSearch', 'fieldnames', 'drilldownFieldnames', 'similarDocuments']:
             core = kwargs.get('core')
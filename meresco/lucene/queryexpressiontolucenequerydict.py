@@ -26,35 +26,69 @@
 
 from re import compile
 
+from simplejson import dumps, loads
+
 from cqlparser import UnsupportedCQL
 from cqlparser.cqltoexpression import QueryExpression
 
 from weightless.core import Observable
 
+from meresco.components.json import JsonDict
+
+from _jvm import getJVM
+from utils import LruCache
+getJVM()
 from java.io import StringReader
 from org.meresco.lucene.analysis import MerescoStandardAnalyzer
-from meresco.components.json import JsonDict
 
 
 class QueryExpressionToLuceneQueryDict(Observable):
-    def __init__(self, unqualifiedTermFields, luceneSettings, ignoreStemmingForWords=None):
+    def __init__(self, unqualifiedTermFields, luceneSettings, ignoreStemmingForWords=None, analyzeCacheSize=10000, convertCacheSize=0):
         Observable.__init__(self)
         self._unqualifiedTermFields = unqualifiedTermFields
         self._analyzer = luceneSettings.analyzer
         self._fieldRegistry = luceneSettings.fieldRegistry
         self._ignoreStemmingForWords = set(ignoreStemmingForWords or [])
+        self._preAnalyzeCache = LruCache(analyzeCacheSize)
+        self._postAnalyzeCache = LruCache(analyzeCacheSize)
+        self._convertCache = LruCache(convertCacheSize) if convertCacheSize else None
 
     def updateUnqualifiedTermFields(self, unqualifiedTermFields):
         self._unqualifiedTermFields = unqualifiedTermFields
+        self._clearConvertCache()
 
     def updateIgnoreStemmingForWords(self, ignoreStemmingForWords):
         self._ignoreStemmingForWords = ignoreStemmingForWords
+        self._postAnalyzeCache.clear()
+        self._clearConvertCache()
+
+    def analyzeCacheInfo(self):
+        return dict(preAnalyze=self._preAnalyzeCache.info(), postAnalyze=self._postAnalyzeCache.info())
+
+    def convertCacheInfo(self):
+        return None if self._convertCache is None else self._convertCache.info()
 
     def executeQuery(self, query, **kwargs):
         response = yield self.any.executeQuery(luceneQuery=self.convert(query), **kwargs)
         raise StopIteration(response)
 
     def convert(self, expression):
+        if self._convertCache is None:
+            return self._convert(expression)
+        # The repr of equal expressions' dicts is the same (they are built in
+        # the same order) and much cheaper than sorted JSON; entries are kept
+        # as JSON, so every caller gets its own copy.
+        key = repr(expression.asDict())
+        return JsonDict(loads(self._convertCache.get(key, lambda: dumps(self._convert(expression)))))
+
+    def __call__(self, expression):
+        return self.convert(expression)
+
+    def _clearConvertCache(self):
+        if self._convertCache is not None:
+            self._convertCache.clear()
+
+    def _convert(self, expression):
         if expression.must_not:
             r = QueryExpression.nested('AND')
             r.operands.append(QueryExpression.searchterm(term='*'))
@@ -62,9 +96,6 @@ class QueryExpressionToLuceneQueryDict(Observable):
             expression = r
         return JsonDict(self._expression(expression))
 
-    def __call__(self, expression):
-        return self.convert(expression)
-
     def _expression(self, expr):
         if expr.operator:
             return self._nestedExpression(expr)
@@ -147,11 +178,17 @@ class QueryExpressionToLuceneQueryDict(Observable):
         return rangeQuery(rangeQueryType, field, lowerTerm, upperTerm, includeLower, includeUpper)
 
     def _pre_analyzeToken(self, index, token):
+        return list(self._preAnalyzeCache.get((index, token), lambda: tuple(self._pre_analyze(index, token))))
+
+    def _pre_analyze(self, index, token):
         if isinstance(self._analyzer, MerescoStandardAnalyzer):
             return list(self._analyzer.pre_analyse(index, token))
         return list(MerescoStandardAnalyzer.readTokenStream(self._analyzer.tokenStream("dummy field name", StringReader(token))))
 
     def _post_analyzeToken(self, index, token):
+        return list(self._postAnalyzeCache.get((index, token), lambda: tuple(self._post_analyze(index, token))))
+
+    def _post_analyze(self, index, token):
         if token in self._ignoreStemmingForWords:
             return [token]
         if isinstance(self._analyzer, MerescoStandardAnalyzer):
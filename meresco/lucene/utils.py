@@ -23,11 +23,15 @@
 #
 ## end license ##
 
-from struct import unpack
+from collections import OrderedDict
+from struct import unpack_from
 
 from simplejson import dumps, JSONEncoder, loads
 
-from org.apache.lucene.util import OpenBitSet
+from cqlparser.cqltoexpression import cqlToExpression, QueryExpression
+
+from _jvm import getJVM
+from keyset import readWords
 
 
 def simplifiedDict(aDict):
@@ -40,9 +44,49 @@ class _JsonEncoder(JSONEncoder):
         return JSONEncoder.default(self, o)
 
 def readOpenBitSet(data):
-    numWords = unpack('>i', data[:4])[0]
-    numBits = unpack('>i', data[4:8])[0]
-    longs = []
-    for i in xrange(8, len(data), 8):
-        longs.append(long(unpack('>q', data[i:i+8])[0]))
-    return OpenBitSet(longs, numWords)
+    getJVM()
+    from org.apache.lucene.util import OpenBitSet
+    numWords, length = unpack_from('>ii', data)
+    return OpenBitSet(readWords(data, 8, length), numWords)
+
+class LruCache(object):
+    def __init__(self, maxSize):
+        self._maxSize = maxSize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, create):
+        try:
+            value = self._entries.pop(key)
+            self.hits += 1
+        except KeyError:
+            value = create()
+            self.misses += 1
+        self._entries[key] = value
+        if len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        lookups = self.hits + self.misses
+        return dict(size=len(self._entries), maxSize=self._maxSize, hits=self.hits, misses=self.misses, hitRate=float(self.hits) / lookups if lookups else 0.0)
+
+expressionCache = LruCache(10000)
+
+def cachedCqlToExpression(cql):
+    """cqlToExpression that parses the same CQL string only once; the
+    resulting expressions are shared and must not be changed. A parse tree
+    is converted without the cache (a key for it would cost a walk of the
+    whole tree) and an expression is returned as it is."""
+    if isinstance(cql, QueryExpression):
+        return cql
+    if not isinstance(cql, basestring):
+        return cqlToExpression(cql)
+    return expressionCache.get(cql, lambda: cqlToExpression(cql))
@@ -53,11 +53,14 @@ fi
 
 PYLUCENEVERSION=4.10.1
 
-classpath=${luceneJarDir}/lucene-core-$PYLUCENEVERSION.jar:${luceneJarDir}/lucene-analyzers-common-$PYLUCENEVERSION.jar
+classpath=$(ls ${luceneJarDir}/lucene-*-$PYLUCENEVERSION.jar ${jarsDir}/*.jar | tr '\n' ':')
 
-${javac} -cp ${classpath} -d ${buildDir} `find . -type f \( -path "*analysis*" \)`
-(cd $buildDir; jar -c org > $buildDir/meresco-lucene.jar)
+${javac} -cp ${classpath} -d ${buildDir} `find . -type f -name "*.java"`
+(cd $buildDir; jar -c org/meresco/lucene/analysis > $buildDir/meresco-lucene.jar)
+(cd $buildDir; jar -c `find org -name "*.class" -not -path "*/analysis/*"` > $buildDir/meresco-lucene-embedded.jar)
 
+# analysis classes are wrapped entirely; of the rest only the EmbeddedLucene
+# entry point is, with its dependencies on the classpath
 python -m jcc.__main__ \
     --root $mydir/root \
     --use_full_names \
@@ -65,6 +68,9 @@ python -m jcc.__main__ \
     --shared \
     --arch x86_64 \
     --jar $buildDir/meresco-lucene.jar \
+    --include $buildDir/meresco-lucene-embedded.jar \
+    `for jar in ${jarsDir}/*.jar; do echo "--include $jar"; done` \
+    org.meresco.lucene.EmbeddedLucene \
     --python meresco_lucene \
     --build \
     --install
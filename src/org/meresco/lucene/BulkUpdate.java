@@ -0,0 +1,105 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.io.BufferedReader;
+import java.io.StringReader;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.Future;
+
+import javax.json.Json;
+import javax.json.JsonArray;
+import javax.json.JsonArrayBuilder;
+import javax.json.JsonObject;
+import javax.json.JsonObjectBuilder;
+
+import org.apache.lucene.document.Document;
+import org.meresco.lucene.Lucene.UninitializedException;
+import org.meresco.lucene.numerate.TermNumerator;
+
+/**
+ * Bulk update: one JSON object per line, either {"identifier": ..., "fields":
+ * [...]} or {"identifier": ..., "delete": true}. The result has a status per
+ * line; the updates that succeeded count toward the commit once all are done.
+ */
+public class BulkUpdate {
+
+    public static JsonArray update(Lucene lucene, TermNumerator termNumerator, BufferedReader reader) throws Exception {
+        List<JsonObjectBuilder> statuses = new ArrayList<JsonObjectBuilder>();
+        List<Future<Void>> futures = new ArrayList<Future<Void>>();
+        String line;
+        while ((line = reader.readLine()) != null) {
+            if (line.trim().isEmpty())
+                continue;
+            JsonObjectBuilder status = Json.createObjectBuilder();
+            Future<Void> future = null;
+            try {
+                JsonObject item = Json.createReader(new StringReader(line)).readObject();
+                String identifier = item.getString("identifier", null);
+                if (identifier == null)
+                    throw new IllegalArgumentException("Missing identifier");
+                status.add("identifier", identifier);
+                if (item.getBoolean("delete", false)) {
+                    future = lucene.submitRemoveDocument(identifier);
+                } else {
+                    Document document = new DocumentStringToDocument(item.getJsonArray("fields"), termNumerator).convert();
+                    future = lucene.submitUpdateDocument(identifier, document);
+                }
+            } catch (UninitializedException e) {
+                throw e;
+            } catch (Exception e) {
+                addError(status, e);
+            }
+            statuses.add(status);
+            futures.add(future);
+        }
+        JsonArrayBuilder result = Json.createArrayBuilder();
+        int count = 0;
+        for (int i = 0; i < statuses.size(); i++) {
+            JsonObjectBuilder status = statuses.get(i);
+            Future<Void> future = futures.get(i);
+            if (future != null) {
+                try {
+                    IndexingPipeline.waitFor(future);
+                    status.add("status", "OK");
+                    count++;
+                } catch (Exception e) {
+                    addError(status, e);
+                }
+            }
+            result.add(status);
+        }
+        if (count > 0)
+            lucene.commit(count);
+        return result.build();
+    }
+
+    private static void addError(JsonObjectBuilder status, Exception e) {
+        status.add("status", "ERROR");
+        status.add("error", String.valueOf(e.getMessage()));
+    }
+}
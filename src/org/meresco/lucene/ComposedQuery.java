@@ -68,7 +68,10 @@ public class ComposedQuery {
     public static ComposedQuery fromJsonString(Reader jsonStringReader, Map<String, QueryConverter> converters) {
         if (jsonStringReader == null)
             return null;
-        JsonObject json = Json.createReader(jsonStringReader).readObject();
+        return fromJson(Json.createReader(jsonStringReader).readObject(), converters);
+    }
+
+    public static ComposedQuery fromJson(JsonObject json, Map<String, QueryConverter> converters) {
         ComposedQuery cq = new ComposedQuery(json.getString("resultsFrom"));
         if (json.containsKey("_start") && json.get("_start") != JsonValue.NULL)
             cq.queryData.start = json.getInt("_start");
@@ -81,6 +84,10 @@ public class ComposedQuery {
         cq.queryData.dedupSortField = json.getString("_dedupSortField", null);
         cq.queryData.groupingField = json.getString("_groupingField", null);
         cq.queryData.clustering = json.getBoolean("_clustering", false);
+        if (json.containsKey("_timeAllowed") && json.get("_timeAllowed") != JsonValue.NULL)
+            cq.queryData.timeAllowed = json.getJsonNumber("_timeAllowed").longValue();
+        if (json.containsKey("_cursor") && json.get("_cursor") != JsonValue.NULL)
+            cq.queryData.searchAfter = SearchCursor.decode(json.getString("_cursor"));
         if (json.containsKey("_clusteringConfig")) {
         	cq.queryData.clusterConfig = ClusterConfig.parseFromJsonObject(json.getJsonObject("_clusteringConfig"));
         }
@@ -31,10 +31,14 @@ import java.util.Iterator;
 
 import javax.json.Json;
 import javax.json.JsonArray;
+import javax.json.JsonArrayBuilder;
 import javax.json.JsonObject;
-import javax.json.JsonReader;
+import javax.json.JsonObjectBuilder;
 import javax.json.JsonValue;
 import javax.json.JsonValue.ValueType;
+import javax.json.stream.JsonParser;
+import javax.json.stream.JsonParser.Event;
+import javax.json.stream.JsonParsingException;
 
 import org.apache.lucene.document.Document;
 import org.apache.lucene.document.DoubleField;
@@ -53,15 +57,22 @@ import org.meresco.lucene.numerate.TermNumerator;
 
 public class DocumentStringToDocument {
     private JsonArray object;
+    private Reader documentReader;
     private TermNumerator termNumerator;
 
     public DocumentStringToDocument(Reader documentReader, TermNumerator termNumerator) {
-        JsonReader jsonReader = Json.createReader(documentReader);
-        object = (JsonArray) jsonReader.read();
+        this.documentReader = documentReader;
+        this.termNumerator = termNumerator;
+    }
+
+    public DocumentStringToDocument(JsonArray object, TermNumerator termNumerator) {
+        this.object = object;
         this.termNumerator = termNumerator;
     }
 
     public Document convert() throws IOException {
+        if (this.object == null)
+            return convert(Json.createParser(this.documentReader));
         Document doc = new Document();
         Iterator<JsonValue> iterator = object.iterator();
         while (iterator.hasNext()) {
@@ -71,6 +82,60 @@ public class DocumentStringToDocument {
         return doc;
     }
 
+    private Document convert(JsonParser parser) throws IOException {
+        // fields are read one at a time; the document is never held as one json tree
+        Document doc = new Document();
+        try {
+            if (parser.next() != Event.START_ARRAY)
+                throw new JsonParsingException("Expected a list of fields", parser.getLocation());
+            while (parser.next() == Event.START_OBJECT)
+                doc.add(createField(readField(parser)));
+        } finally {
+            parser.close();
+        }
+        return doc;
+    }
+
+    private JsonObject readField(JsonParser parser) {
+        JsonObjectBuilder field = Json.createObjectBuilder();
+        String key = null;
+        Event event;
+        while ((event = parser.next()) != Event.END_OBJECT) {
+            switch (event) {
+                case KEY_NAME:
+                    key = parser.getString();
+                    break;
+                case VALUE_STRING:
+                    field.add(key, parser.getString());
+                    break;
+                case VALUE_NUMBER:
+                    if (parser.isIntegralNumber())
+                        field.add(key, parser.getLong());
+                    else
+                        field.add(key, parser.getBigDecimal());
+                    break;
+                case VALUE_TRUE:
+                    field.add(key, true);
+                    break;
+                case VALUE_FALSE:
+                    field.add(key, false);
+                    break;
+                case VALUE_NULL:
+                    field.addNull(key);
+                    break;
+                case START_ARRAY:
+                    JsonArrayBuilder path = Json.createArrayBuilder();
+                    while (parser.next() == Event.VALUE_STRING)
+                        path.add(parser.getString());
+                    field.add(key, path);
+                    break;
+                default:
+                    throw new JsonParsingException("Unexpected " + event + " in field", parser.getLocation());
+            }
+        }
+        return field.build();
+    }
+
     private IndexableField createField(JsonObject jsonField) throws IOException {
         String name = jsonField.getString("name");
         Field field = null;
@@ -0,0 +1,188 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.StringReader;
+import java.io.StringWriter;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+
+import javax.json.Json;
+import javax.json.JsonArray;
+import javax.json.JsonArrayBuilder;
+import javax.json.stream.JsonGenerator;
+
+import org.apache.lucene.document.Document;
+import org.meresco.lucene.Lucene.TermCount;
+import org.meresco.lucene.numerate.TermNumerator;
+
+/**
+ * The cores of LuceneHttpServer for use inside another process (through the
+ * JCC wrapper), without the HTTP server. Requests and responses use the same
+ * JSON as the corresponding HTTP handlers.
+ */
+public class EmbeddedLucene {
+    private final TermNumerator termNumerator;
+    private final Map<String, Lucene> lucenes = new LinkedHashMap<String, Lucene>();
+    private final MultiLucene multiLucene;
+
+    public EmbeddedLucene(String stateDir, String[] cores) throws IOException {
+        this.termNumerator = new TermNumerator(new File(stateDir, "keys-termnumerator"));
+        for (String core : cores)
+            this.lucenes.put(core, new Lucene(core, new File(stateDir, "lucene-" + core)));
+        this.multiLucene = new MultiLucene(new ArrayList<Lucene>(this.lucenes.values()));
+    }
+
+    public void updateSettings(String core, String settings) throws Exception {
+        Lucene lucene = lucene(core);
+        LuceneSettings luceneSettings = lucene.hasSettings() ? lucene.getSettings() : new LuceneSettings();
+        luceneSettings.updateSettings(new StringReader(settings));
+        if (!lucene.hasSettings())
+            lucene.initSettings(luceneSettings);
+    }
+
+    public String getSettings(String core) throws Exception {
+        Lucene lucene = lucene(core);
+        return (lucene.hasSettings() ? lucene.getSettings() : new LuceneSettings()).asJson().toString();
+    }
+
+    public void addDocument(String core, String identifier, String document) throws Exception {
+        Document doc = new DocumentStringToDocument(new StringReader(document), this.termNumerator).convert();
+        if (identifier == null)
+            lucene(core).addDocument(doc);
+        else
+            lucene(core).addDocument(identifier, doc);
+    }
+
+    public String bulkUpdate(String core, String lines) throws Exception {
+        return BulkUpdate.update(lucene(core), this.termNumerator, new BufferedReader(new StringReader(lines))).toString();
+    }
+
+    public void deleteDocument(String core, String identifier) throws Exception {
+        lucene(core).deleteDocument(identifier);
+    }
+
+    public String executeQuery(String core, String query) throws Exception {
+        Lucene lucene = lucene(core);
+        return asJson(lucene.executeQuery(new QueryData(new StringReader(query), lucene.getQueryConverter())));
+    }
+
+    public String executeQueries(String core, String queries) throws Exception {
+        Lucene lucene = lucene(core);
+        JsonArray jsonQueries = Json.createReader(new StringReader(queries)).readArray();
+        List<QueryData> queryDatas = new ArrayList<QueryData>();
+        for (int i = 0; i < jsonQueries.size(); i++)
+            queryDatas.add(new QueryData(jsonQueries.getJsonObject(i), lucene.getQueryConverter()));
+        return asJson(lucene.executeQueries(queryDatas));
+    }
+
+    public String executeComposedQueries(String queries) throws Exception {
+        JsonArray jsonQueries = Json.createReader(new StringReader(queries)).readArray();
+        List<ComposedQuery> composedQueries = new ArrayList<ComposedQuery>();
+        for (int i = 0; i < jsonQueries.size(); i++)
+            composedQueries.add(ComposedQuery.fromJson(jsonQueries.getJsonObject(i), this.multiLucene.getQueryConverters()));
+        return asJson(this.multiLucene.executeQueries(composedQueries));
+    }
+
+    public String executeComposedQuery(String query) throws Exception {
+        ComposedQuery q = ComposedQuery.fromJsonString(new StringReader(query), this.multiLucene.getQueryConverters());
+        return asJson(this.multiLucene.executeComposedQuery(q));
+    }
+
+    public String prefixSearch(String core, String fieldname, String prefix, int limit) throws Exception {
+        JsonArrayBuilder json = Json.createArrayBuilder();
+        for (TermCount t : lucene(core).termsForField(fieldname, prefix, limit))
+            json.add(Json.createArrayBuilder().add(t.term).add(t.count));
+        return json.build().toString();
+    }
+
+    public String fieldnames(String core) throws Exception {
+        JsonArrayBuilder json = Json.createArrayBuilder();
+        for (String fieldname : lucene(core).fieldnames())
+            json.add(fieldname);
+        return json.build().toString();
+    }
+
+    public String drilldownFieldnames(String core, String dim, String[] path, int limit) throws Exception {
+        JsonArrayBuilder json = Json.createArrayBuilder();
+        for (String fieldname : lucene(core).drilldownFieldnames(limit, dim, path))
+            json.add(fieldname);
+        return json.build().toString();
+    }
+
+    public String similarDocuments(String core, String identifier) throws Exception {
+        return asJson(lucene(core).similarDocuments(identifier));
+    }
+
+    public int numDocs(String core) throws Exception {
+        return lucene(core).numDocs();
+    }
+
+    public String stats(String core) throws Exception {
+        return lucene(core).stats().toString();
+    }
+
+    public void commit() throws Exception {
+        this.termNumerator.commit();
+        for (Lucene lucene : this.lucenes.values())
+            lucene.commit();
+    }
+
+    public void close() throws IOException {
+        this.termNumerator.close();
+        for (Lucene lucene : this.lucenes.values())
+            lucene.close();
+    }
+
+    private Lucene lucene(String core) {
+        Lucene lucene = this.lucenes.get(core);
+        if (lucene == null)
+            throw new IllegalArgumentException("Unknown core: " + core);
+        return lucene;
+    }
+
+    private static String asJson(LuceneResponse response) throws IOException {
+        StringWriter writer = new StringWriter();
+        response.writeJson(writer);
+        return writer.toString();
+    }
+
+    private static String asJson(List<LuceneResponse> responses) throws IOException {
+        StringWriter writer = new StringWriter();
+        JsonGenerator generator = Json.createGenerator(writer);
+        generator.writeStartArray();
+        for (LuceneResponse response : responses)
+            response.write(generator);
+        generator.writeEnd();
+        generator.close();
+        return writer.toString();
+    }
+}
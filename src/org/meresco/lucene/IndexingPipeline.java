@@ -0,0 +1,131 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Future;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.RejectedExecutionHandler;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+
+import javax.json.Json;
+import javax.json.JsonObject;
+
+/**
+ * Bounded queues feeding indexing worker threads. Tasks for the same
+ * identifier always end up at the same worker, so updates and deletes of
+ * one document are applied in the order they were submitted. When a queue
+ * is full, submitting blocks the calling (HTTP) thread.
+ */
+public class IndexingPipeline {
+    private ThreadPoolExecutor[] workers;
+    private int queueSize;
+    private AtomicInteger nextWorker = new AtomicInteger();
+    private AtomicLong documentsIndexed = new AtomicLong();
+    private long startTime = System.currentTimeMillis();
+
+    public IndexingPipeline(int threads, int queueSize) {
+        threads = Math.max(1, threads);
+        this.queueSize = Math.max(1, queueSize / threads);
+        this.workers = new ThreadPoolExecutor[threads];
+        for (int i = 0; i < threads; i++)
+            this.workers[i] = new ThreadPoolExecutor(1, 1, 0, TimeUnit.SECONDS, new ArrayBlockingQueue<Runnable>(this.queueSize), new CallerBlocksPolicy());
+    }
+
+    public Future<Void> submit(String identifier, final Callable<Void> task) {
+        int worker = identifier == null ? nextWorker.getAndIncrement() : identifier.hashCode();
+        return this.workers[(worker & 0x7fffffff) % this.workers.length].submit(new Callable<Void>() {
+            @Override
+            public Void call() throws Exception {
+                task.call();
+                documentsIndexed.incrementAndGet();
+                return null;
+            }
+        });
+    }
+
+    public int queueDepth() {
+        int depth = 0;
+        for (ThreadPoolExecutor worker : this.workers)
+            depth += worker.getQueue().size() + worker.getActiveCount();
+        return depth;
+    }
+
+    public JsonObject stats() {
+        long indexed = documentsIndexed.get();
+        long elapsed = Math.max(1, System.currentTimeMillis() - startTime);
+        return Json.createObjectBuilder()
+            .add("threads", this.workers.length)
+            .add("queueSize", this.queueSize * this.workers.length)
+            .add("queueDepth", queueDepth())
+            .add("documentsIndexed", indexed)
+            .add("documentsPerSecond", indexed * 1000.0 / elapsed)
+            .build();
+    }
+
+    public void close() throws InterruptedException {
+        for (ThreadPoolExecutor worker : this.workers)
+            worker.shutdown();
+        for (ThreadPoolExecutor worker : this.workers)
+            worker.awaitTermination(Long.MAX_VALUE, TimeUnit.MILLISECONDS);
+    }
+
+    public static void waitFor(Future<?> future) throws Exception {
+        try {
+            future.get();
+        } catch (ExecutionException e) {
+            Throwable cause = e.getCause();
+            if (cause instanceof Exception)
+                throw (Exception) cause;
+            if (cause instanceof Error)
+                throw (Error) cause;
+            throw e;
+        }
+    }
+
+    private static class CallerBlocksPolicy implements RejectedExecutionHandler {
+        @Override
+        public void rejectedExecution(Runnable r, ThreadPoolExecutor executor) {
+            if (executor.isShutdown())
+                throw new RejectedExecutionException("Indexing pipeline is closed");
+            try {
+                executor.getQueue().put(r);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                throw new RejectedExecutionException(e);
+            }
+            // close() may have run between the check above and the put; the
+            // worker may be gone already, so nothing would ever run the task.
+            if (executor.isShutdown() && executor.remove(r))
+                throw new RejectedExecutionException("Indexing pipeline is closed");
+        }
+    }
+}
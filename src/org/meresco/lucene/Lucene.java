@@ -28,6 +28,7 @@ package org.meresco.lucene;
 import java.io.File;
 import java.io.IOException;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.Collection;
 import java.util.Collections;
 import java.util.HashMap;
@@ -36,12 +37,27 @@ import java.util.Iterator;
 import java.util.List;
 import java.util.Map;
 import java.util.Set;
-import java.util.Timer;
-import java.util.TimerTask;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.ScheduledFuture;
+import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+
+import javax.json.Json;
+import javax.json.JsonObject;
+import javax.json.JsonObjectBuilder;
 
 import org.apache.commons.collections4.map.LRUMap;
 import org.apache.lucene.document.Document;
 import org.apache.lucene.document.Field.Store;
+import org.apache.lucene.document.SortedDocValuesField;
 import org.apache.lucene.document.StringField;
 import org.apache.lucene.facet.DrillDownQuery;
 import org.apache.lucene.facet.FacetResult;
@@ -57,6 +73,7 @@ import org.apache.lucene.facet.taxonomy.TaxonomyReader.ChildrenIterator;
 import org.apache.lucene.facet.taxonomy.directory.DirectoryTaxonomyReader;
 import org.apache.lucene.facet.taxonomy.directory.DirectoryTaxonomyWriter;
 import org.apache.lucene.facet.taxonomy.writercache.LruTaxonomyWriterCache;
+import org.apache.lucene.index.DirectoryReader;
 import org.apache.lucene.index.Fields;
 import org.apache.lucene.index.IndexReader;
 import org.apache.lucene.index.IndexWriter;
@@ -71,6 +88,7 @@ import org.apache.lucene.queries.CommonTermsQuery;
 import org.apache.lucene.search.BooleanClause.Occur;
 import org.apache.lucene.search.BooleanQuery;
 import org.apache.lucene.search.CachingWrapperFilter;
+import org.apache.lucene.search.FieldDoc;
 import org.apache.lucene.search.Filter;
 import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.search.Query;
@@ -78,13 +96,13 @@ import org.apache.lucene.search.QueryWrapperFilter;
 import org.apache.lucene.search.ReferenceManager.RefreshListener;
 import org.apache.lucene.search.ScoreDoc;
 import org.apache.lucene.search.Sort;
+import org.apache.lucene.search.SortField;
 import org.apache.lucene.search.TermQuery;
 import org.apache.lucene.search.TopDocs;
 import org.apache.lucene.search.spell.DirectSpellChecker;
 import org.apache.lucene.search.spell.SuggestWord;
 import org.apache.lucene.store.MMapDirectory;
 import org.apache.lucene.util.BytesRef;
-import org.apache.lucene.util.OpenBitSet;
 import org.apache.lucene.util.Version;
 import org.meresco.lucene.LuceneResponse.ClusterHit;
 import org.meresco.lucene.LuceneResponse.DedupHit;
@@ -107,19 +125,36 @@ import org.meresco.lucene.search.TopFieldSuperCollector;
 import org.meresco.lucene.search.TopScoreDocSuperCollector;
 import org.meresco.lucene.search.join.AggregateScoreSuperCollector;
 import org.meresco.lucene.search.join.KeySuperCollector;
+import org.meresco.lucene.search.join.KeyValuesCache;
+import org.meresco.lucene.search.join.RoaringBitSet;
 import org.meresco.lucene.search.join.ScoreSuperCollector;
+import org.meresco.lucene.search.join.SegmentKeysCache;
+import org.meresco.lucene.search.join.SegmentScoresCache;
 
 
 public class Lucene {
     public static class UninitializedException extends Exception {}
 
     public static final String ID_FIELD = "__id__";
-    private int commitCount = 0;
-    private Timer commitTimer;
+    // Separate pools, so that a slow (fsync) commit of one core does not
+    // hold up the near real time refreshes of the others.
+    private static final ScheduledExecutorService commitScheduler = Executors.newScheduledThreadPool(2, daemonThreadFactory("lucene-commit-scheduler"));
+    private static final ScheduledExecutorService refreshScheduler = Executors.newScheduledThreadPool(2, daemonThreadFactory("lucene-refresh-scheduler"));
+    private AtomicInteger pendingUpdates = new AtomicInteger();
+    private AtomicLong updateSequence = new AtomicLong();
+    private AtomicLong committedSequence = new AtomicLong();
+    private Object scheduleLock = new Object();
+    private ScheduledFuture<?> commitFuture;
+    private ScheduledFuture<?> refreshFuture;
+    private Object groupCommitLock = new Object();
+    private ScheduledFuture<?> groupCommitFuture;
+    private CommitStats commitStats = new CommitStats();
+    private volatile boolean closed;
     public String name;
     private File stateDir;
-    private Map<String, CachedOrdinalsReader> cachedOrdinalsReader = new HashMap<String, CachedOrdinalsReader>();
+    private ConcurrentMap<String, CachedOrdinalsReader> cachedOrdinalsReader = new ConcurrentHashMap<String, CachedOrdinalsReader>();
     private DirectSpellChecker spellChecker = new DirectSpellChecker();
+    private SearcherWarmer warmer = new SearcherWarmer(this);
     LuceneData data = new LuceneData();
 
     public Lucene(String name, File stateDir) {
@@ -138,7 +173,8 @@ public class Lucene {
     }
 
     public void initSettings(LuceneSettings settings) throws Exception {
-        data.initSettings(stateDir, settings);
+        data.initSettings(stateDir, settings, warmer);
+        ParallelTasks.ensureMaxThreads(settings.numberOfConcurrentTasks);
     }
 
     public LuceneSettings getSettings() throws Exception {
@@ -150,59 +186,198 @@ public class Lucene {
     }
 
     public synchronized void close() throws IOException {
-        if (commitTimer != null)
-            commitTimer.cancel();
+        closed = true;
+        cancelScheduled(true, true);
         this.data.close();
     }
 
-    public void addDocument(Document doc) throws Exception {
-        doc = data.getFacetsConfig().build(data.getTaxoWriter(), doc);
-        data.getIndexWriter().addDocument(doc);
+    public void addDocument(final Document doc) throws Exception {
+        IndexingPipeline.waitFor(data.getIndexingPipeline().submit(null, new Callable<Void>() {
+            @Override
+            public Void call() throws Exception {
+                data.getIndexWriter().addDocument(data.getFacetsConfig().build(data.getTaxoWriter(), doc));
+                return null;
+            }
+        }));
         commit();
     }
 
     public void addDocument(String identifier, Document doc) throws Exception {
+        IndexingPipeline.waitFor(submitUpdateDocument(identifier, doc));
+        commit();
+    }
+
+    public void deleteDocument(String identifier) throws Exception {
+        IndexingPipeline.waitFor(submitRemoveDocument(identifier));
+        commit();
+    }
+
+    public Future<Void> submitUpdateDocument(final String identifier, final Document doc) throws Exception {
+        return data.getIndexingPipeline().submit(identifier, new Callable<Void>() {
+            @Override
+            public Void call() throws Exception {
+                updateDocument(identifier, doc);
+                return null;
+            }
+        });
+    }
+
+    public Future<Void> submitRemoveDocument(final String identifier) throws Exception {
+        return data.getIndexingPipeline().submit(identifier, new Callable<Void>() {
+            @Override
+            public Void call() throws Exception {
+                removeDocument(identifier);
+                return null;
+            }
+        });
+    }
+
+    public void updateDocument(String identifier, Document doc) throws Exception {
         doc.add(new StringField(ID_FIELD, identifier, Store.YES));
+        doc.add(new SortedDocValuesField(ID_FIELD, new BytesRef(identifier)));
         doc = data.getFacetsConfig().build(data.getTaxoWriter(), doc);
         data.getIndexWriter().updateDocument(new Term(ID_FIELD, identifier), doc);
-        commit();
     }
 
-    public void deleteDocument(String identifier) throws Exception {
+    public void removeDocument(String identifier) throws Exception {
         data.getIndexWriter().deleteDocuments(new Term(ID_FIELD, identifier));
-        commit();
     }
 
     public void commit() throws Exception {
-        commitCount++;
+        commit(1);
+    }
+
+    /**
+     * Accounts count updates (one per document, also for a bulk update)
+     * toward commitCount and schedules the commit and refresh.
+     */
+    public void commit(int count) throws Exception {
+        int pending = pendingUpdates.addAndGet(count);
+        long sequence = updateSequence.addAndGet(count);
         LuceneSettings settings = data.getSettings();
-        if (commitCount >= settings.commitCount) {
-            realCommit();
+        if (pending >= settings.commitCount) {
+            groupCommit(sequence, settings);
             return;
         }
-        if (commitTimer == null) {
-            TimerTask timerTask = new TimerTask() {
+        scheduleCommit(settings);
+        scheduleRefresh(settings);
+    }
+
+    private void scheduleCommit(LuceneSettings settings) {
+        synchronized (scheduleLock) {
+            if (closed || commitFuture != null)
+                return;
+            commitFuture = commitScheduler.schedule(new Runnable() {
                 public void run() {
                     try {
                         realCommit();
                     } catch (Exception e) {
-                        throw new RuntimeException();
+                        // recorded in commitStats and rescheduled by realCommit
                     }
                 }
-            };
-            commitTimer = new Timer();
-            commitTimer.schedule(timerTask, settings.commitTimeout * 1000);
+            }, settings.commitTimeout, TimeUnit.SECONDS);
         }
     }
 
+    private void scheduleRefresh(LuceneSettings settings) {
+        synchronized (scheduleLock) {
+            if (closed || refreshFuture != null || settings.refreshInterval <= 0)
+                return;
+            refreshFuture = refreshScheduler.schedule(new Runnable() {
+                public void run() {
+                    try {
+                        refresh();
+                    } catch (Exception e) {
+                        // recorded in commitStats and rescheduled by refresh
+                    }
+                }
+            }, (long) (settings.refreshInterval * 1000), TimeUnit.MILLISECONDS);
+        }
+    }
+
+    /**
+     * Waits until the updates up to sequence are committed. The commit runs
+     * on the commit scheduler after groupCommitWindow; threads arriving
+     * before it starts share it, later ones wait for the next one.
+     */
+    private void groupCommit(long sequence, LuceneSettings settings) throws Exception {
+        while (committedSequence.get() < sequence) {
+            Future<?> future;
+            synchronized (groupCommitLock) {
+                if (groupCommitFuture == null || groupCommitFuture.isDone()) {
+                    groupCommitFuture = commitScheduler.schedule(new Callable<Void>() {
+                        public Void call() throws Exception {
+                            realCommit();
+                            return null;
+                        }
+                    }, (long) (settings.groupCommitWindow * 1000), TimeUnit.MILLISECONDS);
+                }
+                future = groupCommitFuture;
+            }
+            try {
+                future.get();
+            } catch (ExecutionException e) {
+                if (e.getCause() instanceof Exception)
+                    throw (Exception) e.getCause();
+                throw e;
+            }
+        }
+    }
+
+    private static ThreadFactory daemonThreadFactory(final String name) {
+        return new ThreadFactory() {
+            public Thread newThread(Runnable r) {
+                Thread thread = new Thread(r, name);
+                thread.setDaemon(true);
+                return thread;
+            }
+        };
+    }
+
+    /**
+     * Commits all updates so far. The pending updates are only accounted as
+     * committed when the commit succeeds; a failed commit is recorded in the
+     * commit stats and scheduled again.
+     */
     public synchronized void realCommit() throws Exception {
-        commitCount = 0;
-        if (commitTimer != null) {
-            commitTimer.cancel();
-            commitTimer.purge();
-            commitTimer = null;
+        long sequence = updateSequence.get();
+        int pending = pendingUpdates.get();
+        cancelScheduled(true, true);
+        long t0 = System.currentTimeMillis();
+        try {
+            data.commit();
+        } catch (Exception e) {
+            commitStats.commitFailed(e);
+            scheduleCommit(data.getSettings());
+            scheduleRefresh(data.getSettings());
+            throw e;
+        }
+        pendingUpdates.addAndGet(-pending);
+        commitStats.add(System.currentTimeMillis() - t0, sequence - committedSequence.getAndSet(sequence));
+    }
+
+    public synchronized void refresh() throws Exception {
+        cancelScheduled(false, true);
+        try {
+            data.refresh();
+        } catch (Exception e) {
+            commitStats.refreshFailed(e);
+            scheduleRefresh(data.getSettings());
+            throw e;
+        }
+    }
+
+    private void cancelScheduled(boolean commit, boolean refresh) {
+        synchronized (scheduleLock) {
+            if (commit && commitFuture != null) {
+                commitFuture.cancel(false);
+                commitFuture = null;
+            }
+            if (refresh && refreshFuture != null) {
+                refreshFuture.cancel(false);
+                refreshFuture = null;
+            }
         }
-        data.commit();
     }
 
     public LuceneResponse executeQuery(QueryData q) throws Exception {
@@ -230,47 +405,59 @@ public class Lucene {
         return executeQuery(q, null, null, null, null, null);
     }
 
+    public List<LuceneResponse> executeQueries(List<QueryData> queries) throws Exception {
+        List<Callable<LuceneResponse>> tasks = new ArrayList<>();
+        for (final QueryData q : queries)
+            tasks.add(new Callable<LuceneResponse>() {
+                public LuceneResponse call() throws Exception {
+                    return executeQuery(q);
+                }
+            });
+        return ParallelTasks.invokeAll(tasks);
+    }
+
     public LuceneResponse executeQuery(QueryData q, List<Query> filterQueries, List<String[]> drilldownQueries, List<Filter> filters, List<AggregateScoreSuperCollector> scoreCollectors, Collection<KeySuperCollector> keyCollectors) throws Exception {
         int totalHits;
         List<LuceneResponse.Hit> hits;
         Collectors collectors = null;
         Map<String, Long> times = new HashMap<>();
         long t0 = System.currentTimeMillis();
-        int topCollectorStop = q.stop;
+        long deadline = q.timeAllowed > 0 ? t0 + q.timeAllowed : 0;
+        boolean complete;
         SearcherAndTaxonomy reference = data.getManager().acquire();
         try {
-            while (true) {
-                collectors = createCollectors(q, topCollectorStop, keyCollectors, scoreCollectors, reference);
-                Filter f = filtersFor(filterQueries, filters == null ? null : filters.toArray(new Filter[0]));
-
-                Query query = q.query;
-                if (drilldownQueries != null)
-                    query = createDrilldownQuery(query, drilldownQueries);
-                long t1 = System.currentTimeMillis();
-                ((SuperIndexSearcher) reference.searcher).search(query, f, collectors.root);
-                times.put("searchTime", System.currentTimeMillis() - t1);
-
-                totalHits = collectors.topCollector.getTotalHits();
-                if (q.clustering) {
-                    ClusterConfig clusterConfig = q.clusterConfig;
-                    if (clusterConfig == null) {
-                    	clusterConfig = data.getSettings().clusterConfig;
-                    }
-                    t1 = System.currentTimeMillis();
-                    hits = clusterTopDocsResponse(q, collectors, times, reference.searcher.getIndexReader(), clusterConfig);
-                    times.put("totalClusterTime", System.currentTimeMillis() - t1);
-                } else {
-                    t1 = System.currentTimeMillis();
-                    hits = topDocsResponse(q, collectors);
-                    times.put("topDocsTime", System.currentTimeMillis() - t1);
-                }
+            long readerVersion = ((DirectoryReader) reference.searcher.getIndexReader()).getVersion();
+            QueryResultCache resultCache = data.getQueryResultCache();
+            List<Object> cacheKey = null;
+            if (resultCache.isEnabled() && filters == null && scoreCollectors == null && keyCollectors == null && !q.clustering) {
+                cacheKey = QueryResultCache.keyFor(readerVersion, q, filterQueries, drilldownQueries);
+                LuceneResponse cached = resultCache.get(cacheKey);
+                if (cached != null)
+                    return QueryResultCache.copyOf(cached, System.currentTimeMillis() - t0);
+            }
+            collectors = createCollectors(q, keyCollectors, scoreCollectors, reference);
+            Filter f = filtersFor(filterQueries, filters == null ? null : filters.toArray(new Filter[0]));
 
-                if (hits.size() == q.stop - q.start || topCollectorStop >= totalHits)
-                    break;
-                topCollectorStop *= 10;
-                if (topCollectorStop > 10000) {
-                    break;
+            Query query = q.query;
+            if (drilldownQueries != null)
+                query = createDrilldownQuery(query, drilldownQueries);
+            long t1 = System.currentTimeMillis();
+            complete = ((SuperIndexSearcher) reference.searcher).search(query, f, collectors.root, deadline);
+            times.put("searchTime", System.currentTimeMillis() - t1);
+
+            totalHits = collectors.groupingCollector != null ? collectors.groupingCollector.getTotalHits() : collectors.topCollector.getTotalHits();
+            if (q.clustering && complete) {
+                ClusterConfig clusterConfig = q.clusterConfig;
+                if (clusterConfig == null) {
+                	clusterConfig = data.getSettings().clusterConfig;
                 }
+                t1 = System.currentTimeMillis();
+                hits = clusterTopDocsResponse(q, collectors, times, reference.searcher.getIndexReader(), clusterConfig);
+                times.put("totalClusterTime", System.currentTimeMillis() - t1);
+            } else {
+                t1 = System.currentTimeMillis();
+                hits = topDocsResponse(q, collectors, totalHits);
+                times.put("topDocsTime", System.currentTimeMillis() - t1);
             }
 
             LuceneResponse response = new LuceneResponse(totalHits);
@@ -278,6 +465,16 @@ public class Lucene {
                 response.totalWithDuplicates = collectors.dedupCollector.getTotalHits();
 
             response.hits = hits;
+            response.partial = !complete;
+            if (collectors.lastScoreDoc != null && hits.size() == q.stop - q.start)
+                response.cursor = SearchCursor.encode(collectors.lastScoreDoc);
+            response.passes = 1;
+            if (collectors.groupingCollector != null)
+                response.hitsCollected = collectors.groupingCollector.getTotalHits();
+            else if (collectors.dedupCollector != null)
+                response.hitsCollected = collectors.dedupCollector.getTotalHits();
+            else
+                response.hitsCollected = collectors.topCollector.getTotalHits();
 
             if (collectors.facetCollector != null) {
                 long t1 = System.currentTimeMillis();
@@ -295,6 +492,8 @@ public class Lucene {
             }
             response.times = times;
             response.queryTime = System.currentTimeMillis() - t0;
+            if (cacheKey != null && complete)
+                resultCache.put(cacheKey, response);
             return response;
         } finally {
             data.getManager().release(reference);
@@ -347,9 +546,7 @@ public class Lucene {
         return hits;
     }
 
-    private List<Hit> topDocsResponse(QueryData q, Collectors collectors) throws Exception {
-        int totalHits = collectors.topCollector.getTotalHits();
-
+    private List<Hit> topDocsResponse(QueryData q, Collectors collectors, int totalHits) throws Exception {
         DeDupFilterSuperCollector dedupCollector = collectors.dedupCollector;
         GroupSuperCollector groupingCollector = collectors.groupingCollector;
 
@@ -393,6 +590,7 @@ public class Lucene {
             } else {
                 Hit hit = new Hit(getDocument(scoreDoc.doc).get(ID_FIELD), scoreDoc.score);
                 hits.add(hit);
+                collectors.lastScoreDoc = scoreDoc;
             }
             count++;
         }
@@ -450,22 +648,23 @@ public class Lucene {
 
     }
 
-    private Collectors createCollectors(QueryData q, int stop, Collection<KeySuperCollector> keyCollectors, List<AggregateScoreSuperCollector> scoreCollectors, SearcherAndTaxonomy reference) throws Exception {
+    private Collectors createCollectors(QueryData q, Collection<KeySuperCollector> keyCollectors, List<AggregateScoreSuperCollector> scoreCollectors, SearcherAndTaxonomy reference) throws Exception {
         Collectors allCollectors = new Collectors();
         SuperCollector<?> resultsCollector;
         if (q.clustering) {
-            allCollectors.topCollector = topCollector(q.start, stop + data.getSettings().clusterConfig.clusterMoreRecords, q.sort);
+            allCollectors.topCollector = topCollector(q.start, q.stop + data.getSettings().clusterConfig.clusterMoreRecords, q.sort);
             resultsCollector = allCollectors.topCollector;
         } else if (q.groupingField != null) {
-            allCollectors.topCollector = topCollector(q.start, stop * 10, q.sort);
-            allCollectors.groupingCollector = new GroupSuperCollector(q.groupingField, allCollectors.topCollector);
+            // the best of each group is collected after the search, so out of order
+            allCollectors.topCollector = topCollector(q.start, q.stop, q.sort, null, false);
+            allCollectors.groupingCollector = new GroupSuperCollector(q.groupingField, allCollectors.topCollector, q.sort, true);
             resultsCollector = allCollectors.groupingCollector;
         } else if (q.dedupField != null) {
-            allCollectors.topCollector = topCollector(q.start, stop, q.sort);
+            allCollectors.topCollector = topCollector(q.start, q.stop, q.sort);
             allCollectors.dedupCollector = new DeDupFilterSuperCollector(q.dedupField, q.dedupSortField, allCollectors.topCollector);
             resultsCollector = allCollectors.dedupCollector;
         } else {
-            allCollectors.topCollector = topCollector(q.start, stop, q.sort);
+            allCollectors.topCollector = topCollector(q.start, q.stop, withIdTieBreak(q.sort), q.searchAfter);
             resultsCollector = allCollectors.topCollector;
         }
         allCollectors.facetCollector = facetCollector(q.facets, reference.taxonomyReader);
@@ -489,13 +688,35 @@ public class Lucene {
     }
 
     private TopDocSuperCollector topCollector(int start, int stop, Sort sort) {
+        return topCollector(start, stop, sort, null);
+    }
+
+    /**
+     * The sort (relevance when null) followed by the identifier. The sort
+     * values of a hit then name one document, which a cursor can resume
+     * after also when the index changed in between pages.
+     */
+    static Sort withIdTieBreak(Sort sort) {
+        SortField[] sortFields = sort == null ? new SortField[] { SortField.FIELD_SCORE } : sort.getSort();
+        SortField[] result = Arrays.copyOf(sortFields, sortFields.length + 1);
+        result[sortFields.length] = new SortField(ID_FIELD, SortField.Type.STRING);
+        return new Sort(result);
+    }
+
+    private TopDocSuperCollector topCollector(int start, int stop, Sort sort, ScoreDoc searchAfter) {
+        return topCollector(start, stop, sort, searchAfter, true);
+    }
+
+    private TopDocSuperCollector topCollector(int start, int stop, Sort sort, ScoreDoc searchAfter, boolean docsScoredInOrder) {
         if (stop <= start)
             //TODO: temp fix for start/stop = 0; You should use TotalHitCountSuperCollector
-            return new TopScoreDocSuperCollector(stop == 0 ? 1 : stop, true);
+            return new TopScoreDocSuperCollector(stop == 0 ? 1 : stop, docsScoredInOrder);
 //            return new TotalHitCountSuperCollector();
         if (sort == null)
-            return new TopScoreDocSuperCollector(stop, true);
-        return new TopFieldSuperCollector(sort, stop, true, false, true);
+            return new TopScoreDocSuperCollector(stop, searchAfter, docsScoredInOrder);
+        if (searchAfter != null && !(searchAfter instanceof FieldDoc))
+            throw new IllegalArgumentException("Cursor was not created with sort keys");
+        return new TopFieldSuperCollector(sort, stop, (FieldDoc) searchAfter, true, false, docsScoredInOrder);
     }
 
     private FacetSuperCollector facetCollector(List<FacetRequest> facets, TaxonomyReader taxonomyReader) throws Exception {
@@ -516,12 +737,17 @@ public class Lucene {
         return indexFieldnames.toArray(new String[0]);
     }
 
-    private OrdinalsReader getOrdinalsReader(String indexFieldname) {
-        CachedOrdinalsReader reader = cachedOrdinalsReader.get(indexFieldname);
+    // Not synchronized on this: that is held by commits and refreshes,
+    // which warm the new searcher with facet queries.
+    OrdinalsReader getOrdinalsReader(String indexFieldname) {
+        String key = indexFieldname == null ? "" : indexFieldname;
+        CachedOrdinalsReader reader = cachedOrdinalsReader.get(key);
         if (reader == null) {
             DocValuesOrdinalsReader docValuesReader = indexFieldname == null ? new DocValuesOrdinalsReader() : new DocValuesOrdinalsReader(indexFieldname);
             reader = new CachedOrdinalsReader(docValuesReader);
-            cachedOrdinalsReader.put(indexFieldname, reader);
+            CachedOrdinalsReader existing = cachedOrdinalsReader.putIfAbsent(key, reader);
+            if (existing != null)
+                reader = existing;
         }
         return reader;
     }
@@ -597,6 +823,16 @@ public class Lucene {
         }
     }
 
+    public JsonObject stats() throws Exception {
+        return Json.createObjectBuilder()
+            .add("indexing", data.getIndexingPipeline().stats())
+            .add("commit", commitStats.asJson(pendingUpdates.get()))
+            .add("queryResultCache", data.getQueryResultCache().stats())
+            .add("warming", warmer.stats())
+            .add("keyValuesCache", KeyValuesCache.stats())
+            .build();
+    }
+
     public int numDocs() throws Exception {
         return this.data.getIndexWriter().numDocs();
     }
@@ -655,24 +891,39 @@ public class Lucene {
         }
     }
 
-    public OpenBitSet collectKeys(Query filterQuery, String keyName, Query query) throws Exception {
+    public long readerVersion() throws Exception {
+        SearcherAndTaxonomy reference = data.getManager().acquire();
+        try {
+            return ((DirectoryReader) reference.searcher.getIndexReader()).getVersion();
+        } finally {
+            data.getManager().release(reference);
+        }
+    }
+
+    public RoaringBitSet collectKeys(Query filterQuery, String keyName, Query query) throws Exception {
         return collectKeys(filterQuery, keyName, query, true);
     }
 
-    public OpenBitSet collectKeys(Query filterQuery, String keyName, Query query, boolean cacheCollectedKeys) throws Exception {
-        if (cacheCollectedKeys) {
+    public RoaringBitSet collectKeys(Query filterQuery, String keyName, Query query, boolean cacheCollectedKeys) throws Exception {
+        warmer.registerKeyField(keyName);
+        if (cacheCollectedKeys && query == null) {
             KeyNameQuery keyNameQuery = new KeyNameQuery(keyName, filterQuery);
-            OpenBitSet keys = data.getKeyCollectorCache().get(keyNameQuery);
-            if (keys == null) {
-                keys = doCollectKeys(filterQuery, keyName, query);
-                data.getKeyCollectorCache().put(keyNameQuery, keys);
+            SegmentKeysCache keysCache = data.getKeyCollectorCache().get(keyNameQuery);
+            if (keysCache == null) {
+                keysCache = new SegmentKeysCache(filterQuery(filterQuery), keyName);
+                data.getKeyCollectorCache().put(keyNameQuery, keysCache);
+            }
+            SearcherAndTaxonomy reference = data.getManager().acquire();
+            try {
+                return keysCache.keys((DirectoryReader) reference.searcher.getIndexReader());
+            } finally {
+                data.getManager().release(reference);
             }
-            return keys;
         }
         return doCollectKeys(filterQuery, keyName, query);
     }
 
-    private OpenBitSet doCollectKeys(Query filterQuery, String keyName, Query query) throws Exception {
+    private RoaringBitSet doCollectKeys(Query filterQuery, String keyName, Query query) throws Exception {
         KeySuperCollector keyCollector = new KeySuperCollector(keyName);
         if (query == null)
             query = new MatchAllDocsQuery();
@@ -692,18 +943,28 @@ public class Lucene {
         return q;
     }
 
+    public void registerKeyField(String keyName) {
+        warmer.registerKeyField(keyName);
+    }
+
     public QueryConverter getQueryConverter() throws Exception {
         return new QueryConverter(this.data.getFacetsConfig());
     }
 
     public ScoreSuperCollector scoreCollector(String keyName, Query query) throws Exception {
+        warmer.registerKeyField(keyName);
         KeyNameQuery keyNameQuery = new KeyNameQuery(keyName, query);
-        ScoreSuperCollector scoreCollector = data.getScoreCollectorCache().get(keyNameQuery);
-        if (scoreCollector == null) {
-            scoreCollector = doScoreCollecting(keyName, query);
-            data.getScoreCollectorCache().put(keyNameQuery, scoreCollector);
+        SegmentScoresCache scoresCache = data.getScoreCollectorCache().get(keyNameQuery);
+        if (scoresCache == null) {
+            scoresCache = new SegmentScoresCache(query, keyName);
+            data.getScoreCollectorCache().put(keyNameQuery, scoresCache);
+        }
+        SearcherAndTaxonomy reference = data.getManager().acquire();
+        try {
+            return scoresCache.scoreCollector(reference.searcher);
+        } finally {
+            data.getManager().release(reference);
         }
-        return scoreCollector;
     }
 
     public ScoreSuperCollector doScoreCollecting(String keyName, Query query) throws Exception {
@@ -768,6 +1029,54 @@ public class Lucene {
         public TopDocSuperCollector topCollector;
         public FacetSuperCollector facetCollector;
         public SuperCollector<?> root;
+        public ScoreDoc lastScoreDoc;
+    }
+
+    static class CommitStats {
+        private long commits;
+        private long totalCommitTime;
+        private long lastCommitTime;
+        private long totalBatchSize;
+        private long lastBatchSize;
+        private long failedCommits;
+        private long failedRefreshes;
+        private String lastCommitError;
+        private String lastRefreshError;
+
+        synchronized void add(long commitTime, long batchSize) {
+            commits++;
+            totalCommitTime += commitTime;
+            lastCommitTime = commitTime;
+            totalBatchSize += batchSize;
+            lastBatchSize = batchSize;
+        }
+
+        synchronized void commitFailed(Exception e) {
+            failedCommits++;
+            lastCommitError = String.valueOf(e);
+        }
+
+        synchronized void refreshFailed(Exception e) {
+            failedRefreshes++;
+            lastRefreshError = String.valueOf(e);
+        }
+
+        synchronized JsonObject asJson(int pendingUpdates) {
+            JsonObjectBuilder builder = Json.createObjectBuilder()
+                .add("commits", commits)
+                .add("pendingUpdates", pendingUpdates)
+                .add("lastCommitTime", lastCommitTime)
+                .add("averageCommitTime", commits == 0 ? 0.0 : (double) totalCommitTime / commits)
+                .add("lastBatchSize", lastBatchSize)
+                .add("averageBatchSize", commits == 0 ? 0.0 : (double) totalBatchSize / commits)
+                .add("failedCommits", failedCommits)
+                .add("failedRefreshes", failedRefreshes);
+            if (lastCommitError != null)
+                builder.add("lastCommitError", lastCommitError);
+            if (lastRefreshError != null)
+                builder.add("lastRefreshError", lastRefreshError);
+            return builder.build();
+        }
     }
 
     public class TermCount {
@@ -808,24 +1117,35 @@ public class Lucene {
         private DirectoryTaxonomyWriter taxoWriter;
         private LuceneSettings settings;
         private Map<Query, Filter> filterCache;
-        private Map<KeyNameQuery, ScoreSuperCollector> scoreCollectorCache;
-        private Map<KeyNameQuery, OpenBitSet> keyCollectorCache;
+        private Map<KeyNameQuery, SegmentScoresCache> scoreCollectorCache;
+        private Map<KeyNameQuery, SegmentKeysCache> keyCollectorCache;
+        private QueryResultCache queryResultCache;
         private SearcherTaxonomyManager manager;
+        private IndexingPipeline indexingPipeline;
         private LuceneRefreshListener refreshListener = new LuceneRefreshListener();
 
         public void commit() throws Exception {
             this.indexWriter.commit();
             this.taxoWriter.commit();
+            refresh();
+        }
+
+        public void refresh() throws Exception {
             this.manager.maybeRefreshBlocking();
-            if (this.refreshListener.isRefreshed()) {
-                this.scoreCollectorCache.clear();
-                this.keyCollectorCache.clear();
-            }
+            if (this.refreshListener.isRefreshed())
+                this.queryResultCache.clear();
         }
 
         public void close() throws IOException {
             if (this.settings == null)
                 return;
+            if (this.indexingPipeline != null) {
+                try {
+                    this.indexingPipeline.close();
+                } catch (InterruptedException e) {
+                    throw new IOException(e);
+                }
+            }
             if (this.manager != null)
                 this.manager.close();
             if (this.taxoWriter != null)
@@ -834,7 +1154,7 @@ public class Lucene {
                 this.indexWriter.close();
         }
 
-        public void initSettings(File stateDir, LuceneSettings settings) throws Exception {
+        public void initSettings(File stateDir, LuceneSettings settings, SearcherWarmer warmer) throws Exception {
             if (this.settings != null)
                 throw new Exception("Init settings is only allowed once");
             this.settings = settings;
@@ -858,11 +1178,13 @@ public class Lucene {
             this.taxoWriter.commit();
 
             this.filterCache = Collections.synchronizedMap(new LRUMap<Query, Filter>(50));
-            this.scoreCollectorCache = Collections.synchronizedMap(new LRUMap<KeyNameQuery, ScoreSuperCollector>(50));
-            this.keyCollectorCache = Collections.synchronizedMap(new LRUMap<KeyNameQuery, OpenBitSet>(50));
+            this.scoreCollectorCache = Collections.synchronizedMap(new LRUMap<KeyNameQuery, SegmentScoresCache>(50));
+            this.keyCollectorCache = Collections.synchronizedMap(new LRUMap<KeyNameQuery, SegmentKeysCache>(50));
+            this.queryResultCache = new QueryResultCache(settings.queryResultCacheSize, settings.queryResultCacheMaxBytes);
 
-            this.manager = new SearcherTaxonomyManager(indexDirectory, taxoDirectory, new MerescoSearchFactory(indexDirectory, taxoDirectory, settings));
+            this.manager = new SearcherTaxonomyManager(this.indexWriter, true, new MerescoSearchFactory(indexDirectory, taxoDirectory, settings, warmer), this.taxoWriter);
             this.manager.addListener(refreshListener);
+            this.indexingPipeline = new IndexingPipeline(settings.indexingThreads, settings.indexingQueueSize);
         }
 
         public IndexWriter getIndexWriter() throws UninitializedException {
@@ -899,24 +1221,36 @@ public class Lucene {
             return filterCache;
         }
 
-        public Map<KeyNameQuery, ScoreSuperCollector> getScoreCollectorCache() throws UninitializedException {
+        public Map<KeyNameQuery, SegmentScoresCache> getScoreCollectorCache() throws UninitializedException {
             if (this.settings == null)
                 throw new UninitializedException();
             return scoreCollectorCache;
         }
 
-        public Map<KeyNameQuery, OpenBitSet> getKeyCollectorCache() throws UninitializedException {
+        public Map<KeyNameQuery, SegmentKeysCache> getKeyCollectorCache() throws UninitializedException {
             if (this.settings == null)
                 throw new UninitializedException();
             return keyCollectorCache;
         }
 
+        public QueryResultCache getQueryResultCache() throws UninitializedException {
+            if (this.settings == null)
+                throw new UninitializedException();
+            return queryResultCache;
+        }
+
         public SearcherTaxonomyManager getManager() throws UninitializedException {
             if (this.settings == null)
                 throw new UninitializedException();
             return manager;
         }
 
+        public IndexingPipeline getIndexingPipeline() throws UninitializedException {
+            if (this.settings == null)
+                throw new UninitializedException();
+            return indexingPipeline;
+        }
+
         private class LuceneRefreshListener implements RefreshListener {
             private boolean refreshed;
 
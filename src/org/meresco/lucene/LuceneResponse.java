@@ -25,6 +25,9 @@
 
 package org.meresco.lucene;
 
+import java.io.StringReader;
+import java.io.StringWriter;
+import java.io.Writer;
 import java.util.ArrayList;
 import java.util.Arrays;
 import java.util.HashMap;
@@ -32,16 +35,14 @@ import java.util.List;
 import java.util.Map;
 
 import javax.json.Json;
-import javax.json.JsonArrayBuilder;
 import javax.json.JsonObject;
-import javax.json.JsonObjectBuilder;
-import javax.json.JsonValue;
+import javax.json.stream.JsonGenerator;
 
 import org.apache.lucene.search.spell.SuggestWord;
-import org.apache.lucene.util.OpenBitSet;
 import org.meresco.lucene.search.MerescoCluster;
 import org.meresco.lucene.search.MerescoCluster.DocScore;
 import org.meresco.lucene.search.MerescoCluster.TermScore;
+import org.meresco.lucene.search.join.RoaringBitSet;
 
 public class LuceneResponse {
     public int total;
@@ -51,7 +52,11 @@ public class LuceneResponse {
     public long queryTime = 0;
     public Map<String,SuggestWord[]> suggestions = new HashMap<>();
     public Map<String, Long> times = new HashMap<>();
-    public OpenBitSet keys;
+    public RoaringBitSet keys;
+    public boolean partial = false;
+    public int passes = 0;
+    public long hitsCollected = 0; // docs seen by the grouping, dedup or top collector
+    public String cursor;
 
     public LuceneResponse(int totalHits) {
         total = totalHits;
@@ -144,101 +149,131 @@ public class LuceneResponse {
         }
     }
 
+    /**
+     * @deprecated writes and parses the whole response again; use
+     *             writeJson(Writer) or write(JsonGenerator) instead.
+     */
+    @Deprecated
     public JsonObject toJson() {
-        JsonObjectBuilder jsonBuilder = Json.createObjectBuilder()
-                .add("total", total)
-                .add("queryTime", queryTime);
+        StringWriter writer = new StringWriter();
+        writeJson(writer);
+        return Json.createReader(new StringReader(writer.toString())).readObject();
+    }
+
+    public void writeJson(Writer writer) {
+        JsonGenerator generator = Json.createGenerator(writer);
+        write(generator);
+        generator.close();
+    }
+
+    public void write(JsonGenerator generator) {
+        generator.writeStartObject()
+                .write("total", total)
+                .write("queryTime", queryTime);
 
-        JsonArrayBuilder hitsArray = Json.createArrayBuilder();
+        generator.writeStartArray("hits");
         for (Hit hit : hits) {
-            JsonObjectBuilder hitBuilder = Json.createObjectBuilder()
-                    .add("score", hit.score);
+            generator.writeStartObject()
+                    .write("score", hit.score);
             if (hit.id == null)
-                hitBuilder.add("id", JsonValue.NULL);
+                generator.writeNull("id");
             else
-                hitBuilder.add("id", hit.id);
-                    
+                generator.write("id", hit.id);
+
             if (hit instanceof DedupHit) {
-                DedupHit dedupHit = (DedupHit) hit; 
-                hitBuilder.add("duplicateCount", Json.createObjectBuilder()
-                    .add(dedupHit.duplicateField, dedupHit.duplicateCount));
+                DedupHit dedupHit = (DedupHit) hit;
+                generator.writeStartObject("duplicateCount")
+                    .write(dedupHit.duplicateField, dedupHit.duplicateCount)
+                    .writeEnd();
             } else if (hit instanceof GroupingHit) {
                 GroupingHit groupingHit = (GroupingHit) hit;
-                JsonArrayBuilder duplicatesBuilder = Json.createArrayBuilder();
+                generator.writeStartObject("duplicates").writeStartArray(groupingHit.groupingField);
                 for (String id : groupingHit.duplicates)
-                    duplicatesBuilder.add(Json.createObjectBuilder().add("id", id));
-                hitBuilder.add("duplicates", Json.createObjectBuilder()
-                    .add(groupingHit.groupingField, duplicatesBuilder));
+                    generator.writeStartObject().write("id", id).writeEnd();
+                generator.writeEnd().writeEnd();
             } else if (hit instanceof ClusterHit) {
                 ClusterHit clusterHit = (ClusterHit) hit;
-                JsonArrayBuilder topDocsBuilder = Json.createArrayBuilder();
+                generator.writeStartObject("duplicates").writeStartArray("topDocs");
                 for (DocScore docScore : clusterHit.topDocs) {
-                    topDocsBuilder.add(Json.createObjectBuilder()
-                        .add("id", docScore.identifier)
-                        .add("score", docScore.score));
+                    generator.writeStartObject()
+                        .write("id", docScore.identifier)
+                        .write("score", docScore.score)
+                        .writeEnd();
                 }
-                JsonArrayBuilder topTermsBuilder = Json.createArrayBuilder();
+                generator.writeEnd().writeStartArray("topTerms");
                 for (TermScore termScore : clusterHit.topTerms) {
-                    topTermsBuilder.add(Json.createObjectBuilder()
-                        .add("term", termScore.term)
-                        .add("score", termScore.score));
+                    generator.writeStartObject()
+                        .write("term", termScore.term)
+                        .write("score", termScore.score)
+                        .writeEnd();
                 }
-                hitBuilder.add("duplicates", Json.createObjectBuilder()
-                        .add("topDocs", topDocsBuilder)
-                        .add("topTerms", topTermsBuilder));
+                generator.writeEnd().writeEnd();
             }
-            hitsArray.add(hitBuilder);
+            generator.writeEnd();
         }
-        jsonBuilder.add("hits", hitsArray);
-        
+        generator.writeEnd();
+
         if (totalWithDuplicates != null) {
-            jsonBuilder.add("totalWithDuplicates", totalWithDuplicates);
+            generator.write("totalWithDuplicates", totalWithDuplicates);
+        }
+
+        if (partial) {
+            generator.write("partial", true);
+        }
+
+        if (cursor != null) {
+            generator.write("cursor", cursor);
+        }
+
+        if (passes > 0) {
+            generator.write("passes", passes);
+            generator.write("hitsCollected", hitsCollected);
         }
 
         if (drilldownData.size() > 0) {
-            JsonArrayBuilder ddArray = Json.createArrayBuilder();
+            generator.writeStartArray("drilldownData");
             for (DrilldownData dd : drilldownData) {
-                JsonArrayBuilder path = Json.createArrayBuilder();
+                generator.writeStartObject()
+                        .write("fieldname", dd.fieldname)
+                        .writeStartArray("path");
                 for (String p : dd.path)
-                    path.add(p);
-                ddArray.add(Json.createObjectBuilder()
-                        .add("fieldname", dd.fieldname)
-                        .add("path", path)
-                        .add("terms", jsonTermList(dd.terms)));
+                    generator.write(p);
+                generator.writeEnd();
+                writeTermList(generator.writeStartArray("terms"), dd.terms);
+                generator.writeEnd();
             }
-            jsonBuilder.add("drilldownData", ddArray);
+            generator.writeEnd();
         }
-        
+
         if (times.size() > 0) {
-            JsonObjectBuilder timesDict = Json.createObjectBuilder();
+            generator.writeStartObject("times");
             for (String name : times.keySet())
-                timesDict.add(name, times.get(name));
-            jsonBuilder.add("times", timesDict);
+                generator.write(name, times.get(name));
+            generator.writeEnd();
         }
         if (suggestions.size() > 0) {
-            JsonObjectBuilder suggestionsDict = Json.createObjectBuilder();
+            generator.writeStartObject("suggestions");
             for (String suggest : suggestions.keySet()) {
-                JsonArrayBuilder suggestionArray = Json.createArrayBuilder();
+                generator.writeStartArray(suggest);
                 for (SuggestWord suggestion : suggestions.get(suggest)) {
-                    suggestionArray.add(suggestion.string);
+                    generator.write(suggestion.string);
                 }
-                suggestionsDict.add(suggest, suggestionArray);
+                generator.writeEnd();
             }
-            jsonBuilder.add("suggestions", suggestionsDict);
+            generator.writeEnd();
         }
-        return jsonBuilder.build();
+        generator.writeEnd();
     }
 
-    private JsonArrayBuilder jsonTermList(List<DrilldownData.Term> terms) {
-        JsonArrayBuilder termArray = Json.createArrayBuilder();
+    private void writeTermList(JsonGenerator generator, List<DrilldownData.Term> terms) {
         for (DrilldownData.Term term : terms) {
-            JsonObjectBuilder termDict = Json.createObjectBuilder()
-                    .add("term", term.label)
-                    .add("count", term.count);
+            generator.writeStartObject()
+                    .write("term", term.label)
+                    .write("count", term.count);
             if (term.subTerms != null)
-                termDict.add("subterms", jsonTermList(term.subTerms));
-            termArray.add(termDict);
+                writeTermList(generator.writeStartArray("subterms"), term.subTerms);
+            generator.writeEnd();
         }
-        return termArray;
+        generator.writeEnd();
     }
-}
\ No newline at end of file
+}
@@ -26,9 +26,12 @@
 package org.meresco.lucene;
 
 import java.io.Reader;
+import java.util.ArrayList;
+import java.util.List;
 
 import javax.json.Json;
 import javax.json.JsonArray;
+import javax.json.JsonArrayBuilder;
 import javax.json.JsonNumber;
 import javax.json.JsonObject;
 
@@ -51,10 +54,21 @@ public class LuceneSettings {
     public int numberOfConcurrentTasks = 6;
     public int commitTimeout = 10;
     public int commitCount = 100000;
+    public double refreshInterval = 0.0;
+    public double groupCommitWindow = 0.0;
+    public int indexingThreads = 1;
+    public int indexingQueueSize = 1000;
+    public int queryResultCacheSize = 100;
+    public int queryResultCacheMaxBytes = 32 * 1024 * 1024;
+    public List<String> warmKeyFields = new ArrayList<String>();
+    public JsonArray warmQueries = Json.createArrayBuilder().build();
     public FacetsConfig facetsConfig = new FacetsConfig();
     public ClusterConfig clusterConfig = new ClusterConfig(0.4, 1, 100);
 
 	public JsonObject asJson() {
+        JsonArrayBuilder keyFields = Json.createArrayBuilder();
+        for (String keyField : warmKeyFields)
+            keyFields.add(keyField);
         JsonObject json = Json.createObjectBuilder()
             .add("similarity", similarity.toString())
             .add("maxMergeAtOnce", maxMergeAtOnce)
@@ -63,6 +77,14 @@ public class LuceneSettings {
             .add("numberOfConcurrentTasks", numberOfConcurrentTasks)
             .add("commitCount", commitCount)
             .add("commitTimeout", commitTimeout)
+            .add("refreshInterval", refreshInterval)
+            .add("groupCommitWindow", groupCommitWindow)
+            .add("indexingThreads", indexingThreads)
+            .add("indexingQueueSize", indexingQueueSize)
+            .add("queryResultCacheSize", queryResultCacheSize)
+            .add("queryResultCacheMaxBytes", queryResultCacheMaxBytes)
+            .add("warmKeyFields", keyFields)
+            .add("warmQueries", warmQueries)
             .add("clustering", Json.createObjectBuilder()
                 .add("clusteringEps", clusterConfig.clusteringEps)
                 .add("clusteringMinPoints", clusterConfig.clusteringMinPoints)
@@ -81,6 +103,30 @@ public class LuceneSettings {
                 case "commitTimeout":
                     commitTimeout = object.getInt(key);
                     break;
+                case "refreshInterval":
+                    refreshInterval = object.getJsonNumber(key).doubleValue();
+                    break;
+                case "groupCommitWindow":
+                    groupCommitWindow = object.getJsonNumber(key).doubleValue();
+                    break;
+                case "indexingThreads":
+                    indexingThreads = object.getInt(key);
+                    break;
+                case "indexingQueueSize":
+                    indexingQueueSize = object.getInt(key);
+                    break;
+                case "queryResultCacheSize":
+                    queryResultCacheSize = object.getInt(key);
+                    break;
+                case "queryResultCacheMaxBytes":
+                    queryResultCacheMaxBytes = object.getInt(key);
+                    break;
+                case "warmKeyFields":
+                    warmKeyFields = getStrings(object.getJsonArray(key));
+                    break;
+                case "warmQueries":
+                    warmQueries = getWarmQueries(facetsConfig, object.getJsonArray(key));
+                    break;
                 case "lruTaxonomyWriterCacheSize":
                     lruTaxonomyWriterCacheSize = object.getInt(key);
                     break;
@@ -126,6 +172,20 @@ public class LuceneSettings {
         }
     }
 
+    private static List<String> getStrings(JsonArray array) {
+        List<String> strings = new ArrayList<String>();
+        for (int i = 0; i < array.size(); i++)
+            strings.add(array.getString(i));
+        return strings;
+    }
+
+    private static JsonArray getWarmQueries(FacetsConfig facetsConfig, JsonArray warmQueries) {
+        QueryConverter converter = new QueryConverter(facetsConfig);
+        for (int i = 0; i < warmQueries.size(); i++)
+            converter.convertToQuery(warmQueries.getJsonObject(i));
+        return warmQueries;
+    }
+
     private static Similarity getSimilarity(JsonObject similarity) {
         switch (similarity.getString("type")) {
             case "BM25Similarity":
@@ -38,9 +38,15 @@ import org.meresco.lucene.search.SuperIndexSearcher;
 public class MerescoSearchFactory extends SearcherFactory {
     private ExecutorService executor = null;
     private LuceneSettings settings;
+    private SearcherWarmer warmer;
 
     public MerescoSearchFactory(Directory indexDirectory, Directory taxoDirectory, LuceneSettings settings) throws IOException {
+        this(indexDirectory, taxoDirectory, settings, null);
+    }
+
+    public MerescoSearchFactory(Directory indexDirectory, Directory taxoDirectory, LuceneSettings settings, SearcherWarmer warmer) throws IOException {
         this.settings = settings;
+        this.warmer = warmer;
         this.executor = Executors.newFixedThreadPool(100);
     }
     
@@ -48,6 +54,15 @@ public class MerescoSearchFactory extends SearcherFactory {
     public IndexSearcher newSearcher(IndexReader reader) throws IOException {
         SuperIndexSearcher searcher = new SuperIndexSearcher(reader, this.executor, this.settings.numberOfConcurrentTasks);
         searcher.setSimilarity(this.settings.similarity);
+        if (this.warmer != null) {
+            try {
+                this.warmer.warm(searcher);
+            } catch (IOException e) {
+                throw e;
+            } catch (Exception e) {
+                throw new IOException(e);
+            }
+        }
         return searcher;
     }
 }
@@ -29,16 +29,20 @@ import java.util.ArrayList;
 import java.util.HashMap;
 import java.util.List;
 import java.util.Map;
+import java.util.Set;
+import java.util.TreeSet;
+import java.util.concurrent.Callable;
 
 import org.apache.lucene.search.Filter;
 import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.search.Query;
-import org.apache.lucene.util.OpenBitSet;
 import org.meresco.lucene.ComposedQuery.Unite;
+import org.meresco.lucene.LuceneResponse.DrilldownData;
 import org.meresco.lucene.QueryConverter.FacetRequest;
 import org.meresco.lucene.queries.KeyFilter;
 import org.meresco.lucene.search.join.AggregateScoreSuperCollector;
 import org.meresco.lucene.search.join.KeySuperCollector;
+import org.meresco.lucene.search.join.RoaringBitSet;
 import org.meresco.lucene.search.join.ScoreSuperCollector;
 
 
@@ -55,6 +59,17 @@ public class MultiLucene {
         return executeComposedQuery(q, null);
     }
 
+    public List<LuceneResponse> executeQueries(List<ComposedQuery> queries) throws Exception {
+        List<Callable<LuceneResponse>> tasks = new ArrayList<>();
+        for (final ComposedQuery q : queries)
+            tasks.add(new Callable<LuceneResponse>() {
+                public LuceneResponse call() throws Exception {
+                    return executeComposedQuery(q);
+                }
+            });
+        return ParallelTasks.invokeAll(tasks);
+    }
+
     public LuceneResponse executeComposedQuery(ComposedQuery q, String exportKey) throws Exception {
         if (q.cores.size() <= 1 && exportKey == null)
             return singleCoreQuery(q);
@@ -71,17 +86,16 @@ public class MultiLucene {
         return this.lucenes.get(resultCoreName).executeQuery(query.queryData, query.filterQueries.get(resultCoreName), query.drilldownQueriesFor(resultCoreName), null, null, null);
     }
 
-    private LuceneResponse multipleCoreQuery(ComposedQuery query, String exportKey) throws Exception {
+    private LuceneResponse multipleCoreQuery(final ComposedQuery query, String exportKey) throws Exception {
         long t0 = System.currentTimeMillis();
-        String resultCoreName = query.resultsFrom;
+        final String resultCoreName = query.resultsFrom;
         List<String> otherCoreNames = new ArrayList<String>();
         for (String core : query.cores)
             if (!core.equals(resultCoreName))
                 otherCoreNames.add(core);
 
-        Map<String, OpenBitSet> finalKeys = uniteFilter(query);
-        for (String otherCoreName : otherCoreNames)
-            finalKeys = coreQueries(otherCoreName, resultCoreName, query, finalKeys);
+        Map<String, Long> coreTimes = new HashMap<String, Long>();
+        Map<String, RoaringBitSet> finalKeys = collectKeys(keysTasks(query, otherCoreNames), coreTimes);
 
         List<Filter> resultFilters = new ArrayList<Filter>();
         for (String keyName : finalKeys.keySet())
@@ -91,9 +105,10 @@ public class MultiLucene {
         if (resultCoreQuery == null)
                 resultCoreQuery = new MatchAllDocsQuery();
         List<AggregateScoreSuperCollector> aggregateScoreCollectors = createAggregateScoreCollectors(query);
-        Map<String, KeySuperCollector> keyCollectors = new HashMap<String, KeySuperCollector>();
+        final Map<String, KeySuperCollector> keyCollectors = new HashMap<String, KeySuperCollector>();
         for (String keyName : query.keyNames(resultCoreName)) {
             keyCollectors.put(keyName, new KeySuperCollector(keyName));
+            this.lucenes.get(resultCoreName).registerKeyField(keyName);
         }
         if (exportKey != null && !keyCollectors.containsKey(exportKey)) {
             keyCollectors.put(exportKey, new KeySuperCollector(exportKey));
@@ -110,62 +125,143 @@ public class MultiLucene {
                 keyCollectors.values()
             );
 
-        for (String otherCoreName : otherCoreNames) {
-            List<FacetRequest> facets = query.facetsFor(otherCoreName);
+        List<TimedTask<List<DrilldownData>>> facetTasks = new ArrayList<TimedTask<List<DrilldownData>>>();
+        for (final String otherCoreName : otherCoreNames) {
+            final List<FacetRequest> facets = query.facetsFor(otherCoreName);
             if (facets != null && facets.size() > 0) {
-                String coreKey = query.keyName(resultCoreName, otherCoreName);
-                KeyFilter keyFilter = new KeyFilter(keyCollectors.get(coreKey).getCollectedKeys(), query.keyName(otherCoreName, resultCoreName));
-                List<Query> queries = new ArrayList<Query>();
-                queries.addAll(query.queriesFor(otherCoreName));
-                queries.addAll(query.otherCoreFacetFiltersFor(otherCoreName));
-                response.drilldownData.addAll(lucenes.get(otherCoreName).facets(
-                        facets,
-                        queries,
-                        query.drilldownQueriesFor(otherCoreName),
-                        keyFilter
-                    ));
+                facetTasks.add(new TimedTask<List<DrilldownData>>("facetTime_" + otherCoreName) {
+                    List<DrilldownData> compute() throws Exception {
+                        String coreKey = query.keyName(resultCoreName, otherCoreName);
+                        KeyFilter keyFilter = new KeyFilter(keyCollectors.get(coreKey).getCollectedKeys(), query.keyName(otherCoreName, resultCoreName));
+                        List<Query> queries = new ArrayList<Query>();
+                        queries.addAll(query.queriesFor(otherCoreName));
+                        queries.addAll(query.otherCoreFacetFiltersFor(otherCoreName));
+                        return lucenes.get(otherCoreName).facets(
+                                facets,
+                                queries,
+                                query.drilldownQueriesFor(otherCoreName),
+                                keyFilter
+                            );
+                    }
+                });
             }
         }
+        for (TimedTask<List<DrilldownData>> task : ParallelTasks.invokeAll(facetTasks)) {
+            response.drilldownData.addAll(task.result);
+            addTime(coreTimes, task);
+        }
 
         if (exportKey != null) {
             response.keys = keyCollectors.get(exportKey).getCollectedKeys();
         }
+        response.times.putAll(coreTimes);
         response.queryTime = System.currentTimeMillis() - t0;
         return response;
     }
 
-    private Map<String, OpenBitSet> uniteFilter(ComposedQuery query) throws Exception {
-        Map<String, OpenBitSet> keys = new HashMap<String, OpenBitSet>();
-        for (Unite unite : query.getUnites()) {
+    private List<KeysTask> keysTasks(final ComposedQuery query, List<String> otherCoreNames) throws Exception {
+        List<KeysTask> tasks = new ArrayList<KeysTask>();
+        for (final Unite unite : query.getUnites()) {
             String keyNameA = query.keyName(unite.coreA, unite.coreB);
             String keyNameB = query.keyName(unite.coreB, unite.coreA);
             String resultKeyName = query.resultsFrom.equals(unite.coreA) ? keyNameA : keyNameB;
-            OpenBitSet collectedKeys = lucenes.get(unite.coreA).collectKeys(unite.queryA, query.keyName(unite.coreA, unite.coreB), null);
-            unionCollectedKeys(keys, collectedKeys, resultKeyName);
+            tasks.add(new KeysTask(unite.coreA, resultKeyName, true, true) {
+                RoaringBitSet compute() throws Exception {
+                    return lucenes.get(unite.coreA).collectKeys(unite.queryA, query.keyName(unite.coreA, unite.coreB), null);
+                }
+            });
+            tasks.add(new KeysTask(unite.coreB, resultKeyName, true, true) {
+                RoaringBitSet compute() throws Exception {
+                    return lucenes.get(unite.coreB).collectKeys(unite.queryB, query.keyName(unite.coreB, unite.coreA), null);
+                }
+            });
+        }
+
+        for (final String core : query.filterQueries.keySet()) {
+            for (final Query q : query.filterQueries.get(core)) {
+                tasks.add(new KeysTask(core, query.keyName(query.resultsFrom, core), false, true) {
+                    RoaringBitSet compute() throws Exception {
+                        return lucenes.get(core).collectKeys(q, query.keyName(core, query.resultsFrom), null);
+                    }
+                });
+            }
+        }
 
-            collectedKeys = lucenes.get(unite.coreB).collectKeys(unite.queryB, query.keyName(unite.coreB, unite.coreA), null);
-            unionCollectedKeys(keys, collectedKeys, resultKeyName);
+        for (final String core : otherCoreNames) {
+            final Query luceneQuery = luceneQueryForCore(core, query);
+            if (luceneQuery != null) {
+                tasks.add(new KeysTask(core, query.keyName(query.resultsFrom, core), false, false) {
+                    RoaringBitSet compute() throws Exception {
+                        return lucenes.get(core).collectKeys(null, query.keyName(core, query.resultsFrom), luceneQuery, false);
+                    }
+                });
+            }
         }
+        return tasks;
+    }
 
-        for (String core : query.filterQueries.keySet()) {
-            for (Query q : query.filterQueries.get(core)) {
-                String keyNameResult = query.keyName(query.resultsFrom, core);
-                String keyNameOther = query.keyName(core, query.resultsFrom);
-                OpenBitSet collectedKeys = lucenes.get(core).collectKeys(q, keyNameOther, null);
-                if (keys.containsKey(keyNameResult))
-                    keys.get(keyNameResult).intersect(collectedKeys);
+    private Map<String, RoaringBitSet> collectKeys(List<KeysTask> tasks, final Map<String, Long> times) throws Exception {
+        // unites are or-ed, everything else is and-ed; both are combined as results come in
+        final Map<String, RoaringBitSet> united = new HashMap<String, RoaringBitSet>();
+        final Map<String, RoaringBitSet> intersected = new HashMap<String, RoaringBitSet>();
+        ParallelTasks.forEachCompleted(tasks, new ParallelTasks.ResultHandler<TimedTask<RoaringBitSet>>() {
+            public void handle(TimedTask<RoaringBitSet> result) {
+                KeysTask task = (KeysTask) result;
+                Map<String, RoaringBitSet> keys = task.unite ? united : intersected;
+                RoaringBitSet current = keys.get(task.keyName);
+                if (current == null)
+                    keys.put(task.keyName, task.shared ? task.result.clone() : task.result);
+                else if (task.unite)
+                    current.or(task.result);
                 else
-                    keys.put(keyNameResult, collectedKeys.clone());
+                    current.and(task.result);
+                addTime(times, task);
             }
+        });
+        for (String keyName : intersected.keySet()) {
+            if (united.containsKey(keyName))
+                united.get(keyName).and(intersected.get(keyName));
+            else
+                united.put(keyName, intersected.get(keyName));
         }
-        return keys;
+        return united;
     }
 
-    private void unionCollectedKeys(Map<String, OpenBitSet> keys, OpenBitSet collectedKeys, String keyName) {
-        if (keys.containsKey(keyName))
-            keys.get(keyName).union(collectedKeys);
-        else
-            keys.put(keyName, collectedKeys.clone());
+    private static void addTime(Map<String, Long> times, TimedTask<?> task) {
+        Long time = times.get(task.timeName);
+        times.put(task.timeName, time == null ? task.time : time + task.time);
+    }
+
+    private static abstract class TimedTask<T> implements Callable<TimedTask<T>> {
+        final String timeName;
+        T result;
+        long time;
+
+        TimedTask(String timeName) {
+            this.timeName = timeName;
+        }
+
+        public TimedTask<T> call() throws Exception {
+            long t0 = System.currentTimeMillis();
+            this.result = compute();
+            this.time = System.currentTimeMillis() - t0;
+            return this;
+        }
+
+        abstract T compute() throws Exception;
+    }
+
+    private static abstract class KeysTask extends TimedTask<RoaringBitSet> {
+        final String keyName;
+        final boolean unite;
+        final boolean shared;
+
+        KeysTask(String core, String keyName, boolean unite, boolean shared) {
+            super("collectKeysTime_" + core);
+            this.keyName = keyName;
+            this.unite = unite;
+            this.shared = shared;
+        }
     }
 
     private Query luceneQueryForCore(String coreName, ComposedQuery query) throws Exception {
@@ -176,17 +272,16 @@ public class MultiLucene {
         return luceneQuery;
     }
 
-    private Map<String, OpenBitSet> coreQueries(String coreName, String otherCoreName, ComposedQuery query, Map<String, OpenBitSet> keysForKeyName) throws Exception {
-        Query luceneQuery = luceneQueryForCore(coreName, query);
-        if (luceneQuery != null) {
-            OpenBitSet collectedKeys = this.lucenes.get(coreName).collectKeys(null, query.keyName(coreName, otherCoreName), luceneQuery, false);
-            String otherKeyName = query.keyName(otherCoreName, coreName);
-            if (keysForKeyName.containsKey(otherKeyName))
-                keysForKeyName.get(otherKeyName).intersect(collectedKeys);
-            else
-                keysForKeyName.put(otherKeyName, collectedKeys);
+    public String indexGeneration(ComposedQuery query) throws Exception {
+        Set<String> cores = new TreeSet<String>(query.cores);
+        cores.add(query.resultsFrom);
+        StringBuilder generation = new StringBuilder();
+        for (String core : cores) {
+            if (generation.length() > 0)
+                generation.append(',');
+            generation.append(core).append(':').append(this.lucenes.get(core).readerVersion());
         }
-        return keysForKeyName;
+        return generation.toString();
     }
 
     public Map<String, QueryConverter> getQueryConverters() throws Exception {
@@ -0,0 +1,121 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorCompletionService;
+import java.util.concurrent.Future;
+import java.util.concurrent.SynchronousQueue;
+import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+
+public class ParallelTasks {
+    // Separate from the searcher pools: these tasks wait for searches that need those threads.
+    // Bounded, and without a queue: when all threads are busy the caller runs the task itself,
+    // so tasks never wait behind each other and a burst cannot create threads without limit.
+    private static final ThreadPoolExecutor executor = new ThreadPoolExecutor(0, Runtime.getRuntime().availableProcessors(),
+            60, TimeUnit.SECONDS, new SynchronousQueue<Runnable>(), new ThreadFactory() {
+                public Thread newThread(Runnable r) {
+                    Thread thread = new Thread(r, "lucene-parallel-task");
+                    thread.setDaemon(true);
+                    return thread;
+                }
+            }, new ThreadPoolExecutor.CallerRunsPolicy());
+
+    /**
+     * Allows at least maxThreads threads. The pool is shared by all cores;
+     * each core asks for its numberOfConcurrentTasks.
+     */
+    public static void ensureMaxThreads(int maxThreads) {
+        synchronized (executor) {
+            if (maxThreads > executor.getMaximumPoolSize())
+                executor.setMaximumPoolSize(maxThreads);
+        }
+    }
+
+    /**
+     * Runs all tasks concurrently, the first one in the calling thread, and
+     * returns their results in order. The first failure is rethrown.
+     */
+    public static <T> List<T> invokeAll(List<? extends Callable<T>> tasks) throws Exception {
+        List<Future<T>> futures = new ArrayList<>();
+        for (int i = 1; i < tasks.size(); i++)
+            futures.add(executor.submit(tasks.get(i)));
+        List<T> results = new ArrayList<>();
+        try {
+            if (tasks.size() > 0)
+                results.add(tasks.get(0).call());
+            for (Future<T> future : futures)
+                results.add(future.get());
+        } catch (ExecutionException e) {
+            if (e.getCause() instanceof Exception)
+                throw (Exception) e.getCause();
+            if (e.getCause() instanceof Error)
+                throw (Error) e.getCause();
+            throw e;
+        } finally {
+            for (Future<T> future : futures)
+                future.cancel(false);
+        }
+        return results;
+    }
+
+    public static interface ResultHandler<T> {
+        void handle(T result) throws Exception;
+    }
+
+    /**
+     * Runs all tasks concurrently and hands each result to the handler, in
+     * the calling thread, as soon as it is available.
+     */
+    public static <T> void forEachCompleted(List<? extends Callable<T>> tasks, ResultHandler<T> handler) throws Exception {
+        if (tasks.size() == 1) {
+            handler.handle(tasks.get(0).call());
+            return;
+        }
+        ExecutorCompletionService<T> ecs = new ExecutorCompletionService<>(executor);
+        List<Future<T>> futures = new ArrayList<>();
+        for (Callable<T> task : tasks)
+            futures.add(ecs.submit(task));
+        try {
+            for (int i = 0; i < futures.size(); i++)
+                handler.handle(ecs.take().get());
+        } catch (ExecutionException e) {
+            if (e.getCause() instanceof Exception)
+                throw (Exception) e.getCause();
+            if (e.getCause() instanceof Error)
+                throw (Error) e.getCause();
+            throw e;
+        } finally {
+            for (Future<T> future : futures)
+                future.cancel(false);
+        }
+    }
+}
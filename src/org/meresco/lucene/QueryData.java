@@ -30,9 +30,11 @@ import java.util.List;
 
 import javax.json.Json;
 import javax.json.JsonObject;
+import javax.json.JsonValue;
 
 import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.search.Query;
+import org.apache.lucene.search.ScoreDoc;
 import org.apache.lucene.search.Sort;
 import org.meresco.lucene.QueryConverter.FacetRequest;
 import org.meresco.lucene.QueryConverter.SuggestionRequest;
@@ -50,9 +52,14 @@ public class QueryData {
     public String groupingField;
     public boolean clustering;
     public ClusterConfig clusterConfig;
+    public long timeAllowed = 0;
+    public ScoreDoc searchAfter;
 
     public QueryData(Reader queryReader, QueryConverter converter) {
-        JsonObject object = Json.createReader(queryReader).readObject();
+        this(Json.createReader(queryReader).readObject(), converter);
+    }
+
+    public QueryData(JsonObject object, QueryConverter converter) {
         this.query = converter.convertToQuery(object.getJsonObject("query"));
         this.facets = converter.convertToFacets(object.getJsonArray("facets"));
         this.start = object.getInt("start", 0);
@@ -64,6 +71,10 @@ public class QueryData {
         this.groupingField = object.getString("groupingField", null);
         this.clustering = object.getBoolean("clustering", false);
         this.clusterConfig = ClusterConfig.parseFromJsonObject(object);
+        if (object.containsKey("timeAllowed") && object.get("timeAllowed") != JsonValue.NULL)
+            this.timeAllowed = object.getJsonNumber("timeAllowed").longValue();
+        if (object.containsKey("cursor") && object.get("cursor") != JsonValue.NULL)
+            this.searchAfter = SearchCursor.decode(object.getString("cursor"));
     }
 
     public QueryData() {
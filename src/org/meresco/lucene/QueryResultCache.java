@@ -0,0 +1,262 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.HashMap;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicLong;
+
+import javax.json.Json;
+import javax.json.JsonObject;
+
+import org.apache.lucene.search.Query;
+import org.apache.lucene.search.spell.SuggestWord;
+import org.meresco.lucene.LuceneResponse.ClusterHit;
+import org.meresco.lucene.LuceneResponse.DedupHit;
+import org.meresco.lucene.LuceneResponse.DrilldownData;
+import org.meresco.lucene.LuceneResponse.GroupingHit;
+import org.meresco.lucene.LuceneResponse.Hit;
+import org.meresco.lucene.QueryConverter.FacetRequest;
+import org.meresco.lucene.search.MerescoCluster.DocScore;
+import org.meresco.lucene.search.MerescoCluster.TermScore;
+
+/**
+ * LRU cache of complete query responses. Keys include the version of the
+ * reader the query ran against, so a refresh makes older entries
+ * unreachable; they age out of the LRU.
+ *
+ * The cache is bounded both by number of entries and by the estimated size
+ * of the responses in bytes. A response estimated larger than a tenth of
+ * maxBytes is not cached at all, so that a single huge response cannot
+ * flush the cache.
+ */
+public class QueryResultCache {
+    private static final int OBJECT_BYTES = 32;
+    private final int maxSize;
+    private final long maxBytes;
+    private final long maxEntryBytes;
+    private final LinkedHashMap<List<Object>, Entry> entries;
+    private long bytes;
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong rejected = new AtomicLong();
+
+    public QueryResultCache(int maxSize, long maxBytes) {
+        this.maxSize = maxSize;
+        this.maxBytes = maxBytes;
+        this.maxEntryBytes = maxBytes / 10;
+        this.entries = maxSize > 0 && maxBytes > 0 ? new LinkedHashMap<List<Object>, Entry>(16, 0.75f, true) : null;
+    }
+
+    public static List<Object> keyFor(long readerVersion, QueryData q, List<Query> filterQueries, List<String[]> drilldownQueries) {
+        List<Object> facets = null;
+        if (q.facets != null) {
+            facets = new ArrayList<>();
+            for (FacetRequest facet : q.facets)
+                facets.add(Arrays.asList(facet.fieldname, facet.maxTerms, Arrays.asList(facet.path)));
+        }
+        List<Object> suggestions = null;
+        if (q.suggestionRequest != null)
+            suggestions = Arrays.asList(q.suggestionRequest.field, q.suggestionRequest.count, new ArrayList<Object>(q.suggestionRequest.suggests));
+        List<Object> drilldowns = null;
+        if (drilldownQueries != null) {
+            drilldowns = new ArrayList<>();
+            for (String[] drilldown : drilldownQueries)
+                drilldowns.add(Arrays.asList(drilldown));
+        }
+        return Arrays.asList(readerVersion, q.query, q.start, q.stop, SearchCursor.encode(q.searchAfter), facets, q.sort, suggestions,
+                q.dedupField, q.dedupSortField, q.groupingField,
+                filterQueries == null ? null : new ArrayList<Object>(filterQueries), drilldowns);
+    }
+
+    public boolean isEnabled() {
+        return this.entries != null;
+    }
+
+    public LuceneResponse get(List<Object> key) {
+        Entry entry;
+        synchronized (this.entries) {
+            entry = this.entries.get(key);
+        }
+        if (entry == null) {
+            misses.incrementAndGet();
+            return null;
+        }
+        hits.incrementAndGet();
+        return entry.response;
+    }
+
+    public void put(List<Object> key, LuceneResponse response) {
+        long size = sizeOf(response);
+        if (size > this.maxEntryBytes) {
+            rejected.incrementAndGet();
+            return;
+        }
+        synchronized (this.entries) {
+            Entry previous = this.entries.put(key, new Entry(response, size));
+            if (previous != null)
+                this.bytes -= previous.bytes;
+            this.bytes += size;
+            Iterator<Entry> eldest = this.entries.values().iterator();
+            while (this.entries.size() > this.maxSize || this.bytes > this.maxBytes) {
+                this.bytes -= eldest.next().bytes;
+                eldest.remove();
+            }
+        }
+    }
+
+    public void clear() {
+        if (this.entries == null)
+            return;
+        synchronized (this.entries) {
+            this.entries.clear();
+            this.bytes = 0;
+        }
+    }
+
+    public int size() {
+        if (this.entries == null)
+            return 0;
+        synchronized (this.entries) {
+            return this.entries.size();
+        }
+    }
+
+    public long bytes() {
+        if (this.entries == null)
+            return 0;
+        synchronized (this.entries) {
+            return this.bytes;
+        }
+    }
+
+    public JsonObject stats() {
+        long hitCount = hits.get();
+        long missCount = misses.get();
+        long lookups = hitCount + missCount;
+        return Json.createObjectBuilder()
+            .add("maxSize", this.maxSize)
+            .add("size", size())
+            .add("maxBytes", this.maxBytes)
+            .add("bytes", bytes())
+            .add("rejected", rejected.get())
+            .add("hits", hitCount)
+            .add("misses", missCount)
+            .add("hitRate", lookups == 0 ? 0.0 : (double) hitCount / lookups)
+            .build();
+    }
+
+    /**
+     * Rough estimate of the heap used by a response: object headers and
+     * references are counted as a fixed number of bytes, strings as two
+     * bytes per char.
+     */
+    static long sizeOf(LuceneResponse response) {
+        long size = OBJECT_BYTES * 4 + sizeOf(response.cursor);
+        for (Hit hit : response.hits) {
+            size += OBJECT_BYTES + sizeOf(hit.id);
+            if (hit instanceof DedupHit)
+                size += sizeOf(((DedupHit) hit).duplicateField);
+            else if (hit instanceof GroupingHit) {
+                GroupingHit groupingHit = (GroupingHit) hit;
+                size += sizeOf(groupingHit.groupingField);
+                if (groupingHit.duplicates != null)
+                    for (String duplicate : groupingHit.duplicates)
+                        size += sizeOf(duplicate);
+            } else if (hit instanceof ClusterHit) {
+                ClusterHit clusterHit = (ClusterHit) hit;
+                if (clusterHit.topDocs != null)
+                    for (DocScore docScore : clusterHit.topDocs)
+                        size += OBJECT_BYTES + sizeOf(docScore.identifier);
+                if (clusterHit.topTerms != null)
+                    for (TermScore termScore : clusterHit.topTerms)
+                        size += OBJECT_BYTES + sizeOf(termScore.term);
+            }
+        }
+        for (DrilldownData drilldownData : response.drilldownData) {
+            size += OBJECT_BYTES + sizeOf(drilldownData.fieldname);
+            for (String path : drilldownData.path)
+                size += sizeOf(path);
+            size += sizeOf(drilldownData.terms);
+        }
+        for (Map.Entry<String, SuggestWord[]> suggestion : response.suggestions.entrySet()) {
+            size += OBJECT_BYTES + sizeOf(suggestion.getKey());
+            for (SuggestWord word : suggestion.getValue())
+                size += OBJECT_BYTES + sizeOf(word.string);
+        }
+        size += response.times.size() * OBJECT_BYTES * 2;
+        if (response.keys != null)
+            size += response.keys.ramBytesUsed();
+        return size;
+    }
+
+    private static long sizeOf(List<DrilldownData.Term> terms) {
+        long size = 0;
+        if (terms != null)
+            for (DrilldownData.Term term : terms)
+                size += OBJECT_BYTES + sizeOf(term.label) + sizeOf(term.subTerms);
+        return size;
+    }
+
+    private static long sizeOf(String s) {
+        return s == null ? 0 : OBJECT_BYTES + 2 * s.length();
+    }
+
+    private static class Entry {
+        final LuceneResponse response;
+        final long bytes;
+
+        Entry(LuceneResponse response, long bytes) {
+            this.response = response;
+            this.bytes = bytes;
+        }
+    }
+
+    /**
+     * Copies every field of the cached response, except queryTime, which is
+     * the time of this lookup.
+     */
+    static LuceneResponse copyOf(LuceneResponse cached, long queryTime) {
+        LuceneResponse response = new LuceneResponse(cached.total);
+        response.totalWithDuplicates = cached.totalWithDuplicates;
+        response.hits = cached.hits;
+        response.drilldownData = cached.drilldownData;
+        response.suggestions = cached.suggestions;
+        response.times = new HashMap<>(cached.times);
+        response.queryTime = queryTime;
+        response.keys = cached.keys == null ? null : cached.keys.clone();
+        response.partial = cached.partial;
+        response.passes = cached.passes;
+        response.hitsCollected = cached.hitsCollected;
+        response.cursor = cached.cursor;
+        return response;
+    }
+}
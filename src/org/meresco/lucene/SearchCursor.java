@@ -0,0 +1,114 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.io.StringReader;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+
+import javax.json.Json;
+import javax.json.JsonArray;
+import javax.json.JsonArrayBuilder;
+import javax.json.JsonObject;
+import javax.json.JsonValue;
+import javax.xml.bind.DatatypeConverter;
+
+import org.apache.lucene.search.FieldDoc;
+import org.apache.lucene.search.ScoreDoc;
+import org.apache.lucene.util.BytesRef;
+
+/**
+ * Opaque cursor for deep paging: the sort values of the last hit of a page
+ * encoded as base64 JSON. Passing it back resumes after that hit.
+ *
+ * Searches that produce cursors sort on the identifier after the requested
+ * sort (or score), so the sort values name one document and stay meaningful
+ * when the index changes in between pages; raw doc ids do not. The decoded
+ * cursor has doc Integer.MAX_VALUE, so a hit with exactly the same sort
+ * values is always treated as already seen.
+ */
+public class SearchCursor {
+
+    public static String encode(ScoreDoc scoreDoc) {
+        if (!(scoreDoc instanceof FieldDoc))
+            return null;
+        JsonArrayBuilder fields = Json.createArrayBuilder();
+        for (Object value : ((FieldDoc) scoreDoc).fields) {
+            if (value == null)
+                fields.add(JsonValue.NULL);
+            else if (value instanceof BytesRef) {
+                BytesRef bytes = (BytesRef) value;
+                fields.add(Json.createObjectBuilder().add("b", DatatypeConverter.printBase64Binary(Arrays.copyOfRange(bytes.bytes, bytes.offset, bytes.offset + bytes.length))));
+            }
+            else if (value instanceof Integer)
+                fields.add(Json.createObjectBuilder().add("i", (Integer) value));
+            else if (value instanceof Long)
+                fields.add(Json.createObjectBuilder().add("l", (Long) value));
+            else if (value instanceof Float)
+                fields.add(Json.createObjectBuilder().add("f", Float.floatToIntBits((Float) value)));
+            else if (value instanceof Double)
+                fields.add(Json.createObjectBuilder().add("d", Double.doubleToLongBits((Double) value)));
+            else
+                return null;
+        }
+        JsonObject cursor = Json.createObjectBuilder()
+                .add("fields", fields)
+                .build();
+        return DatatypeConverter.printBase64Binary(cursor.toString().getBytes(StandardCharsets.UTF_8));
+    }
+
+    public static FieldDoc decode(String cursor) {
+        JsonObject object = parse(cursor);
+        JsonArray jsonFields = object.getJsonArray("fields");
+        if (jsonFields == null || jsonFields.size() == 0)
+            throw new IllegalArgumentException("Invalid cursor: " + cursor);
+        Object[] fields = new Object[jsonFields.size()];
+        for (int i = 0; i < fields.length; i++) {
+            if (jsonFields.isNull(i))
+                continue;
+            JsonObject value = jsonFields.getJsonObject(i);
+            if (value.containsKey("b"))
+                fields[i] = new BytesRef(DatatypeConverter.parseBase64Binary(value.getString("b")));
+            else if (value.containsKey("i"))
+                fields[i] = value.getInt("i");
+            else if (value.containsKey("l"))
+                fields[i] = value.getJsonNumber("l").longValue();
+            else if (value.containsKey("f"))
+                fields[i] = Float.intBitsToFloat(value.getInt("f"));
+            else if (value.containsKey("d"))
+                fields[i] = Double.longBitsToDouble(value.getJsonNumber("d").longValue());
+        }
+        return new FieldDoc(Integer.MAX_VALUE, Float.NaN, fields);
+    }
+
+    private static JsonObject parse(String cursor) {
+        try {
+            return Json.createReader(new StringReader(new String(DatatypeConverter.parseBase64Binary(cursor), StandardCharsets.UTF_8))).readObject();
+        } catch (RuntimeException e) {
+            throw new IllegalArgumentException("Invalid cursor: " + cursor, e);
+        }
+    }
+}
@@ -0,0 +1,119 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+
+import javax.json.Json;
+import javax.json.JsonObject;
+
+import org.apache.lucene.facet.FacetsConfig.DimConfig;
+import org.apache.lucene.facet.taxonomy.OrdinalsReader;
+import org.apache.lucene.index.AtomicReaderContext;
+import org.apache.lucene.search.Filter;
+import org.apache.lucene.search.IndexSearcher;
+import org.apache.lucene.search.Query;
+import org.apache.lucene.search.TotalHitCountCollector;
+import org.meresco.lucene.search.join.KeyValuesCache;
+
+/**
+ * Warms a new searcher before it is published: loads key values for the
+ * configured and previously used key fields, facet ordinals for the
+ * configured drilldown dimensions, the cached filters and runs the
+ * configured warm queries.
+ */
+public class SearcherWarmer {
+    private final Lucene lucene;
+    private final Set<String> keyFields = Collections.newSetFromMap(new ConcurrentHashMap<String, Boolean>());
+    private long warmCount;
+    private long lastWarmTime;
+    private long totalWarmTime;
+
+    public SearcherWarmer(Lucene lucene) {
+        this.lucene = lucene;
+    }
+
+    public void registerKeyField(String keyName) {
+        this.keyFields.add(keyName);
+    }
+
+    public void warm(IndexSearcher searcher) throws Exception {
+        long t0 = System.currentTimeMillis();
+        LuceneSettings settings = this.lucene.data.getSettings();
+        List<AtomicReaderContext> leaves = searcher.getIndexReader().leaves();
+
+        Set<String> keyFields = new HashSet<String>(settings.warmKeyFields);
+        keyFields.addAll(this.keyFields);
+        for (String keyName : keyFields)
+            for (AtomicReaderContext context : leaves)
+                KeyValuesCache.load(context, keyName);
+
+        Set<String> indexFieldnames = new HashSet<String>();
+        for (DimConfig dimConfig : settings.facetsConfig.getDimConfigs().values())
+            indexFieldnames.add(dimConfig.indexFieldName);
+        for (String indexFieldname : indexFieldnames) {
+            OrdinalsReader ordinalsReader = this.lucene.getOrdinalsReader(indexFieldname);
+            for (AtomicReaderContext context : leaves)
+                ordinalsReader.getReader(context);
+        }
+
+        List<Filter> filters;
+        Map<Query, Filter> filterCache = this.lucene.data.getFilterCache();
+        synchronized (filterCache) {
+            filters = new ArrayList<Filter>(filterCache.values());
+        }
+        for (Filter filter : filters)
+            for (AtomicReaderContext context : leaves)
+                filter.getDocIdSet(context, context.reader().getLiveDocs());
+
+        QueryConverter converter = new QueryConverter(settings.facetsConfig);
+        for (int i = 0; i < settings.warmQueries.size(); i++) {
+            Query query = converter.convertToQuery(settings.warmQueries.getJsonObject(i));
+            searcher.search(query, new TotalHitCountCollector());
+        }
+
+        synchronized (this) {
+            this.warmCount++;
+            this.lastWarmTime = System.currentTimeMillis() - t0;
+            this.totalWarmTime += this.lastWarmTime;
+        }
+    }
+
+    public synchronized JsonObject stats() {
+        return Json.createObjectBuilder()
+            .add("warmCount", this.warmCount)
+            .add("keyFields", this.keyFields.size())
+            .add("lastWarmTime", this.lastWarmTime)
+            .add("averageWarmTime", this.warmCount == 0 ? 0.0 : (double) this.totalWarmTime / this.warmCount)
+            .build();
+    }
+}
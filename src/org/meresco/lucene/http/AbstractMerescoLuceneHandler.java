@@ -25,6 +25,10 @@
 package org.meresco.lucene.http;
 
 import java.io.IOException;
+import java.io.OutputStreamWriter;
+import java.io.Writer;
+import java.nio.charset.StandardCharsets;
+import java.util.zip.GZIPOutputStream;
 
 import javax.servlet.ServletException;
 import javax.servlet.http.HttpServletRequest;
@@ -66,5 +70,37 @@ public abstract class AbstractMerescoLuceneHandler extends AbstractHandler {
         baseRequest.setHandled(true);
     }
 
+    protected static Writer responseWriter(HttpServletRequest request, HttpServletResponse response) throws IOException {
+        response.setHeader("Vary", "Accept-Encoding");
+        if (!acceptsGzip(request.getHeader("Accept-Encoding")))
+            return response.getWriter();
+        response.setHeader("Content-Encoding", "gzip");
+        return new OutputStreamWriter(new GZIPOutputStream(response.getOutputStream()), StandardCharsets.UTF_8);
+    }
+
+    static boolean acceptsGzip(String acceptEncoding) {
+        if (acceptEncoding == null)
+            return false;
+        for (String coding : acceptEncoding.split(",")) {
+            String[] parts = coding.split(";");
+            String name = parts[0].trim();
+            if (!name.equalsIgnoreCase("gzip") && !name.equalsIgnoreCase("x-gzip"))
+                continue;
+            for (int i = 1; i < parts.length; i++) {
+                String param = parts[i].trim();
+                if (!param.toLowerCase().startsWith("q="))
+                    continue;
+                try {
+                    if (Double.parseDouble(param.substring(2).trim()) <= 0)
+                        return false;
+                } catch (NumberFormatException e) {
+                    return false;
+                }
+            }
+            return true;
+        }
+        return false;
+    }
+
     public abstract void doHandle(String target, Request baseRequest, HttpServletRequest request, HttpServletResponse response) throws Exception;
 }
@@ -49,6 +49,6 @@ public class ComposedQueryHandler extends AbstractMerescoLuceneHandler {
         luceneResponse = this.multiLucene.executeComposedQuery(q);
         response.setStatus(HttpServletResponse.SC_OK);
         response.setContentType("application/json");
-        response.getWriter().write(luceneResponse.toJson().toString());
+        luceneResponse.writeJson(responseWriter(request, response));
     }
 }
@@ -25,6 +25,8 @@
 
 package org.meresco.lucene.http;
 
+import java.io.DataOutputStream;
+
 import javax.servlet.http.HttpServletRequest;
 import javax.servlet.http.HttpServletResponse;
 
@@ -49,6 +51,12 @@ public class ExportKeysHandler extends AbstractMerescoLuceneHandler {
         LuceneResponse luceneResponse = new LuceneResponse(0);
         String exportKey = request.getParameter("exportKey");
         ComposedQuery q = ComposedQuery.fromJsonString(request.getReader(), this.multiLucene.getQueryConverters());
+        String etag = "\"" + this.multiLucene.indexGeneration(q) + "\"";
+        if (etag.equals(request.getHeader("If-None-Match"))) {
+            response.setStatus(HttpServletResponse.SC_NOT_MODIFIED);
+            response.setHeader("ETag", etag);
+            return;
+        }
         luceneResponse = this.multiLucene.executeComposedQuery(q, exportKey);
         if (luceneResponse.keys == null) {
             response.setStatus(HttpServletResponse.SC_BAD_REQUEST);
@@ -58,6 +66,13 @@ public class ExportKeysHandler extends AbstractMerescoLuceneHandler {
         }
         response.setStatus(HttpServletResponse.SC_OK);
         response.setContentType("application/octet-stream");
-        Utils.writeOpenBitSet(luceneResponse.keys, response.getOutputStream());
+        response.setHeader("ETag", etag);
+        if ("roaring".equals(request.getParameter("format"))) {
+            DataOutputStream output = new DataOutputStream(response.getOutputStream());
+            luceneResponse.keys.write(output);
+            output.flush();
+        } else {
+            Utils.writeOpenBitSet(luceneResponse.keys.toOpenBitSet(), response.getOutputStream());
+        }
     }
 }
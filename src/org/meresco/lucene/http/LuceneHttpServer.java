@@ -114,10 +114,18 @@ public class LuceneHttpServer {
             context.setHandler(new QueryHandler(lucene, shutdown));
             contexts.addHandler(context);
 
+            context = new ContextHandler("/" + core + "/multiQuery");
+            context.setHandler(new MultiQueryHandler(lucene, shutdown));
+            contexts.addHandler(context);
+
             context = new ContextHandler("/" + core + "/update");
             context.setHandler(new UpdateHandler(lucene, termNumerator, shutdown));
             contexts.addHandler(context);
 
+            context = new ContextHandler("/" + core + "/bulkUpdate");
+            context.setHandler(new BulkUpdateHandler(lucene, termNumerator, shutdown));
+            contexts.addHandler(context);
+
             context = new ContextHandler("/" + core + "/delete");
             context.setHandler(new DeleteHandler(lucene, shutdown));
             contexts.addHandler(context);
@@ -138,6 +146,10 @@ public class LuceneHttpServer {
         composedQueryHandler.setHandler(new ComposedQueryHandler(new MultiLucene(lucenes), shutdown));
         contexts.addHandler(composedQueryHandler);
 
+        ContextHandler multiQueryHandler = new ContextHandler("/multiQuery");
+        multiQueryHandler.setHandler(new ComposedMultiQueryHandler(new MultiLucene(lucenes), shutdown));
+        contexts.addHandler(multiQueryHandler);
+
         ContextHandler exportKeysHandler = new ContextHandler("/exportkeys");
         exportKeysHandler.setHandler(new ExportKeysHandler(new MultiLucene(lucenes), shutdown));
         contexts.addHandler(exportKeysHandler);
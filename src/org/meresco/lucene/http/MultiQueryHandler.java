@@ -0,0 +1,83 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+package org.meresco.lucene.http;
+
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+
+import javax.json.Json;
+import javax.json.JsonArray;
+import javax.json.stream.JsonGenerator;
+import javax.servlet.http.HttpServletRequest;
+import javax.servlet.http.HttpServletResponse;
+
+import org.eclipse.jetty.server.Request;
+import org.meresco.lucene.Lucene;
+import org.meresco.lucene.LuceneResponse;
+import org.meresco.lucene.OutOfMemoryShutdown;
+import org.meresco.lucene.QueryData;
+
+
+public class MultiQueryHandler extends AbstractMerescoLuceneHandler {
+    static final int MAX_QUERIES = 100;
+
+    private Lucene lucene;
+
+    public MultiQueryHandler(Lucene lucene, OutOfMemoryShutdown shutdown) {
+        super(shutdown);
+        this.lucene = lucene;
+    }
+
+    @Override
+    public void doHandle(String target, Request baseRequest, HttpServletRequest request, HttpServletResponse response) throws Exception {
+        JsonArray jsonQueries = Json.createReader(request.getReader()).readArray();
+        if (tooManyQueries(jsonQueries, response))
+            return;
+        List<QueryData> queries = new ArrayList<>();
+        for (int i = 0; i < jsonQueries.size(); i++)
+            queries.add(new QueryData(jsonQueries.getJsonObject(i), this.lucene.getQueryConverter()));
+        List<LuceneResponse> luceneResponses = this.lucene.executeQueries(queries);
+        response.setStatus(HttpServletResponse.SC_OK);
+        response.setContentType("application/json");
+        writeResponses(luceneResponses, Json.createGenerator(responseWriter(request, response)));
+    }
+
+    static boolean tooManyQueries(JsonArray jsonQueries, HttpServletResponse response) throws IOException {
+        if (jsonQueries.size() <= MAX_QUERIES)
+            return false;
+        response.setStatus(HttpServletResponse.SC_BAD_REQUEST);
+        response.getWriter().write("At most " + MAX_QUERIES + " queries are allowed in one request, got " + jsonQueries.size());
+        return true;
+    }
+
+    static void writeResponses(List<LuceneResponse> luceneResponses, JsonGenerator generator) {
+        generator.writeStartArray();
+        for (LuceneResponse luceneResponse : luceneResponses)
+            luceneResponse.write(generator);
+        generator.writeEnd();
+        generator.close();
+    }
+}
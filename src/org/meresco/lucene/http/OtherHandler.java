@@ -55,6 +55,9 @@ public class OtherHandler extends AbstractMerescoLuceneHandler {
             case "/maxDoc/":
                 result = String.valueOf(lucene.maxDoc());
                 break;
+            case "/stats/":
+                result = lucene.stats().toString();
+                break;
             case "/fieldnames/":
                 JsonArrayBuilder builder = Json.createArrayBuilder();
                 for (String fieldname : lucene.fieldnames())
@@ -73,8 +76,11 @@ public class OtherHandler extends AbstractMerescoLuceneHandler {
                 break;
             case "/similarDocuments/":
                 String identifier = request.getParameter("identifier");
-                result = this.lucene.similarDocuments(identifier).toJson().toString();
-                break;
+                LuceneResponse similarDocuments = this.lucene.similarDocuments(identifier);
+                response.setStatus(HttpServletResponse.SC_OK);
+                response.setContentType("application/json");
+                similarDocuments.writeJson(responseWriter(request, response));
+                return;
             default:
                 response.setStatus(HttpServletResponse.SC_NOT_FOUND);
                 return;
@@ -34,6 +34,7 @@ import org.apache.lucene.search.DocIdSetIterator;
 import org.apache.lucene.search.Filter;
 import org.apache.lucene.search.BitsFilteredDocIdSet;
 import org.apache.lucene.util.Bits;
+import org.meresco.lucene.search.join.KeyValues;
 import org.meresco.lucene.search.join.KeyValuesCache;
 
 
@@ -53,7 +54,7 @@ public class KeyFilter extends Filter {
 			@Override
 			public DocIdSetIterator iterator() throws IOException {
 				return new DocIdSetIterator() {
-					private int[] keyValuesArray = KeyValuesCache.get(context, keyName);
+					private KeyValues keyValues = KeyValuesCache.get(context, keyName);
 					private int maxDoc = context.reader().maxDoc();
 					int docId;
 
@@ -64,10 +65,10 @@ public class KeyFilter extends Filter {
 
 					@Override
 					public int nextDoc() throws IOException {
-						if (keyValuesArray != null) {
+						if (keyValues != null) {
 							try {
 								while (this.docId < this.maxDoc) {
-									int key = this.keyValuesArray[this.docId];
+									int key = this.keyValues.get(this.docId);
 									if (keySet.get(key)) {
 										return this.docId++;
 									}
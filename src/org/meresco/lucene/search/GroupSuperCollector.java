@@ -29,30 +29,64 @@ import gnu.trove.map.hash.TLongIntHashMap;
 
 import java.io.IOException;
 import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
 import java.util.List;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicReference;
 
 import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.index.DocValues;
 import org.apache.lucene.index.IndexReaderContext;
 import org.apache.lucene.index.NumericDocValues;
 import org.apache.lucene.index.ReaderUtil;
+import org.apache.lucene.search.FieldComparator;
+import org.apache.lucene.search.ScoreCachingWrappingScorer;
 import org.apache.lucene.search.Scorer;
+import org.apache.lucene.search.Sort;
+import org.apache.lucene.search.SortField;
+import org.apache.lucene.util.BytesRef;
 
 public class GroupSuperCollector extends SuperCollector<GroupSubCollector> {
     private final String keyName;
     private final SuperCollector<?> delegate;
     private IndexReaderContext topLevelReaderContext = null;
+    final SortField[] sortFields;
+    final ConcurrentHashMap<Long, AtomicReference<GroupBest>> bestOfGroup;
 
     public GroupSuperCollector(String keyName, SuperCollector<?> delegate) {
+        this(keyName, delegate, null, false);
+    }
+
+    /**
+     * With bestOfGroupOnly only the best document of each group, by sort
+     * (relevance when null, lowest docId wins ties), is passed on to the
+     * delegate. Documents without a group go to the delegate while
+     * collecting; the best of each group is handed to the sub collector of
+     * the range it was found in when all collecting is done. The delegate
+     * then holds exactly one document per group, so a single search fills a
+     * page of distinct groups. The delegate must accept docs out of order.
+     */
+    public GroupSuperCollector(String keyName, SuperCollector<?> delegate, Sort sort, boolean bestOfGroupOnly) {
         super();
         this.keyName = keyName;
         this.delegate = delegate;
+        this.sortFields = sort == null ? new SortField[] { SortField.FIELD_SCORE } : sort.getSort();
+        this.bestOfGroup = bestOfGroupOnly ? new ConcurrentHashMap<Long, AtomicReference<GroupBest>>() : null;
     }
 
     public String getKeyName() {
         return this.keyName;
     }
 
+    public int getTotalHits() {
+        int totalHits = 0;
+        for (GroupSubCollector sub : this.subs) {
+            totalHits += sub.getTotalHits();
+        }
+        return totalHits;
+    }
+
     @Override
     protected GroupSubCollector createSubCollector() throws IOException {
         SubCollector delegateSubCollector = this.delegate.subCollector();
@@ -61,6 +95,12 @@ public class GroupSuperCollector extends SuperCollector<GroupSubCollector> {
 
     @Override
     public void complete() throws IOException {
+        if (this.bestOfGroup != null) {
+            for (AtomicReference<GroupBest> best : this.bestOfGroup.values())
+                best.get().owner.bestOfGroups.add(best.get());
+            for (GroupSubCollector sub : this.subs)
+                sub.collectBestOfGroups();
+        }
         this.delegate.complete();
     }
 
@@ -87,6 +127,26 @@ public class GroupSuperCollector extends SuperCollector<GroupSubCollector> {
         }
         return result;
     }
+
+    static class GroupBest {
+        final GroupSubCollector owner;
+        final AtomicReaderContext context;
+        final int doc;
+        final float score;
+        final Object[] values;
+
+        GroupBest(GroupSubCollector owner, AtomicReaderContext context, int doc, float score, Object[] values) {
+            this.owner = owner;
+            this.context = context;
+            this.doc = doc;
+            this.score = score;
+            this.values = values;
+        }
+
+        int absDoc() {
+            return this.context.docBase + this.doc;
+        }
+    }
 }
 
 class GroupSubCollector extends SubCollector {
@@ -97,14 +157,28 @@ class GroupSubCollector extends SubCollector {
     private TLongObjectHashMap<int []> keyToDocIds;
     private TLongIntHashMap keyToDocId;
     private GroupSuperCollector groupSuperCollector;
+    private Scorer scorer;
+    private FieldComparator<?>[] comparators;
+    private int[] reverseMul;
+    final List<GroupSuperCollector.GroupBest> bestOfGroups = new ArrayList<GroupSuperCollector.GroupBest>();
+    private int totalHits = 0;
 
     private static int NO_ENTRY_KEY = -1;
     private static int NO_ENTRY_VALUE = -1;
 
-    GroupSubCollector(String keyName, SubCollector delegate, GroupSuperCollector groupSuperCollector) {
+    GroupSubCollector(String keyName, SubCollector delegate, GroupSuperCollector groupSuperCollector) throws IOException {
         this.keyName = keyName;
         this.delegate = delegate;
         this.groupSuperCollector = groupSuperCollector;
+        if (groupSuperCollector.bestOfGroup != null) {
+            SortField[] sortFields = groupSuperCollector.sortFields;
+            this.comparators = new FieldComparator<?>[sortFields.length];
+            this.reverseMul = new int[sortFields.length];
+            for (int i = 0; i < sortFields.length; i++) {
+                this.comparators[i] = sortFields[i].getComparator(1, i);
+                this.reverseMul[i] = sortFields[i].getReverse() ? -1 : 1;
+            }
+        }
     }
 
     public void group(long keyValue, List<Integer> result) {
@@ -134,11 +208,14 @@ class GroupSubCollector extends SubCollector {
         if (kv == null)
             kv = DocValues.emptyNumeric();
         this.keyValues = kv;
-        this.delegate.setNextReader(context);
+        if (this.comparators != null)
+            for (int i = 0; i < this.comparators.length; i++)
+                this.comparators[i] = this.comparators[i].setNextReader(context);
     }
 
     @Override
     public void collect(int doc) throws IOException {
+        this.totalHits++;
         int absDoc = doc + this.context.docBase;
         long keyValue = this.keyValues.get(doc);
         if (keyValue > 0) {
@@ -160,22 +237,140 @@ class GroupSubCollector extends SubCollector {
                     docIds[docIds[0]] = absDoc;
                 }
             }
+            if (this.groupSuperCollector.bestOfGroup != null) {
+                offerBestOfGroup(keyValue, doc);
+                return;
+            }
         }
         this.delegate.collect(doc);
     }
 
+    private void offerBestOfGroup(long keyValue, int doc) throws IOException {
+        Object[] values = new Object[this.comparators.length];
+        for (int i = 0; i < this.comparators.length; i++) {
+            this.comparators[i].copy(0, doc);
+            Object value = this.comparators[i].value(0);
+            values[i] = value instanceof BytesRef ? BytesRef.deepCopyOf((BytesRef) value) : value;
+        }
+        GroupSuperCollector.GroupBest candidate = new GroupSuperCollector.GroupBest(this, this.context, doc, this.scorer.score(), values);
+
+        AtomicReference<GroupSuperCollector.GroupBest> ref = new AtomicReference<GroupSuperCollector.GroupBest>();
+        AtomicReference<GroupSuperCollector.GroupBest> best = this.groupSuperCollector.bestOfGroup.putIfAbsent(keyValue, ref);
+        if (best == null)
+            best = ref;
+        while (true) {
+            GroupSuperCollector.GroupBest current = best.get();
+            if (current != null && compare(candidate, current) >= 0)
+                return;
+            if (best.compareAndSet(current, candidate))
+                return;
+        }
+    }
+
+    @SuppressWarnings("unchecked")
+    private int compare(GroupSuperCollector.GroupBest a, GroupSuperCollector.GroupBest b) {
+        for (int i = 0; i < this.comparators.length; i++) {
+            int c = this.reverseMul[i] * ((FieldComparator<Object>) this.comparators[i]).compareValues(a.values[i], b.values[i]);
+            if (c != 0)
+                return c;
+        }
+        return Integer.compare(a.absDoc(), b.absDoc());
+    }
+
+    /**
+     * Passes the best documents of the groups found by this sub collector on
+     * to the delegate, in doc id order, with the score they were collected
+     * with.
+     */
+    void collectBestOfGroups() throws IOException {
+        Collections.sort(this.bestOfGroups, new Comparator<GroupSuperCollector.GroupBest>() {
+            @Override
+            public int compare(GroupSuperCollector.GroupBest a, GroupSuperCollector.GroupBest b) {
+                return Integer.compare(a.absDoc(), b.absDoc());
+            }
+        });
+        BestOfGroupScorer scorer = new BestOfGroupScorer();
+        AtomicReaderContext context = null;
+        for (GroupSuperCollector.GroupBest best : this.bestOfGroups) {
+            if (best.context != context) {
+                context = best.context;
+                this.delegate.setNextReader(context);
+                this.delegate.setScorer(scorer);
+            }
+            scorer.doc = best.doc;
+            scorer.score = best.score;
+            this.delegate.collect(best.doc);
+        }
+        this.bestOfGroups.clear();
+        this.delegate.complete();
+    }
+
     @Override
     public void setScorer(Scorer scorer) throws IOException {
+        if (this.groupSuperCollector.bestOfGroup != null) {
+            scorer = new ScoreCachingWrappingScorer(scorer);
+            for (FieldComparator<?> comparator : this.comparators)
+                comparator.setScorer(scorer);
+        }
+        this.scorer = scorer;
         this.delegate.setScorer(scorer);
     }
 
+    public int getTotalHits() {
+        return this.totalHits;
+    }
+
     @Override
     public boolean acceptsDocsOutOfOrder() {
+        // in doc id order, so groups list their documents in that order too
+        if (this.groupSuperCollector.bestOfGroup != null)
+            return false;
         return this.delegate.acceptsDocsOutOfOrder();
     }
 
     @Override
     public void complete() throws IOException {
-        this.delegate.complete();
+        // with bestOfGroup the delegate completes after collectBestOfGroups
+        if (this.groupSuperCollector.bestOfGroup == null)
+            this.delegate.complete();
+    }
+
+    private static class BestOfGroupScorer extends Scorer {
+        int doc = -1;
+        float score;
+
+        BestOfGroupScorer() {
+            super(null);
+        }
+
+        @Override
+        public float score() {
+            return this.score;
+        }
+
+        @Override
+        public int freq() {
+            throw new UnsupportedOperationException();
+        }
+
+        @Override
+        public int docID() {
+            return this.doc;
+        }
+
+        @Override
+        public int nextDoc() {
+            throw new UnsupportedOperationException();
+        }
+
+        @Override
+        public int advance(int target) {
+            throw new UnsupportedOperationException();
+        }
+
+        @Override
+        public long cost() {
+            return 1;
+        }
     }
-}
\ No newline at end of file
+}
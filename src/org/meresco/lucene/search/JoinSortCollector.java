@@ -39,6 +39,7 @@ import org.apache.lucene.search.Scorer;
 import org.apache.lucene.search.SortField;
 import org.apache.lucene.search.SortField.Type;
 import org.apache.lucene.util.BytesRef;
+import org.meresco.lucene.search.join.KeyValues;
 import org.meresco.lucene.search.join.KeyValuesCache;
 
 
@@ -53,7 +54,7 @@ interface JoinFieldComparator {
 public class JoinSortCollector extends Collector {
     protected String resultKeyName;
     private String otherKeyName;
-    private int[] keys;
+    private KeyValues keys;
     private int docBase;
     private IndexReaderContext topLevelReaderContext;
     private static int docIdsByKeyInitialSize = 0;
@@ -86,7 +87,7 @@ public class JoinSortCollector extends Collector {
 
     @Override
     public void collect(int doc) throws IOException {
-        int key = this.keys[doc];
+        int key = this.keys.get(doc);
         if (key >= this.docIdsByKey.length)
             resizeDocIdsByKey((int) ((key + 1) * 1.25));
         this.docIdsByKey[key] = doc + docBase + 1;  // increment to distinguish docId==0 from key not present
@@ -139,7 +140,7 @@ public class JoinSortCollector extends Collector {
 
 class JoinTermOrdValComparator extends FieldComparator.TermOrdValComparator implements JoinFieldComparator {
     final private JoinSortCollector collector;
-    private int[] resultKeys;
+    private KeyValues resultKeys;
 
     public JoinTermOrdValComparator(int numHits, String field, boolean reverse, JoinSortCollector collector) {
         super(numHits, field, reverse);
@@ -182,17 +183,17 @@ class JoinTermOrdValComparator extends FieldComparator.TermOrdValComparator impl
 
     @Override
     public int compareBottom(int doc) {
-        return super.compareBottom(this.collector.otherDocIdForKey(resultKeys[doc], this));
+        return super.compareBottom(this.collector.otherDocIdForKey(resultKeys.get(doc), this));
     }
 
     @Override
     public int compareTop(int doc) {
-        return super.compareTop(this.collector.otherDocIdForKey(resultKeys[doc], this));
+        return super.compareTop(this.collector.otherDocIdForKey(resultKeys.get(doc), this));
     }
 
     @Override
     public void copy(int slot, int doc) {
-        super.copy(slot, this.collector.otherDocIdForKey(resultKeys[doc], this));
+        super.copy(slot, this.collector.otherDocIdForKey(resultKeys.get(doc), this));
     }
 
     public void setOtherCoreContext(AtomicReaderContext context) {
@@ -207,7 +208,7 @@ class JoinTermOrdValComparator extends FieldComparator.TermOrdValComparator impl
 
 class JoinIntComparator extends FieldComparator.IntComparator implements JoinFieldComparator {
     private JoinSortCollector collector;
-    private int[] resultKeys;
+    private KeyValues resultKeys;
     private Integer topValue;
     private Integer bottomValue;
     private int[] values;
@@ -246,7 +247,7 @@ class JoinIntComparator extends FieldComparator.IntComparator implements JoinFie
 
     @Override
     public int compareBottom(int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1)
             return Integer.compare(this.bottomValue, this.missingValue);
         return super.compareBottom(otherDoc);
@@ -254,7 +255,7 @@ class JoinIntComparator extends FieldComparator.IntComparator implements JoinFie
 
     @Override
     public int compareTop(int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1)
             return Integer.compare(this.topValue, this.missingValue);
         return super.compareTop(otherDoc);
@@ -262,7 +263,7 @@ class JoinIntComparator extends FieldComparator.IntComparator implements JoinFie
 
     @Override
     public void copy(int slot, int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1) {
             values[slot] = this.missingValue;
         }
@@ -286,7 +287,7 @@ class JoinIntComparator extends FieldComparator.IntComparator implements JoinFie
 
 class JoinDoubleComparator extends FieldComparator.DoubleComparator implements JoinFieldComparator {
     private JoinSortCollector collector;
-    private int[] resultKeys;
+    private KeyValues resultKeys;
     private Double topValue;
     private Double bottomValue;
     private double[] values;
@@ -325,7 +326,7 @@ class JoinDoubleComparator extends FieldComparator.DoubleComparator implements J
 
     @Override
     public int compareBottom(int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1)
             return Double.compare(this.bottomValue, this.missingValue);
         return super.compareBottom(otherDoc);
@@ -333,7 +334,7 @@ class JoinDoubleComparator extends FieldComparator.DoubleComparator implements J
 
     @Override
     public int compareTop(int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1)
             return Double.compare(this.topValue, this.missingValue);
         return super.compareTop(otherDoc);
@@ -341,7 +342,7 @@ class JoinDoubleComparator extends FieldComparator.DoubleComparator implements J
 
     @Override
     public void copy(int slot, int doc) {
-        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys[doc], this);
+        int otherDoc = this.collector.otherDocIdForKey(this.resultKeys.get(doc), this);
         if (otherDoc == -1) {
             values[slot] = this.missingValue;
         }
@@ -27,108 +27,263 @@ package org.meresco.lucene.search;
 
 import java.io.IOException;
 import java.util.ArrayList;
+import java.util.Collections;
 import java.util.List;
+import java.util.Queue;
+import java.util.concurrent.ConcurrentLinkedQueue;
 import java.util.concurrent.ExecutionException;
 import java.util.concurrent.ExecutorCompletionService;
 import java.util.concurrent.ExecutorService;
 
+import org.apache.lucene.index.AtomicReader;
 import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.index.DirectoryReader;
 import org.apache.lucene.index.IndexReader;
+import org.apache.lucene.search.CollectionTerminatedException;
+import org.apache.lucene.search.Collector;
 import org.apache.lucene.search.Filter;
 import org.apache.lucene.search.IndexSearcher;
 import org.apache.lucene.search.Query;
+import org.apache.lucene.search.Scorer;
 import org.apache.lucene.search.Weight;
+import org.apache.lucene.util.Bits;
 
 public class SuperIndexSearcher extends IndexSearcher {
+    static final int SINGLE_THREADED_MAX_DOCS = 10000;
+    static final int MIN_SLICE_DOCS = 2000;
+    static final int RANGES_PER_TASK = 4;
 
     private ExecutorService executor;
-    private List<List<AtomicReaderContext>> grouped_leaves;
+    private int tasks = 1;
+    private List<List<Slice>> slices;
 
     public SuperIndexSearcher(IndexReader reader, ExecutorService executor, int tasks) {
         super(reader);
         this.executor = executor;
-        this.grouped_leaves = this.group_leaves(reader.leaves(), tasks);
-//        for (List<AtomicReaderContext> l : this.grouped_leaves) {
-//            int t = 0;
-//            for (AtomicReaderContext ctx : l)
-//                t += ctx.reader().numDocs();
-//             System.out.print(" " + t + " ");
-//        }
-//        System.out.println();
+        if (reader.maxDoc() > SINGLE_THREADED_MAX_DOCS)
+            this.tasks = tasks;
+        this.slices = this.slices(reader.leaves(), this.tasks > 1 ? this.tasks * RANGES_PER_TASK : 1, MIN_SLICE_DOCS);
     }
 
-    private List<List<AtomicReaderContext>> group_leaves(List<AtomicReaderContext> leaves, int tasks) {
-        List<List<AtomicReaderContext>> slices = new ArrayList<List<AtomicReaderContext>>(tasks);
-        for (int i = 0; i < tasks; i++)
-            slices.add(new ArrayList<AtomicReaderContext>());
-        int sizes[] = new int[tasks];
-        int max_i = 0;
+    /**
+     * Divides the index into at most 'ranges' consecutive doc id ranges of
+     * (about) equal size and at least minSliceDocs. A segment crossing the
+     * boundary of two ranges is split, so one big merged segment is searched
+     * by several tasks.
+     *
+     * The slices of a range are in doc id order and all docs of range i come
+     * before those of range i + 1.
+     */
+    private List<List<Slice>> slices(List<AtomicReaderContext> leaves, int ranges, int minSliceDocs) {
+        long totalDocs = 0;
+        for (AtomicReaderContext context : leaves)
+            totalDocs += context.reader().maxDoc();
+        int groups = (int) Math.max(1, Math.min(ranges, totalDocs / Math.max(1, minSliceDocs)));
+        List<List<Slice>> slices = new ArrayList<List<Slice>>(groups);
+        for (int i = 0; i < groups; i++)
+            slices.add(new ArrayList<Slice>());
+        long docBase = 0;
         for (AtomicReaderContext context : leaves) {
-            int smallest_i = find_smallest_slice(sizes);
-            slices.get(smallest_i).add(context);
-            sizes[smallest_i] += context.reader().numDocs();
-            if (smallest_i > max_i)
-                max_i = smallest_i;
+            int maxDoc = context.reader().maxDoc();
+            int minDoc = 0;
+            while (minDoc < maxDoc) {
+                int group = (int) ((docBase + minDoc) * groups / totalDocs);
+                long groupEnd = ((group + 1) * totalDocs + groups - 1) / groups;
+                int end = (int) Math.min(maxDoc, groupEnd - docBase);
+                slices.get(group).add(new Slice(context, minDoc, end));
+                minDoc = end;
+            }
+            docBase += maxDoc;
         }
-        return slices.subList(0, max_i + 1);
+        return slices;
     }
 
-    private int find_smallest_slice(int[] sizes) {
-        int smallest = Integer.MAX_VALUE;
-        int smallest_i = 0;
-        for (int i = 0; i < sizes.length; i++)
-            if (sizes[i] < smallest) {
-                smallest = sizes[i];
-                smallest_i = i;
-            }
-        return smallest_i;
+    public void search(Query q, Filter f, SuperCollector<?> c) throws IOException, InterruptedException,
+            ExecutionException {
+        search(q, f, c, 0);
     }
 
-    public void search(Query q, Filter f, SuperCollector<?> c) throws IOException, InterruptedException,
+    /**
+     * As search(q, f, c), but stops once System.currentTimeMillis() passes
+     * deadline (0 means no deadline). The deadline is checked before each
+     * slice, while collecting and while scorers step over candidate docs.
+     * Returns false if searching was stopped before all documents were seen.
+     *
+     * There are more doc id ranges than tasks. Every range gets its own sub
+     * collector, created in range order, and the tasks take the next range
+     * from a shared queue until none are left, so a slow range does not keep
+     * the other tasks idle. The sub collectors (and thus the merge of their
+     * results by shard index) stay in doc id order whichever task searched a
+     * range, so ties are broken by doc id as in a single threaded search.
+     */
+    public boolean search(Query q, Filter f, SuperCollector<?> c, long deadline) throws IOException, InterruptedException,
             ExecutionException {
         Weight weight = super.createNormalizedWeight(wrapFilter(q, f));
+        List<SubCollector> subCollectors = new ArrayList<SubCollector>(this.slices.size());
+        Queue<Integer> ranges = new ConcurrentLinkedQueue<Integer>();
+        for (int i = 0; i < this.slices.size(); i++) {
+            subCollectors.add(c.subCollector());
+            ranges.add(i);
+        }
+        List<SearchTask> searchTasks = new ArrayList<SearchTask>();
+        for (int i = 0; i < Math.min(this.tasks, this.slices.size()); i++)
+            searchTasks.add(new SearchTask(ranges, subCollectors, weight, deadline));
         ExecutorCompletionService<String> ecs = new ExecutorCompletionService<String>(this.executor);
-        for (List<AtomicReaderContext> leaf_group : this.grouped_leaves.subList(1, this.grouped_leaves.size()))
-            ecs.submit(new SearchTask(leaf_group, weight, c.subCollector()), "Done");
-        new SearchTask(this.grouped_leaves.get(0), weight, c.subCollector()).run();
-        for (int i = 0; i < this.grouped_leaves.size() - 1; i++) {
+        for (SearchTask task : searchTasks.subList(1, searchTasks.size()))
+            ecs.submit(task, "Done");
+        searchTasks.get(0).run();
+        for (int i = 0; i < searchTasks.size() - 1; i++) {
             ecs.take().get();
         }
         c.complete();
+        for (SearchTask task : searchTasks)
+            if (task.timedOut)
+                return false;
+        return true;
+    }
+
+    private void search(Slice slice, Weight weight, Collector subCollector, Bits acceptDocs) throws IOException {
+        if (acceptDocs == null && slice.minDoc == 0 && slice.maxDoc == slice.context.reader().maxDoc()) {
+            search(Collections.singletonList(slice.context), weight, subCollector);
+            return;
+        }
+        subCollector.setNextReader(slice.context);
+        Scorer scorer = weight.scorer(slice.context, acceptDocs != null ? acceptDocs : slice.context.reader().getLiveDocs());
+        if (scorer == null)
+            return;
+        subCollector.setScorer(scorer);
+        try {
+            int doc = slice.minDoc == 0 ? scorer.nextDoc() : scorer.advance(slice.minDoc);
+            while (doc < slice.maxDoc) {
+                subCollector.collect(doc);
+                doc = scorer.nextDoc();
+            }
+        } catch (CollectionTerminatedException e) {
+        }
     }
 
     public class SearchTask implements Runnable {
-        private List<AtomicReaderContext> contexts;
+        private Queue<Integer> ranges;
+        private List<SubCollector> subCollectors;
         private Weight weight;
         private SubCollector subCollector;
+        private long deadline;
+        private int collected;
+        private int checked;
+        volatile boolean timedOut;
 
-        public SearchTask(List<AtomicReaderContext> contexts, Weight weight, SubCollector subCollector) {
-            this.contexts = contexts;
+        public SearchTask(Queue<Integer> ranges, List<SubCollector> subCollectors, Weight weight, long deadline) {
+            this.ranges = ranges;
+            this.subCollectors = subCollectors;
             this.weight = weight;
-            this.subCollector = subCollector;
+            this.deadline = deadline;
         }
 
         @Override
         public void run() {
             try {
-                SuperIndexSearcher.this.search(this.contexts, this.weight, this.subCollector);
-                this.subCollector.complete();
+                Integer range;
+                while ((range = this.ranges.poll()) != null) {
+                    this.subCollector = this.subCollectors.get(range);
+                    Collector collector = this.deadline > 0 ? new DeadlineCollector() : this.subCollector;
+                    for (Slice slice : SuperIndexSearcher.this.slices.get(range)) {
+                        if (this.deadline > 0 && System.currentTimeMillis() > this.deadline)
+                            this.timedOut = true;
+                        if (this.timedOut)
+                            break;
+                        Bits acceptDocs = this.deadline > 0 ? new DeadlineBits(slice.context.reader()) : null;
+                        try {
+                            SuperIndexSearcher.this.search(slice, this.weight, collector, acceptDocs);
+                        } catch (DeadlineExceededException e) {
+                        }
+                    }
+                    this.subCollector.complete();
+                }
             } catch (IOException e) {
                 throw new RuntimeException(e);
             }
         }
+
+        private void checkDeadline() {
+            if (System.currentTimeMillis() > this.deadline) {
+                this.timedOut = true;
+                throw new DeadlineExceededException();
+            }
+        }
+
+        private class DeadlineCollector extends Collector {
+            @Override
+            public void setScorer(Scorer scorer) throws IOException {
+                subCollector.setScorer(scorer);
+            }
+
+            @Override
+            public void collect(int doc) throws IOException {
+                if ((++collected & 0xff) == 0)
+                    checkDeadline();
+                subCollector.collect(doc);
+            }
+
+            @Override
+            public void setNextReader(AtomicReaderContext context) throws IOException {
+                subCollector.setNextReader(context);
+            }
+
+            @Override
+            public boolean acceptsDocsOutOfOrder() {
+                return subCollector.acceptsDocsOutOfOrder();
+            }
+        }
+
+        /**
+         * Live docs that also check the deadline. Scorers (and filters) consult
+         * these for every candidate doc, also for the ones that do not match, so
+         * a long scan that collects little is stopped too.
+         */
+        private class DeadlineBits implements Bits {
+            private Bits liveDocs;
+            private int length;
+
+            DeadlineBits(AtomicReader reader) {
+                this.liveDocs = reader.getLiveDocs();
+                this.length = reader.maxDoc();
+            }
+
+            @Override
+            public boolean get(int index) {
+                if ((++checked & 0xfff) == 0)
+                    checkDeadline();
+                return this.liveDocs == null || this.liveDocs.get(index);
+            }
+
+            @Override
+            public int length() {
+                return this.length;
+            }
+        }
     }
 
-    public SuperIndexSearcher(DirectoryReader reader) {
-        super(reader);
+    @SuppressWarnings("serial")
+    private static class DeadlineExceededException extends RuntimeException {
     }
 
-    public int find_smallest_slice_test(int[] sizes) {
-        return find_smallest_slice(sizes);
+    public static class Slice {
+        public final AtomicReaderContext context;
+        public final int minDoc;
+        public final int maxDoc;
+
+        Slice(AtomicReaderContext context, int minDoc, int maxDoc) {
+            this.context = context;
+            this.minDoc = minDoc;
+            this.maxDoc = maxDoc;
+        }
+    }
+
+    public SuperIndexSearcher(DirectoryReader reader) {
+        super(reader);
     }
 
-    public List<List<AtomicReaderContext>> group_leaves_test(List<AtomicReaderContext> leaves, int tasks) {
-        return group_leaves(leaves, tasks);
+    public List<List<Slice>> slices_test(List<AtomicReaderContext> leaves, int ranges, int minSliceDocs) {
+        return slices(leaves, ranges, minSliceDocs);
     }
 }
@@ -27,6 +27,7 @@ package org.meresco.lucene.search;
 
 import java.io.IOException;
 
+import org.apache.lucene.search.FieldDoc;
 import org.apache.lucene.search.Sort;
 import org.apache.lucene.search.TopFieldCollector;
 
@@ -35,10 +36,17 @@ public class TopFieldSuperCollector extends TopDocSuperCollector {
     final boolean trackDocScores;
     final boolean trackMaxScore;
     final boolean docsScoredInOrder;
+    final FieldDoc after;
 
     public TopFieldSuperCollector(Sort sort, int numHits, boolean trackDocScores, boolean trackMaxScore,
             boolean docsScoredInOrder) {
+        this(sort, numHits, null, trackDocScores, trackMaxScore, docsScoredInOrder);
+    }
+
+    public TopFieldSuperCollector(Sort sort, int numHits, FieldDoc after, boolean trackDocScores, boolean trackMaxScore,
+            boolean docsScoredInOrder) {
         super(sort, numHits);
+        this.after = after;
         this.trackDocScores = trackDocScores;
         this.trackMaxScore = trackMaxScore;
         this.docsScoredInOrder = docsScoredInOrder;
@@ -47,7 +55,7 @@ public class TopFieldSuperCollector extends TopDocSuperCollector {
     @Override
     protected TopDocSubCollector<TopFieldSuperCollector> createSubCollector() throws IOException {
         return new TopDocSubCollector<TopFieldSuperCollector>(TopFieldCollector.create(this.sort,
-                this.numHits, /*fillFields*/ true, this.trackDocScores, this.trackMaxScore, this.docsScoredInOrder), this);
+                this.numHits, this.after, /*fillFields*/ true, this.trackDocScores, this.trackMaxScore, this.docsScoredInOrder), this);
     }
 
     @Override
@@ -27,14 +27,21 @@ package org.meresco.lucene.search;
 
 import java.io.IOException;
 
+import org.apache.lucene.search.ScoreDoc;
 import org.apache.lucene.search.TopScoreDocCollector;
 
 public class TopScoreDocSuperCollector extends TopDocSuperCollector {
 
     private final boolean docsScoredInOrder;
+    private final ScoreDoc after;
 
     public TopScoreDocSuperCollector(int numHits, boolean docsScoredInOrder) {
+        this(numHits, null, docsScoredInOrder);
+    }
+
+    public TopScoreDocSuperCollector(int numHits, ScoreDoc after, boolean docsScoredInOrder) {
         super(null, numHits);
+        this.after = after;
         this.docsScoredInOrder = docsScoredInOrder;
     }
 
@@ -45,6 +52,6 @@ public class TopScoreDocSuperCollector extends TopDocSuperCollector {
     @Override
     protected TopDocSubCollector<TopScoreDocSuperCollector> createSubCollector() throws IOException {
         return new TopDocSubCollector<TopScoreDocSuperCollector>(TopScoreDocCollector.create(super.numHits,
-                this.docsScoredInOrder), this);
+                this.after, this.docsScoredInOrder), this);
     }
 }
@@ -67,7 +67,7 @@ class AggregateScoreSubCollector extends SubCollector {
     private final SubCollector delegate;
     private final ScoreSuperCollector[] otherScoreCollectors;
     private String keyName;
-    private int[] keyValues;
+    private KeyValues keyValues;
     private AggregateSuperScorer scorer;
 
     public AggregateScoreSubCollector(String keyName, ScoreSuperCollector[] otherScoreCollectors, SubCollector delegate)
@@ -110,24 +110,24 @@ class AggregateScoreSubCollector extends SubCollector {
 
 class AggregateSuperScorer extends Scorer {
     private final Scorer scorer;
-    private int[] keyValues;
+    private KeyValues keyValues;
     private final ScoreSuperCollector[] otherScoreCollectors;
 
-    AggregateSuperScorer(Scorer scorer, ScoreSuperCollector[] otherScoreCollectors, int[] keyValues) {
+    AggregateSuperScorer(Scorer scorer, ScoreSuperCollector[] otherScoreCollectors, KeyValues keyValues) {
         super(weightFromScorer(scorer));
         this.scorer = scorer;
         this.otherScoreCollectors = otherScoreCollectors;
         this.keyValues = keyValues;
     }
 
-    public void setKeyValues(int[] keyValues) {
+    public void setKeyValues(KeyValues keyValues) {
         this.keyValues = keyValues;
     }
 
     public float score() throws IOException {
         float score = this.scorer.score();
         int docId = this.docID();
-        int key = this.keyValues[docId];
+        int key = this.keyValues.get(docId);
         for (ScoreSuperCollector sc : this.otherScoreCollectors) {
             float otherScore = sc.score(key);
             score *= (float) (1 + otherScore);
@@ -29,14 +29,13 @@ import java.io.IOException;
 
 import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.search.Scorer;
-import org.apache.lucene.util.OpenBitSet;
 import org.meresco.lucene.search.SubCollector;
 
 
 public class KeyCollector extends SubCollector {
     protected String keyName;
-    private int[] keyValuesArray;
-    protected OpenBitSet currentKeySet = new OpenBitSet();
+    private KeyValues keyValues;
+    protected RoaringBitSet currentKeySet = new RoaringBitSet();
     protected int biggestKeyFound = 0;
 
     public KeyCollector(String keyName) {
@@ -45,8 +44,8 @@ public class KeyCollector extends SubCollector {
 
     @Override
     public void collect(int docId) throws IOException {
-        if (this.keyValuesArray != null) {
-        	int value = this.keyValuesArray[docId];
+        if (this.keyValues != null) {
+        	int value = this.keyValues.get(docId);
         	if (value > 0) {
                 this.currentKeySet.set(value);
                 if (value > this.biggestKeyFound) {
@@ -58,7 +57,7 @@ public class KeyCollector extends SubCollector {
 
     @Override
     public void setNextReader(AtomicReaderContext context) throws IOException {
-        keyValuesArray = KeyValuesCache.get(context, keyName);
+        keyValues = KeyValuesCache.get(context, keyName);
     }
 
     @Override
@@ -70,7 +69,7 @@ public class KeyCollector extends SubCollector {
     public void setScorer(Scorer scorer) throws IOException {
     }
 
-    public OpenBitSet getCollectedKeys() throws IOException {
+    public RoaringBitSet getCollectedKeys() throws IOException {
         return this.currentKeySet;
     }
 
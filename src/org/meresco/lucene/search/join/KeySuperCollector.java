@@ -28,12 +28,11 @@ package org.meresco.lucene.search.join;
 
 import java.io.IOException;
 
-import org.apache.lucene.util.OpenBitSet;
 import org.meresco.lucene.search.SuperCollector;
 
 public class KeySuperCollector extends SuperCollector<KeyCollector> {
     protected final String keyName;
-    private OpenBitSet currentKeySet;
+    private RoaringBitSet currentKeySet;
 
     public KeySuperCollector(String keyName) {
         this.keyName = keyName;
@@ -46,7 +45,7 @@ public class KeySuperCollector extends SuperCollector<KeyCollector> {
 
     @Override
     public void complete() throws IOException {
-        OpenBitSet currentKeySet = super.subs.get(0).currentKeySet;
+        RoaringBitSet currentKeySet = super.subs.get(0).currentKeySet;
         for (int i = 1; i < super.subs.size(); i++) {
             currentKeySet.or(super.subs.get(i).currentKeySet);
         }
@@ -54,7 +53,7 @@ public class KeySuperCollector extends SuperCollector<KeyCollector> {
         this.currentKeySet = currentKeySet;
     }
 
-    public OpenBitSet getCollectedKeys() {
+    public RoaringBitSet getCollectedKeys() {
         return this.currentKeySet;
     }
 }
@@ -0,0 +1,77 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2014, 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ * Copyright (C) 2014 Stichting Bibliotheek.nl (BNL) http://www.bibliotheek.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.search.join;
+
+import org.apache.lucene.index.NumericDocValues;
+import org.apache.lucene.util.packed.PackedInts;
+
+/**
+ * Key value per document of one segment. Either a bit-packed copy of the
+ * doc values, sized to the largest key in the segment, or a thin wrapper
+ * around the (memory-mapped) doc values themselves.
+ */
+public abstract class KeyValues {
+    public abstract int get(int docId);
+
+    public abstract long ramBytesUsed();
+
+    static KeyValues packed(NumericDocValues docValues, int maxDoc) {
+        long maxKey = 0;
+        for (int i = 0; i < maxDoc; i++)
+            maxKey = Math.max(maxKey, docValues.get(i));
+        final PackedInts.Mutable values = PackedInts.getMutable(maxDoc, PackedInts.bitsRequired(maxKey), PackedInts.COMPACT);
+        for (int i = 0; i < maxDoc; i++) {
+            long value = docValues.get(i);
+            if (value > 0)
+                values.set(i, value);
+        }
+        return new KeyValues() {
+            @Override
+            public int get(int docId) {
+                return (int) values.get(docId);
+            }
+
+            @Override
+            public long ramBytesUsed() {
+                return values.ramBytesUsed();
+            }
+        };
+    }
+
+    static KeyValues direct(final NumericDocValues docValues) {
+        return new KeyValues() {
+            @Override
+            public int get(int docId) {
+                return (int) docValues.get(docId);
+            }
+
+            @Override
+            public long ramBytesUsed() {
+                return 0;
+            }
+        };
+    }
+}
@@ -26,57 +26,119 @@
 package org.meresco.lucene.search.join;
 
 import java.io.IOException;
-import java.util.HashMap;
 import java.util.Map;
-import java.util.WeakHashMap;
+import java.util.TreeMap;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.concurrent.atomic.AtomicInteger;
+
+import javax.json.Json;
+import javax.json.JsonObject;
+import javax.json.JsonObjectBuilder;
 
 import org.apache.lucene.index.AtomicReader;
 import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.index.NumericDocValues;
 
+/**
+ * Key values per segment core and key field. A segment is read directly
+ * from its doc values until it has been asked for LOAD_AFTER_ACCESSES
+ * times (or is explicitly loaded by the searcher warmer); from then on a
+ * bit-packed copy is used. Lookups do not lock; entries are dropped when
+ * the segment core is closed.
+ */
 public class KeyValuesCache {
-    private static Map<Object, Map<String, CacheValue>> cache = new WeakHashMap<Object, Map<String, CacheValue>>();
+    static final int LOAD_AFTER_ACCESSES = 2;
+    private static final ConcurrentMap<Object, ConcurrentMap<String, CacheValue>> cache = new ConcurrentHashMap<Object, ConcurrentMap<String, CacheValue>>();
+    private static final AtomicReader.CoreClosedListener purgeCore = new AtomicReader.CoreClosedListener() {
+        @Override
+        public void onClose(Object ownerCoreCacheKey) {
+            cache.remove(ownerCoreCacheKey);
+        }
+    };
+
+    public static KeyValues get(AtomicReaderContext context, String keyName) throws IOException {
+        return get(context, keyName, false);
+    }
 
-    public static int[] get(AtomicReaderContext context, String keyName) throws IOException {
+    public static KeyValues load(AtomicReaderContext context, String keyName) throws IOException {
+        return get(context, keyName, true);
+    }
+
+    private static KeyValues get(AtomicReaderContext context, String keyName, boolean load) throws IOException {
         AtomicReader reader = context.reader();
         NumericDocValues ndv = reader.getNumericDocValues(keyName);
         if (ndv == null) {
             return null;
         }
-
-        CacheValue cacheValue = safeGet(reader, keyName);
-        int[] keyValues = cacheValue.keyValues;
-        if (!cacheValue.newValue) {
+        CacheValue cacheValue = cacheValue(reader, keyName);
+        KeyValues keyValues = cacheValue.keyValues;
+        if (keyValues != null) {
             return keyValues;
         }
-        for (int i = 0; i <  reader.maxDoc(); i++) {
-            keyValues[i] = (int) ndv.get(i);
+        if (!load && cacheValue.accesses.incrementAndGet() < LOAD_AFTER_ACCESSES) {
+            return KeyValues.direct(ndv);
         }
-        return keyValues;
+        return cacheValue.load(ndv, reader.maxDoc());
     }
 
-    private static synchronized CacheValue safeGet(AtomicReader reader, String keyName) {
-        Map<String, CacheValue> fieldCache = cache.get(reader.getCoreCacheKey());
+    private static CacheValue cacheValue(AtomicReader reader, String keyName) {
+        Object coreCacheKey = reader.getCoreCacheKey();
+        ConcurrentMap<String, CacheValue> fieldCache = cache.get(coreCacheKey);
         if (fieldCache == null) {
-            fieldCache = new HashMap<String, CacheValue>();
-            KeyValuesCache.cache.put(reader.getCoreCacheKey(), fieldCache);
+            fieldCache = new ConcurrentHashMap<String, CacheValue>();
+            ConcurrentMap<String, CacheValue> existing = cache.putIfAbsent(coreCacheKey, fieldCache);
+            if (existing == null) {
+                reader.addCoreClosedListener(purgeCore);
+            } else {
+                fieldCache = existing;
+            }
         }
         CacheValue cacheValue = fieldCache.get(keyName);
         if (cacheValue == null) {
-            int[] keyValues = new int[reader.maxDoc()];
-            fieldCache.put(keyName, new CacheValue(keyValues, false));
-            cacheValue = new CacheValue(keyValues, true);
+            cacheValue = new CacheValue();
+            CacheValue existing = fieldCache.putIfAbsent(keyName, cacheValue);
+            if (existing != null) {
+                cacheValue = existing;
+            }
         }
         return cacheValue;
     }
+
+    public static JsonObject stats() {
+        Map<String, long[]> fields = new TreeMap<String, long[]>();
+        for (ConcurrentMap<String, CacheValue> fieldCache : cache.values()) {
+            for (Map.Entry<String, CacheValue> entry : fieldCache.entrySet()) {
+                KeyValues keyValues = entry.getValue().keyValues;
+                long[] usage = fields.get(entry.getKey());
+                if (usage == null) {
+                    usage = new long[2];
+                    fields.put(entry.getKey(), usage);
+                }
+                if (keyValues != null) {
+                    usage[0]++;
+                    usage[1] += keyValues.ramBytesUsed();
+                }
+            }
+        }
+        JsonObjectBuilder result = Json.createObjectBuilder();
+        for (Map.Entry<String, long[]> field : fields.entrySet()) {
+            result.add(field.getKey(), Json.createObjectBuilder()
+                .add("loadedSegments", field.getValue()[0])
+                .add("bytes", field.getValue()[1]));
+        }
+        return result.build();
+    }
 }
 
 class CacheValue {
-    int[] keyValues;
-    boolean newValue;
+    final AtomicInteger accesses = new AtomicInteger();
+    volatile KeyValues keyValues;
 
-    CacheValue(int[] keyValues, boolean newValue) {
-        this.keyValues = keyValues;
-        this.newValue = newValue;
+    synchronized KeyValues load(NumericDocValues ndv, int maxDoc) {
+        if (keyValues == null) {
+            keyValues = KeyValues.packed(ndv, maxDoc);
+        }
+        return keyValues;
     }
-}
\ No newline at end of file
+}
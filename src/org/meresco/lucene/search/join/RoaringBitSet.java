@@ -0,0 +1,603 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.search.join;
+
+import java.io.DataInput;
+import java.io.DataOutput;
+import java.io.IOException;
+import java.util.Arrays;
+
+import org.apache.lucene.search.DocIdSet;
+import org.apache.lucene.search.DocIdSetIterator;
+import org.apache.lucene.util.Bits;
+import org.apache.lucene.util.OpenBitSet;
+import org.apache.lucene.util.RamUsageEstimator;
+
+/**
+ * Compressed set of (non negative) keys. Keys are grouped by their high 16
+ * bits; each group is stored either as a sorted array of low 16 bits (at most
+ * 4096 keys) or as a bitmap of 65536 bits, so memory use follows the number
+ * of keys rather than the value of the largest key.
+ *
+ * and() and or() work in place and never modify their argument.
+ */
+public class RoaringBitSet extends DocIdSet implements Bits, Cloneable {
+    static final int ARRAY_MAX = 4096;
+    private static final int BITMAP_WORDS = 1 << 10;
+
+    private char[] highs;
+    private Container[] containers;
+    private int size;
+
+    public RoaringBitSet() {
+        this.highs = new char[4];
+        this.containers = new Container[4];
+    }
+
+    private RoaringBitSet(char[] highs, Container[] containers, int size) {
+        this.highs = highs;
+        this.containers = containers;
+        this.size = size;
+    }
+
+    public void set(int key) {
+        char high = (char) (key >>> 16);
+        int i = indexOf(high);
+        if (i < 0) {
+            i = -i - 1;
+            insert(i, high, new ArrayContainer(1));
+        }
+        this.containers[i] = this.containers[i].add((char) key);
+    }
+
+    @Override
+    public boolean get(int key) {
+        if (key < 0)
+            return false;
+        int i = indexOf((char) (key >>> 16));
+        return i >= 0 && this.containers[i].contains((char) key);
+    }
+
+    /** One past the largest key in this set. */
+    @Override
+    public int length() {
+        if (this.size == 0)
+            return 0;
+        return (this.highs[this.size - 1] << 16 | this.containers[this.size - 1].last()) + 1;
+    }
+
+    public int cardinality() {
+        int cardinality = 0;
+        for (int i = 0; i < this.size; i++)
+            cardinality += this.containers[i].cardinality;
+        return cardinality;
+    }
+
+    public boolean isEmpty() {
+        return this.size == 0;
+    }
+
+    /** Returns the first key at or after index, or -1. */
+    public int nextSetBit(int index) {
+        int i = indexOf((char) (index >>> 16));
+        int low = index & 0xFFFF;
+        if (i < 0) {
+            i = -i - 1;
+            low = 0;
+        }
+        for (; i < this.size; i++, low = 0) {
+            int next = this.containers[i].nextSetBit(low);
+            if (next >= 0)
+                return this.highs[i] << 16 | next;
+        }
+        return -1;
+    }
+
+    public void and(RoaringBitSet other) {
+        int i = 0, j = 0, n = 0;
+        while (i < this.size && j < other.size) {
+            if (this.highs[i] < other.highs[j])
+                i++;
+            else if (this.highs[i] > other.highs[j])
+                j++;
+            else {
+                Container c = this.containers[i].and(other.containers[j]);
+                if (c.cardinality > 0) {
+                    this.highs[n] = this.highs[i];
+                    this.containers[n] = c;
+                    n++;
+                }
+                i++;
+                j++;
+            }
+        }
+        Arrays.fill(this.containers, n, this.size, null);
+        this.size = n;
+    }
+
+    public void or(RoaringBitSet other) {
+        if (other.size == 0)
+            return;
+        char[] highs = new char[this.size + other.size];
+        Container[] containers = new Container[highs.length];
+        int i = 0, j = 0, n = 0;
+        while (i < this.size || j < other.size) {
+            if (j == other.size || (i < this.size && this.highs[i] < other.highs[j])) {
+                highs[n] = this.highs[i];
+                containers[n++] = this.containers[i++];
+            } else if (i == this.size || this.highs[i] > other.highs[j]) {
+                highs[n] = other.highs[j];
+                containers[n++] = other.containers[j++].clone();
+            } else {
+                highs[n] = this.highs[i];
+                containers[n++] = this.containers[i++].or(other.containers[j++]);
+            }
+        }
+        this.highs = highs;
+        this.containers = containers;
+        this.size = n;
+    }
+
+    @Override
+    public RoaringBitSet clone() {
+        Container[] containers = new Container[this.size];
+        for (int i = 0; i < this.size; i++)
+            containers[i] = this.containers[i].clone();
+        return new RoaringBitSet(Arrays.copyOf(this.highs, this.size), containers, this.size);
+    }
+
+    public OpenBitSet toOpenBitSet() {
+        OpenBitSet bitSet = new OpenBitSet(length());
+        for (int key = nextSetBit(0); key >= 0; key = nextSetBit(key + 1))
+            bitSet.fastSet(key);
+        return bitSet;
+    }
+
+    public static RoaringBitSet fromOpenBitSet(OpenBitSet bitSet) {
+        RoaringBitSet keys = new RoaringBitSet();
+        for (int key = bitSet.nextSetBit(0); key >= 0; key = bitSet.nextSetBit(key + 1))
+            keys.set(key);
+        return keys;
+    }
+
+    @Override
+    public DocIdSetIterator iterator() {
+        return new DocIdSetIterator() {
+            int doc = -1;
+
+            @Override
+            public int docID() {
+                return this.doc;
+            }
+
+            @Override
+            public int nextDoc() {
+                if (this.doc == NO_MORE_DOCS)
+                    return NO_MORE_DOCS;
+                return advance(this.doc + 1);
+            }
+
+            @Override
+            public int advance(int target) {
+                int next = nextSetBit(target);
+                this.doc = next < 0 ? NO_MORE_DOCS : next;
+                return this.doc;
+            }
+
+            @Override
+            public long cost() {
+                return cardinality();
+            }
+        };
+    }
+
+    @Override
+    public Bits bits() {
+        return this;
+    }
+
+    @Override
+    public boolean isCacheable() {
+        return true;
+    }
+
+    @Override
+    public long ramBytesUsed() {
+        long bytes = RamUsageEstimator.NUM_BYTES_OBJECT_HEADER + RamUsageEstimator.sizeOf(this.highs) + RamUsageEstimator.shallowSizeOf(this.containers);
+        for (int i = 0; i < this.size; i++)
+            bytes += this.containers[i].ramBytesUsed();
+        return bytes;
+    }
+
+    /**
+     * Format: number of containers, then per container its high bits,
+     * cardinality and either the sorted low bits (cardinality <= 4096) or
+     * 1024 words of bitmap.
+     */
+    public void write(DataOutput out) throws IOException {
+        out.writeInt(this.size);
+        for (int i = 0; i < this.size; i++) {
+            out.writeShort(this.highs[i]);
+            out.writeInt(this.containers[i].cardinality);
+            this.containers[i].write(out);
+        }
+    }
+
+    public static RoaringBitSet read(DataInput in) throws IOException {
+        int size = in.readInt();
+        char[] highs = new char[size];
+        Container[] containers = new Container[size];
+        for (int i = 0; i < size; i++) {
+            highs[i] = in.readChar();
+            int cardinality = in.readInt();
+            containers[i] = cardinality <= ARRAY_MAX ? ArrayContainer.read(in, cardinality) : BitmapContainer.read(in, cardinality);
+        }
+        return new RoaringBitSet(highs, containers, size);
+    }
+
+    @Override
+    public boolean equals(Object obj) {
+        if (this == obj)
+            return true;
+        if (!(obj instanceof RoaringBitSet))
+            return false;
+        RoaringBitSet other = (RoaringBitSet) obj;
+        if (this.size != other.size)
+            return false;
+        for (int i = 0; i < this.size; i++) {
+            if (this.highs[i] != other.highs[i] || !this.containers[i].sameKeys(other.containers[i]))
+                return false;
+        }
+        return true;
+    }
+
+    @Override
+    public int hashCode() {
+        int hash = this.size;
+        for (int i = 0; i < this.size; i++)
+            hash = 31 * (31 * hash + this.highs[i]) + this.containers[i].cardinality;
+        return hash;
+    }
+
+    @Override
+    public String toString() {
+        return "RoaringBitSet(cardinality=" + cardinality() + ", length=" + length() + ")";
+    }
+
+    private int indexOf(char high) {
+        if (this.size > 0 && this.highs[this.size - 1] == high)
+            return this.size - 1;
+        return Arrays.binarySearch(this.highs, 0, this.size, high);
+    }
+
+    private void insert(int i, char high, Container container) {
+        if (this.size == this.highs.length) {
+            int capacity = Math.max(4, this.size * 2);
+            this.highs = Arrays.copyOf(this.highs, capacity);
+            this.containers = Arrays.copyOf(this.containers, capacity);
+        }
+        System.arraycopy(this.highs, i, this.highs, i + 1, this.size - i);
+        System.arraycopy(this.containers, i, this.containers, i + 1, this.size - i);
+        this.highs[i] = high;
+        this.containers[i] = container;
+        this.size++;
+    }
+
+    private static abstract class Container implements Cloneable {
+        int cardinality;
+
+        /** Returns the container holding the result; this may be replaced. */
+        abstract Container add(char low);
+
+        abstract boolean contains(char low);
+
+        /** May modify this, never other. */
+        abstract Container and(Container other);
+
+        /** May modify this, never other. */
+        abstract Container or(Container other);
+
+        abstract int nextSetBit(int low);
+
+        abstract int last();
+
+        abstract long ramBytesUsed();
+
+        abstract void write(DataOutput out) throws IOException;
+
+        @Override
+        public abstract Container clone();
+
+        boolean sameKeys(Container other) {
+            if (this.cardinality != other.cardinality)
+                return false;
+            for (int low = nextSetBit(0); low >= 0; low = nextSetBit(low + 1)) {
+                if (!other.contains((char) low))
+                    return false;
+            }
+            return true;
+        }
+    }
+
+    private static class ArrayContainer extends Container {
+        char[] values;
+
+        ArrayContainer(int capacity) {
+            this.values = new char[capacity];
+        }
+
+        @Override
+        Container add(char low) {
+            int i = this.cardinality > 0 && this.values[this.cardinality - 1] < low ? -this.cardinality - 1 : Arrays.binarySearch(this.values, 0, this.cardinality, low);
+            if (i >= 0)
+                return this;
+            if (this.cardinality == ARRAY_MAX)
+                return toBitmap().add(low);
+            i = -i - 1;
+            if (this.cardinality == this.values.length)
+                this.values = Arrays.copyOf(this.values, Math.min(ARRAY_MAX, Math.max(4, this.cardinality * 2)));
+            System.arraycopy(this.values, i, this.values, i + 1, this.cardinality - i);
+            this.values[i] = low;
+            this.cardinality++;
+            return this;
+        }
+
+        @Override
+        boolean contains(char low) {
+            return Arrays.binarySearch(this.values, 0, this.cardinality, low) >= 0;
+        }
+
+        @Override
+        Container and(Container other) {
+            int n = 0;
+            if (other instanceof ArrayContainer) {
+                ArrayContainer o = (ArrayContainer) other;
+                int i = 0, j = 0;
+                while (i < this.cardinality && j < o.cardinality) {
+                    if (this.values[i] < o.values[j])
+                        i++;
+                    else if (this.values[i] > o.values[j])
+                        j++;
+                    else {
+                        this.values[n++] = this.values[i++];
+                        j++;
+                    }
+                }
+            } else {
+                for (int i = 0; i < this.cardinality; i++) {
+                    if (other.contains(this.values[i]))
+                        this.values[n++] = this.values[i];
+                }
+            }
+            this.cardinality = n;
+            return this;
+        }
+
+        @Override
+        Container or(Container other) {
+            if (other instanceof BitmapContainer) {
+                Container result = other.clone();
+                for (int i = 0; i < this.cardinality; i++)
+                    result.add(this.values[i]);
+                return result;
+            }
+            ArrayContainer o = (ArrayContainer) other;
+            char[] values = new char[this.cardinality + o.cardinality];
+            int i = 0, j = 0, n = 0;
+            while (i < this.cardinality || j < o.cardinality) {
+                if (j == o.cardinality || (i < this.cardinality && this.values[i] < o.values[j]))
+                    values[n++] = this.values[i++];
+                else if (i == this.cardinality || this.values[i] > o.values[j])
+                    values[n++] = o.values[j++];
+                else {
+                    values[n++] = this.values[i++];
+                    j++;
+                }
+            }
+            if (n > ARRAY_MAX) {
+                BitmapContainer bitmap = new BitmapContainer();
+                for (int k = 0; k < n; k++)
+                    bitmap.add(values[k]);
+                return bitmap;
+            }
+            this.values = values;
+            this.cardinality = n;
+            return this;
+        }
+
+        @Override
+        int nextSetBit(int low) {
+            if (low > 0xFFFF)
+                return -1;
+            int i = Arrays.binarySearch(this.values, 0, this.cardinality, (char) low);
+            if (i < 0)
+                i = -i - 1;
+            return i < this.cardinality ? this.values[i] : -1;
+        }
+
+        @Override
+        int last() {
+            return this.values[this.cardinality - 1];
+        }
+
+        @Override
+        long ramBytesUsed() {
+            return RamUsageEstimator.NUM_BYTES_OBJECT_HEADER + RamUsageEstimator.NUM_BYTES_INT + RamUsageEstimator.sizeOf(this.values);
+        }
+
+        @Override
+        void write(DataOutput out) throws IOException {
+            for (int i = 0; i < this.cardinality; i++)
+                out.writeShort(this.values[i]);
+        }
+
+        static ArrayContainer read(DataInput in, int cardinality) throws IOException {
+            ArrayContainer container = new ArrayContainer(cardinality);
+            for (int i = 0; i < cardinality; i++)
+                container.values[i] = in.readChar();
+            container.cardinality = cardinality;
+            return container;
+        }
+
+        @Override
+        public ArrayContainer clone() {
+            ArrayContainer clone = new ArrayContainer(0);
+            clone.values = Arrays.copyOf(this.values, this.cardinality);
+            clone.cardinality = this.cardinality;
+            return clone;
+        }
+
+        private BitmapContainer toBitmap() {
+            BitmapContainer bitmap = new BitmapContainer();
+            for (int i = 0; i < this.cardinality; i++)
+                bitmap.add(this.values[i]);
+            return bitmap;
+        }
+    }
+
+    private static class BitmapContainer extends Container {
+        final long[] words;
+
+        BitmapContainer() {
+            this(new long[BITMAP_WORDS]);
+        }
+
+        private BitmapContainer(long[] words) {
+            this.words = words;
+        }
+
+        @Override
+        Container add(char low) {
+            long mask = 1L << low;
+            if ((this.words[low >>> 6] & mask) == 0) {
+                this.words[low >>> 6] |= mask;
+                this.cardinality++;
+            }
+            return this;
+        }
+
+        @Override
+        boolean contains(char low) {
+            return (this.words[low >>> 6] & (1L << low)) != 0;
+        }
+
+        @Override
+        Container and(Container other) {
+            if (other instanceof ArrayContainer) {
+                ArrayContainer o = (ArrayContainer) other;
+                ArrayContainer result = new ArrayContainer(o.cardinality);
+                for (int i = 0; i < o.cardinality; i++) {
+                    if (contains(o.values[i]))
+                        result.values[result.cardinality++] = o.values[i];
+                }
+                return result;
+            }
+            long[] otherWords = ((BitmapContainer) other).words;
+            int cardinality = 0;
+            for (int w = 0; w < BITMAP_WORDS; w++) {
+                this.words[w] &= otherWords[w];
+                cardinality += Long.bitCount(this.words[w]);
+            }
+            this.cardinality = cardinality;
+            return cardinality <= ARRAY_MAX ? toArray() : this;
+        }
+
+        @Override
+        Container or(Container other) {
+            if (other instanceof ArrayContainer) {
+                ArrayContainer o = (ArrayContainer) other;
+                for (int i = 0; i < o.cardinality; i++)
+                    add(o.values[i]);
+                return this;
+            }
+            long[] otherWords = ((BitmapContainer) other).words;
+            int cardinality = 0;
+            for (int w = 0; w < BITMAP_WORDS; w++) {
+                this.words[w] |= otherWords[w];
+                cardinality += Long.bitCount(this.words[w]);
+            }
+            this.cardinality = cardinality;
+            return this;
+        }
+
+        @Override
+        int nextSetBit(int low) {
+            if (low > 0xFFFF)
+                return -1;
+            int w = low >>> 6;
+            long word = this.words[w] & (-1L << low);
+            while (true) {
+                if (word != 0)
+                    return (w << 6) + Long.numberOfTrailingZeros(word);
+                if (++w == BITMAP_WORDS)
+                    return -1;
+                word = this.words[w];
+            }
+        }
+
+        @Override
+        int last() {
+            for (int w = BITMAP_WORDS - 1; w >= 0; w--) {
+                if (this.words[w] != 0)
+                    return (w << 6) + 63 - Long.numberOfLeadingZeros(this.words[w]);
+            }
+            return -1;
+        }
+
+        @Override
+        long ramBytesUsed() {
+            return RamUsageEstimator.NUM_BYTES_OBJECT_HEADER + RamUsageEstimator.NUM_BYTES_INT + RamUsageEstimator.sizeOf(this.words);
+        }
+
+        @Override
+        void write(DataOutput out) throws IOException {
+            for (int w = 0; w < BITMAP_WORDS; w++)
+                out.writeLong(this.words[w]);
+        }
+
+        static BitmapContainer read(DataInput in, int cardinality) throws IOException {
+            BitmapContainer container = new BitmapContainer();
+            for (int w = 0; w < BITMAP_WORDS; w++)
+                container.words[w] = in.readLong();
+            container.cardinality = cardinality;
+            return container;
+        }
+
+        @Override
+        public BitmapContainer clone() {
+            BitmapContainer clone = new BitmapContainer(this.words.clone());
+            clone.cardinality = this.cardinality;
+            return clone;
+        }
+
+        private ArrayContainer toArray() {
+            ArrayContainer array = new ArrayContainer(this.cardinality);
+            for (int low = nextSetBit(0); low >= 0; low = nextSetBit(low + 1))
+                array.values[array.cardinality++] = (char) low;
+            return array;
+        }
+    }
+}
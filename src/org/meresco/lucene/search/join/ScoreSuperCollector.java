@@ -47,6 +47,11 @@ public class ScoreSuperCollector extends SuperCollector<ScoreSubCollector> {
         this.keyName = keyName;
     }
 
+    public ScoreSuperCollector(String keyName, byte[] scores) {
+        this.keyName = keyName;
+        this.scores = scores;
+    }
+
     public float score(int key) {
         if (key < this.scores.length) {
             return SmallFloat.byte315ToFloat(this.scores[key]);
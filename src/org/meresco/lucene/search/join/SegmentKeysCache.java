@@ -0,0 +1,98 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2014, 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ * Copyright (C) 2014 Stichting Bibliotheek.nl (BNL) http://www.bibliotheek.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.search.join;
+
+import java.io.IOException;
+import java.util.Map;
+import java.util.WeakHashMap;
+
+import org.apache.lucene.index.AtomicReader;
+import org.apache.lucene.index.AtomicReaderContext;
+import org.apache.lucene.index.DirectoryReader;
+import org.apache.lucene.search.DocIdSet;
+import org.apache.lucene.search.DocIdSetIterator;
+import org.apache.lucene.search.Filter;
+
+/**
+ * Keys of the documents matching a filter, collected per segment and
+ * combined for the whole reader. Segments are identified by their core
+ * cache key; a segment is recollected only when it is new or when documents
+ * in it were deleted, in which case the filter (typically a
+ * CachingWrapperFilter) is re-applied with the current live docs.
+ */
+public class SegmentKeysCache {
+    private final Filter filter;
+    private final String keyName;
+    private final Map<Object, SegmentKeys> segments = new WeakHashMap<Object, SegmentKeys>();
+    private long readerVersion = -1;
+    private RoaringBitSet keys;
+
+    public SegmentKeysCache(Filter filter, String keyName) {
+        this.filter = filter;
+        this.keyName = keyName;
+    }
+
+    public synchronized RoaringBitSet keys(DirectoryReader reader) throws IOException {
+        if (this.keys != null && reader.getVersion() == this.readerVersion)
+            return this.keys;
+        RoaringBitSet keys = new RoaringBitSet();
+        for (AtomicReaderContext context : reader.leaves())
+            keys.or(segmentKeys(context));
+        this.keys = keys;
+        this.readerVersion = reader.getVersion();
+        return keys;
+    }
+
+    private RoaringBitSet segmentKeys(AtomicReaderContext context) throws IOException {
+        AtomicReader reader = context.reader();
+        SegmentKeys segment = this.segments.get(reader.getCoreCacheKey());
+        if (segment != null && segment.numDeletedDocs == reader.numDeletedDocs())
+            return segment.keys;
+        RoaringBitSet keys = new RoaringBitSet();
+        KeyValues keyValues = KeyValuesCache.get(context, this.keyName);
+        DocIdSet docs = this.filter.getDocIdSet(context, reader.getLiveDocs());
+        DocIdSetIterator iterator = docs == null || keyValues == null ? null : docs.iterator();
+        if (iterator != null) {
+            for (int doc = iterator.nextDoc(); doc != DocIdSetIterator.NO_MORE_DOCS; doc = iterator.nextDoc()) {
+                int value = keyValues.get(doc);
+                if (value > 0)
+                    keys.set(value);
+            }
+        }
+        this.segments.put(reader.getCoreCacheKey(), new SegmentKeys(reader.numDeletedDocs(), keys));
+        return keys;
+    }
+
+    private static class SegmentKeys {
+        final int numDeletedDocs;
+        final RoaringBitSet keys;
+
+        SegmentKeys(int numDeletedDocs, RoaringBitSet keys) {
+            this.numDeletedDocs = numDeletedDocs;
+            this.keys = keys;
+        }
+    }
+}
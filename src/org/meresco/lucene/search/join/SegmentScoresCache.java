@@ -0,0 +1,128 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2014, 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ * Copyright (C) 2014 Stichting Bibliotheek.nl (BNL) http://www.bibliotheek.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.search.join;
+
+import java.io.IOException;
+import java.util.Map;
+import java.util.WeakHashMap;
+
+import org.apache.lucene.index.AtomicReaderContext;
+import org.apache.lucene.index.DirectoryReader;
+import org.apache.lucene.search.DocIdSetIterator;
+import org.apache.lucene.search.IndexSearcher;
+import org.apache.lucene.search.Query;
+import org.apache.lucene.search.Scorer;
+import org.apache.lucene.search.Weight;
+import org.apache.lucene.util.ArrayUtil;
+import org.apache.lucene.util.Bits;
+import org.apache.lucene.util.SmallFloat;
+
+/**
+ * Scores per key for a rank query, collected per segment (identified by its
+ * core cache key) and merged into one ScoreSuperCollector for the whole
+ * reader. Segments are scored once, including deleted documents; deletions
+ * are applied with the live docs while merging.
+ */
+public class SegmentScoresCache {
+    private final Query query;
+    private final String keyName;
+    private final Map<Object, SegmentScores> segments = new WeakHashMap<Object, SegmentScores>();
+    private long readerVersion = -1;
+    private ScoreSuperCollector scoreCollector;
+
+    public SegmentScoresCache(Query query, String keyName) {
+        this.query = query;
+        this.keyName = keyName;
+    }
+
+    public synchronized ScoreSuperCollector scoreCollector(IndexSearcher searcher) throws IOException {
+        DirectoryReader reader = (DirectoryReader) searcher.getIndexReader();
+        if (this.scoreCollector != null && reader.getVersion() == this.readerVersion)
+            return this.scoreCollector;
+        Weight weight = null;
+        byte[] scores = new byte[0];
+        for (AtomicReaderContext context : reader.leaves()) {
+            Object coreCacheKey = context.reader().getCoreCacheKey();
+            SegmentScores segment = this.segments.get(coreCacheKey);
+            if (segment == null) {
+                if (weight == null)
+                    weight = searcher.createNormalizedWeight(this.query);
+                segment = collect(context, weight);
+                this.segments.put(coreCacheKey, segment);
+            }
+            scores = segment.mergeInto(scores, context.reader().getLiveDocs());
+        }
+        this.scoreCollector = new ScoreSuperCollector(this.keyName, scores);
+        this.readerVersion = reader.getVersion();
+        return this.scoreCollector;
+    }
+
+    private SegmentScores collect(AtomicReaderContext context, Weight weight) throws IOException {
+        SegmentScores segment = new SegmentScores();
+        KeyValues keyValues = KeyValuesCache.get(context, this.keyName);
+        Scorer scorer = keyValues == null ? null : weight.scorer(context, null);
+        if (scorer == null)
+            return segment;
+        for (int doc = scorer.nextDoc(); doc != DocIdSetIterator.NO_MORE_DOCS; doc = scorer.nextDoc()) {
+            int value = keyValues.get(doc);
+            if (value > 0)
+                segment.add(doc, value, SmallFloat.floatToByte315(scorer.score()));
+        }
+        return segment;
+    }
+
+    private static class SegmentScores {
+        int size = 0;
+        int[] docs = new int[0];
+        int[] keys = new int[0];
+        byte[] scores = new byte[0];
+
+        void add(int doc, int key, byte score) {
+            if (size == docs.length) {
+                docs = ArrayUtil.grow(docs, size + 1);
+                keys = ArrayUtil.grow(keys, docs.length);
+                scores = ArrayUtil.grow(scores, docs.length);
+            }
+            docs[size] = doc;
+            keys[size] = key;
+            scores[size] = score;
+            size++;
+        }
+
+        byte[] mergeInto(byte[] result, Bits liveDocs) {
+            for (int i = 0; i < size; i++) {
+                if (liveDocs != null && !liveDocs.get(docs[i]))
+                    continue;
+                int key = keys[i];
+                if (key >= result.length)
+                    result = ScoreSuperCollector.resize(result, (int) ((key + 1) * 1.25));
+                if (result[key] == 0)
+                    result[key] = scores[i];
+            }
+            return result;
+        }
+    }
+}
@@ -37,10 +37,14 @@ if version >= '2.7':
 from composedquerytest import ComposedQueryTest
 from conversiontest import ConversionTest
 from converttocomposedquerytest import ConvertToComposedQueryTest
+from embeddedlucenetest import EmbeddedLuceneTest, EmbeddedLuceneServerTest
+from exportkeystest import ExportKeysTest
 from extractfilterqueriestest import ExtractFilterQueriesTest
 from fieldregistrytest import FieldRegistryTest
 from fields2lucenedoctest import Fields2LuceneDocTest
 from fieldslisttolucenedocumenttest import FieldsListToLuceneDocumentTest
+from hittest import HitTest
+from keysettest import KeySetTest
 from lucenekeyvaluestoretest import LuceneKeyValueStoreTest
 from lucenequerycomposertest import LuceneQueryComposerTest
 from luceneremotetest import LuceneRemoteTest
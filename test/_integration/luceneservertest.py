@@ -31,7 +31,7 @@ from seecr.test.utils import postRequest, getRequest
 from meresco.components.http.utils import CRLF
 from meresco.components.json import JsonList, JsonDict
 
-from meresco.lucene import ComposedQuery, readOpenBitSet
+from meresco.lucene import ComposedQuery, readOpenBitSet, readKeySet, readRoaringKeySet
 
 
 class LuceneServerTest(IntegrationTestCase):
@@ -113,6 +113,14 @@ class LuceneServerTest(IntegrationTestCase):
                 },
                 'commitCount': 1,
                 'commitTimeout': 10,
+                'refreshInterval': 0.0,
+                'groupCommitWindow': 0.0,
+                'indexingThreads': 1,
+                'indexingQueueSize': 1000,
+                'queryResultCacheSize': 100,
+                'queryResultCacheMaxBytes': 33554432,
+                'warmKeyFields': [],
+                'warmQueries': [],
                 'lruTaxonomyWriterCacheSize': 4000,
                 'maxMergeAtOnce': 2,
                 'numberOfConcurrentTasks': 6,
@@ -144,6 +152,11 @@ class LuceneServerTest(IntegrationTestCase):
                 self.assertTrue(isSet, i)
             else:
                 self.assertFalse(isSet, i)
+        self.assertEquals(range(3, 101), list(readKeySet(body)))
+
+        header, body = postRequest(self.luceneServerPort, '/exportkeys/?exportKey=__key__.field&format=roaring', data=JsonDict(composedQuery.asDict()).dumps(), parse=False)
+        self.assertTrue("200 OK" in header.upper(), header + 2 * CRLF + body)
+        self.assertEquals(range(3, 101), list(readRoaringKeySet(body)))
 
     def testSimilarDocs(self):
         header, body = postRequest(self.luceneServerPort, self._path + '/similarDocuments/?identifier=id1', data="", parse=False)
@@ -27,6 +27,8 @@
 from seecr.test import IntegrationTestCase
 from seecr.test.utils import postRequest, getRequest
 from simplejson import loads
+from meresco.lucene import getJVM
+getJVM()
 from org.apache.lucene.util import OpenBitSet
 from StringIO import StringIO
 from struct import pack
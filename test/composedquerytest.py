@@ -150,6 +150,8 @@ class ComposedQueryTest(SeecrTestCase):
         cq.sortKeys = [dict(sortBy='field', sortDescending=True)]
         cq.clustering = True
         cq.clusteringConfig = {'clusteringEps': 0.2}
+        cq.timeAllowed = 250
+        cq.cursor = 'bGFzdEhpdA=='
 
         d = cq.asDict()
         cq2 = ComposedQuery.fromDict(d)
@@ -165,6 +167,8 @@ class ComposedQueryTest(SeecrTestCase):
         self.assertEquals(({'core': 'coreA', 'keyName': 'keyA', 'query': 'AQuery'}, 'keyA'), queries[0])
         self.assertEquals(({'core': 'coreB', 'keyName': 'keyB', 'query': 'anotherQuery'}, 'keyA'), queries[1])
         self.assertEquals({'clusteringEps': 0.2}, cq2.clusteringConfig)
+        self.assertEquals(250, cq2.timeAllowed)
+        self.assertEquals('bGFzdEhpdA==', cq2.cursor)
 
     def testAddFilterQueriesIncremental(self):
         cq = ComposedQuery('coreA')
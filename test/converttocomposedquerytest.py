@@ -34,6 +34,7 @@ from meresco.core import Observable
 
 from meresco.lucene import LuceneResponse
 from meresco.lucene.converttocomposedquery import ConvertToComposedQuery
+from meresco.lucene.utils import cachedCqlToExpression
 
 
 class ConvertToComposedQueryTest(SeecrTestCase):
@@ -84,6 +85,21 @@ class ConvertToComposedQueryTest(SeecrTestCase):
         self.assertEquals([cqlToExpression("prefix:field=value")], cq.queriesFor('otherCore'))
         self.assertEquals([cqlToExpression('*')], cq.queriesFor('defaultCore'))
 
+    def testQueryParsedOnceAndNotChanged(self):
+        for i in range(2):
+            consume(self.tree.any.executeQuery(query='field=value AND otherCore.prefix:field=value', facets=[]))
+        first, second = [m.kwargs['query'] for m in self.observer.calledMethods]
+        self.assertEquals(cqlToExpression("field=value"), second.queryFor('defaultCore'))
+        self.assertEquals([cqlToExpression("prefix:field=value")], second.queriesFor('otherCore'))
+        self.assertTrue(first.queryFor('defaultCore') is second.queryFor('defaultCore'))
+
+    def testCachedCqlToExpression(self):
+        self.assertTrue(cachedCqlToExpression('field=value') is cachedCqlToExpression('field=value'))
+        expression = cqlToExpression('field=value')
+        self.assertTrue(cachedCqlToExpression(expression) is expression)
+        self.assertEquals(expression, cachedCqlToExpression(parseCQL('field=value')))
+        self.assertFalse(cachedCqlToExpression(parseCQL('field=value')) is cachedCqlToExpression(parseCQL('field=value')))
+
     def testFilterQuery(self):
         consume(self.tree.any.executeQuery(cqlAbstractSyntaxTree=parseCQL('*'), filterQueries=[('otherCore', 'prefix:field=value')], facets=[], start=1))
         self.assertEquals(['executeComposedQuery'], self.observer.calledMethodNames())
@@ -0,0 +1,194 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from simplejson import loads
+
+from seecr.test import SeecrTestCase
+
+from weightless.core import retval
+from weightless.io import reactor
+from weightless.io.utils import asProcess
+
+from meresco.lucene import EmbeddedLuceneServer, EmbeddedLucene, EmbeddedMultiLucene, EmbeddedLuceneCommit, LuceneSettings, ComposedQuery
+from meresco.lucene._connect import UninitializedException
+from meresco.lucene.embeddedlucene import _ThreadPool
+
+
+class EmbeddedLuceneTest(SeecrTestCase):
+    def setUp(self):
+        SeecrTestCase.setUp(self)
+        self.server = _Server()
+        self.lucene = EmbeddedLucene(self.server, settings=LuceneSettings(), name='coreA')
+
+    def testInitialize(self):
+        retval(self.lucene.initialize())
+        self.assertEquals(['updateSettings'], [c[0] for c in self.server.calls])
+        self.assertEquals('coreA', self.server.calls[0][1])
+
+    def testAddAndDelete(self):
+        retval(self.lucene.addDocument(identifier='id:1', fields=[dict(name='field', value='value', type='TextField')]))
+        retval(self.lucene.delete(identifier='id:1'))
+        self.assertEquals(('addDocument', 'coreA', 'id:1'), self.server.calls[0][:3])
+        self.assertEquals([dict(name='field', value='value', type='TextField')], loads(self.server.calls[0][3]))
+        self.assertEquals(('deleteDocument', 'coreA', 'id:1'), self.server.calls[1])
+
+    def testExecuteQuery(self):
+        self.server.results['executeQuery'] = '{"total": 1, "queryTime": 2, "hits": [{"id": "id:1", "score": 1.0}]}'
+        response = retval(self.lucene.executeQuery(luceneQuery=dict(type="MatchAllDocsQuery")))
+        self.assertEquals(1, response.total)
+        self.assertEquals(['id:1'], [hit.id for hit in response.hits])
+        self.assertEquals('executeQuery', self.server.calls[0][0])
+        self.assertEquals('coreA', self.server.calls[0][1])
+
+    def testPrefixSearchAndNumDocs(self):
+        self.server.results['prefixSearch'] = '[["aap", 1], ["aapje", 3]]'
+        self.server.results['numDocs'] = 42
+        response = retval(self.lucene.prefixSearch(fieldname='field', prefix='aa', limit=5))
+        self.assertEquals(['aapje', 'aap'], response.hits)
+        self.assertEquals(('prefixSearch', 'coreA', 'field', 'aa', 5), self.server.calls[0])
+        self.assertEquals(42, retval(self.lucene.numDocs()))
+
+    def testComposedQuery(self):
+        multiLucene = EmbeddedMultiLucene(self.server, defaultCore='coreA')
+        multiLucene.addObserver(self.lucene)
+        self.server.results['executeComposedQuery'] = '{"total": 0, "queryTime": 2, "hits": []}'
+        query = ComposedQuery('coreA')
+        query.setCoreQuery('coreA', query=dict(type="MatchAllDocsQuery"))
+        response = retval(multiLucene.executeComposedQuery(query))
+        self.assertEquals(0, response.total)
+        self.assertEquals('executeComposedQuery', self.server.calls[0][0])
+
+    def testComposedQueries(self):
+        multiLucene = EmbeddedMultiLucene(self.server, defaultCore='coreA')
+        multiLucene.addObserver(self.lucene)
+        self.server.results['executeComposedQueries'] = '[{"total": 0, "queryTime": 2, "hits": []}]'
+        query = ComposedQuery('coreA')
+        query.setCoreQuery('coreA', query=dict(type="MatchAllDocsQuery"))
+        responses = retval(multiLucene.executeQueries([query]))
+        self.assertEquals([0], [response.total for response in responses])
+        self.assertEquals('executeComposedQueries', self.server.calls[0][0])
+        self.assertEquals([query.asDict()], loads(self.server.calls[0][1]))
+
+    def testBulkUpdateAndExecuteQueries(self):
+        self.server.results['bulkUpdate'] = '[{"identifier": "id:1", "status": "OK"}]'
+        self.server.results['executeQueries'] = '[{"total": 1, "queryTime": 2, "hits": [{"id": "id:1", "score": 1.0}]}]'
+        result = retval(self.lucene.addDocuments([dict(identifier='id:1', fields=[dict(name='field', value='value', type='TextField')])]))
+        self.assertEquals([dict(identifier='id:1', status='OK')], result)
+        self.assertEquals(('bulkUpdate', 'coreA'), self.server.calls[0][:2])
+        self.assertEquals('id:1', loads(self.server.calls[0][2])['identifier'])
+        responses = retval(self.lucene.executeQueries([dict(luceneQuery=dict(type="MatchAllDocsQuery"))]))
+        self.assertEquals([1], [response.total for response in responses])
+        self.assertEquals(('executeQueries', 'coreA'), self.server.calls[1][:2])
+
+    def testStatsDrilldownFieldnamesAndSimilarDocuments(self):
+        self.server.results['stats'] = '{"commit": {}}'
+        self.server.results['drilldownFieldnames'] = '["cat"]'
+        self.server.results['similarDocuments'] = '{"total": 0, "queryTime": 2, "hits": []}'
+        self.assertEquals({"commit": {}}, retval(self.lucene.stats()))
+        self.assertEquals(['cat'], retval(self.lucene.drilldownFieldnames(path=['dim', 'a', 'b'], limit=5)).hits)
+        self.assertEquals(('drilldownFieldnames', 'coreA', 'dim', ['a', 'b'], 5), self.server.calls[1])
+        self.assertEquals(0, retval(self.lucene.similarDocuments(identifier='id:1')).total)
+        self.assertEquals(('similarDocuments', 'coreA', 'id:1'), self.server.calls[2])
+
+    def testInitializeAndRetryWhenUninitialized(self):
+        self.server.results['numDocs'] = 42
+        self.server.uninitialized = True
+        self.assertEquals(42, retval(self.lucene.numDocs()))
+        self.assertEquals(['numDocs', 'updateSettings', 'numDocs'], [c[0] for c in self.server.calls])
+
+    def testObserverInitAndCommitAreSynchronous(self):
+        self.lucene.observer_init()
+        EmbeddedLuceneCommit(self.server).commit()
+        self.assertEquals([], self.server.calls)
+        self.assertEquals(['updateSettings', 'commit'], [c[0] for c in self.server.nowCalls])
+        self.assertEquals('coreA', self.server.nowCalls[0][1])
+
+    def testUnsupportedRequest(self):
+        self.assertRaises(NotImplementedError, lambda: retval(self.lucene._connect.send(path='/unknown/')))
+
+
+class EmbeddedLuceneServerTest(SeecrTestCase):
+    def testCallMapsUninitializedException(self):
+        class JavaLucene(object):
+            def numDocs(self, core):
+                raise _JavaError('org.meresco.lucene.Lucene$UninitializedException')
+            def fieldnames(self, core):
+                raise _JavaError('java.lang.IllegalArgumentException')
+        server = EmbeddedLuceneServer.__new__(EmbeddedLuceneServer)
+        server._lucene = JavaLucene()
+        server._pool = None
+        self.assertRaises(UninitializedException, lambda: retval(server.call('numDocs', 'coreA')))
+        self.assertRaises(UninitializedException, lambda: server.callNow('numDocs', 'coreA'))
+        self.assertRaises(_JavaError, lambda: retval(server.call('fieldnames', 'coreA')))
+
+    def testThreadPool(self):
+        results = []
+        def process():
+            pool = _ThreadPool(reactor(), 2)
+            results.append((yield pool.call(lambda a, b: a + b, 1, 2)))
+            try:
+                yield pool.call(lambda: 1 / 0)
+                self.fail()
+            except ZeroDivisionError:
+                results.append('ZeroDivisionError')
+            raise StopIteration(pool)
+        pool = asProcess(process())
+        pool.close()
+        self.assertEquals([3, 'ZeroDivisionError'], results)
+
+
+class _Server(object):
+    def __init__(self):
+        self.calls = []
+        self.nowCalls = []
+        self.results = {}
+        self.uninitialized = False
+
+    def call(self, methodName, *args):
+        self.calls.append((methodName,) + args)
+        if self.uninitialized and methodName != 'updateSettings':
+            self.uninitialized = False
+            raise UninitializedException()
+        raise StopIteration(self.results.get(methodName))
+        yield
+
+    def callNow(self, methodName, *args):
+        self.nowCalls.append((methodName,) + args)
+
+
+class _JavaError(Exception):
+    def __init__(self, className):
+        Exception.__init__(self, className)
+        self._className = className
+
+    def getJavaException(self):
+        className = self._className
+        class JavaClass(object):
+            def getName(self):
+                return className
+        class JavaException(object):
+            def getClass(self):
+                return JavaClass()
+        return JavaException()
@@ -0,0 +1,113 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from struct import pack
+
+from seecr.test import SeecrTestCase, CallTrace
+from weightless.core import retval, consume
+
+from meresco.lucene import ExportKeys, ComposedQuery
+
+
+class ExportKeysTest(SeecrTestCase):
+    def setUp(self):
+        SeecrTestCase.setUp(self)
+        self.exportKeys = ExportKeys(host="localhost", port=12345)
+        self.posts = []
+        self.responses = []
+        def mockPostIfModified(path, data, etag):
+            self.posts.append(dict(path=path, data=data, etag=etag))
+            raise StopIteration(self.responses.pop(0))
+            yield
+        self.exportKeys._connect._postIfModified = mockPostIfModified
+        self.query = ComposedQuery('coreA')
+        self.query.setCoreQuery('coreA', query=dict(type="MatchAllDocsQuery"))
+
+    def testExportKeys(self):
+        self.responses.append(('"coreA:3"', _roaring(1, 5)))
+        keys = retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))
+        self.assertEquals([1, 5], list(keys))
+        self.assertEquals(1, len(self.posts))
+        self.assertEquals('/exportkeys/?exportKey=__key__.field&format=roaring', self.posts[0]['path'])
+        self.assertEquals(None, self.posts[0]['etag'])
+
+    def testRevalidatesCachedKeys(self):
+        self.responses.append(('"coreA:3"', _roaring(1, 5)))
+        self.responses.append(('"coreA:3"', None))
+        self.responses.append(('"coreA:4"', _roaring(2)))
+        keys = retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))
+        keys.add(7)
+        self.assertEquals([1, 5], list(retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))))
+        self.assertEquals('"coreA:3"', self.posts[1]['etag'])
+        self.assertEquals(self.posts[0]['data'], self.posts[1]['data'])
+        self.assertEquals([2], list(retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))))
+        self.assertEquals('"coreA:3"', self.posts[2]['etag'])
+
+    def testCachePerQuery(self):
+        otherQuery = ComposedQuery('coreA')
+        otherQuery.setCoreQuery('coreA', query=dict(type="TermQuery", term=dict(field="field", value="value")))
+        self.responses.append(('"coreA:3"', _roaring(1)))
+        self.responses.append(('"coreA:3"', _roaring(2)))
+        self.assertEquals([1], list(retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))))
+        self.assertEquals([2], list(retval(self.exportKeys.exportKeys(otherQuery, exportKey='__key__.field'))))
+        self.assertEquals([None, None], [post['etag'] for post in self.posts])
+
+    def testUpdateFilterKeySetOnlyWhenChanged(self):
+        observer = CallTrace(emptyGeneratorMethods=['registerFilterKeySet'])
+        self.exportKeys.addObserver(observer)
+        self.responses.append(('"coreA:3"', _bitSet(1)))
+        self.responses.append(('"coreA:3"', None))
+        self.responses.append(('"coreA:4"', _bitSet(2)))
+        for i in xrange(3):
+            consume(self.exportKeys.updateFilterKeySet(name='keys', query=self.query, exportKey='__key__.field'))
+        self.assertEquals(['registerFilterKeySet', 'registerFilterKeySet'], observer.calledMethodNames())
+        self.assertEquals(dict(name='keys', keySet=_bitSet(2)), observer.calledMethods[1].kwargs)
+        self.assertEquals('/exportkeys/?exportKey=__key__.field', self.posts[0]['path'])
+
+    def testFormatsCachedSeparately(self):
+        observer = CallTrace(emptyGeneratorMethods=['registerFilterKeySet'])
+        self.exportKeys.addObserver(observer)
+        self.responses.append(('"coreA:3"', _roaring(1)))
+        self.responses.append(('"coreA:3"', _bitSet(1)))
+        self.assertEquals([1], list(retval(self.exportKeys.exportKeys(self.query, exportKey='__key__.field'))))
+        consume(self.exportKeys.updateFilterKeySet(name='keys', query=self.query, exportKey='__key__.field'))
+        self.assertEquals([None, None], [post['etag'] for post in self.posts])
+        self.assertEquals(dict(name='keys', keySet=_bitSet(1)), observer.calledMethods[0].kwargs)
+
+
+def _roaring(*keys):
+    containers = {}
+    for key in keys:
+        containers.setdefault(key >> 16, []).append(key & 0xffff)
+    data = pack('>i', len(containers))
+    for high, lows in sorted(containers.items()):
+        data += pack('>Hi', high, len(lows)) + pack('>%sH' % len(lows), *sorted(lows))
+    return data
+
+def _bitSet(*keys):
+    words = [0] * (max(keys) / 64 + 1)
+    for key in keys:
+        words[key / 64] |= 1 << (key % 64)
+    return pack('>ii', len(words), len(words)) + ''.join(pack('>Q', word) for word in words)
@@ -45,6 +45,13 @@ class ExtractFilterQueriesTest(SeecrTestCase):
         self.assertEqual(cqlToExpression('field=value'), query)
         self.assertEqual({'core2': [cqlToExpression('f=v')]}, filters)
 
+    def testExpressionIsNotChanged(self):
+        expression = cqlToExpression('field=value AND core2.f=v AND (core2.a=b OR core2.c=d)')
+        query, filters = self.convert(expression, 'core1')
+        self.assertEqual(cqlToExpression('field=value'), query)
+        self.assertEqual({'core2': [cqlToExpression('f=v'), cqlToExpression('a=b OR c=d')]}, filters)
+        self.assertEqual(cqlToExpression('field=value AND core2.f=v AND (core2.a=b OR core2.c=d)'), expression)
+
     def testOtherCoreQueryAtFirst(self):
         query, filters = self.convert(cqlToExpression('core2.f=v AND field=value'), 'core1')
         self.assertEqual(cqlToExpression('field=value'), query)
@@ -0,0 +1,73 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from cPickle import dumps, loads
+
+from seecr.test import SeecrTestCase
+
+from meresco.lucene import LuceneResponse
+from meresco.lucene.hit import Hit, Hits
+
+
+class HitTest(SeecrTestCase):
+    def testHit(self):
+        hit = Hit('id:1', score=0.5)
+        self.assertEquals('id:1', hit.id)
+        self.assertEquals(0.5, hit.score)
+        self.assertRaises(AttributeError, lambda: hit.duplicateCount)
+        self.assertEquals(dict(id='id:1', score=0.5), hit.asDict())
+        self.assertEquals(Hit('id:1', score=0.5), hit)
+        self.assertNotEquals(Hit('id:1', score=0.6), hit)
+        self.assertEquals(hash(Hit('id:1')), hash(hit))
+        self.assertEquals(1, len(set([hit, Hit('id:1', score=0.5)])))
+
+    def testHitFromDict(self):
+        hitDict = {'id': 'id:1', 'score': 0.5}
+        hit = Hit.fromDict(hitDict)
+        self.assertEquals(Hit('id:1', score=0.5), hit)
+        hit.duplicateCount = 2
+        self.assertEquals(2, hitDict['duplicateCount'])
+
+    def testHitsCreatedOnAccess(self):
+        hits = Hits([{'id': 'id:1', 'score': 0.5}, {'id': 'id:2'}])
+        self.assertEquals([None, None], hits._hits)
+        self.assertEquals(2, len(hits))
+        self.assertEquals('id:2', hits[-1].id)
+        self.assertEquals(None, hits._hits[0])
+        self.assertTrue(hits[1] is hits[1])
+        self.assertEquals([Hit('id:1', score=0.5), Hit('id:2')], hits)
+        self.assertEquals([Hit('id:2')], hits[1:])
+
+    def testPickle(self):
+        hit = Hit('id:1', score=0.5)
+        hits = Hits([{'id': 'id:1', 'score': 0.5}, {'id': 'id:2'}])
+        for protocol in [0, 1, 2]:
+            self.assertEquals(hit, loads(dumps(hit, protocol)))
+            self.assertEquals(hits, loads(dumps(hits, protocol)))
+            self.assertEquals(Hits([]), loads(dumps(Hits([]), protocol)))
+
+    def testJson(self):
+        response = LuceneResponse(total=1, hits=Hits([{'id': 'id:1', 'score': 0.5}]))
+        self.assertEquals([Hit('id:1', score=0.5)], LuceneResponse.fromJson(response.asJson()).hits)
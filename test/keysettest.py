@@ -0,0 +1,104 @@
+## begin license ##
+#
+# "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+#
+# Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+# Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco Lucene"
+#
+# "Meresco Lucene" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Lucene" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Lucene"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from struct import pack
+
+from seecr.test import SeecrTestCase
+
+from meresco.lucene import KeySet, readKeySet, readRoaringKeySet, readOpenBitSet
+from meresco.lucene.keyset import readWords
+
+
+class KeySetTest(SeecrTestCase):
+    def testKeySet(self):
+        keys = KeySet([3, 1, 200])
+        self.assertEquals([1, 3, 200], list(keys))
+        self.assertEquals(3, len(keys))
+        self.assertTrue(200 in keys)
+        self.assertFalse(2 in keys)
+        self.assertFalse(-1 in keys)
+        keys.add(2)
+        self.assertEquals([1, 2, 3, 200], list(keys))
+        self.assertFalse(KeySet())
+        self.assertEquals(KeySet(), KeySet(iter([])))
+
+    def testIntersectAndUnion(self):
+        a = KeySet([1, 2, 70000])
+        b = KeySet([2, 3, 70000, 140000])
+        self.assertEquals([2, 70000], list(a & b))
+        self.assertEquals([1, 2, 3, 70000, 140000], list(a | b))
+        self.assertEquals([1, 2, 70000], list(a))
+        a.intersect(b)
+        self.assertEquals(KeySet([2, 70000]), a)
+        a.union(KeySet([5]))
+        self.assertEquals([2, 5, 70000], list(a))
+        self.assertEquals([2, 3, 70000, 140000], list(b))
+
+    def testLargeKeySpace(self):
+        keys = KeySet([5, 2**40])
+        self.assertTrue(2**40 in keys)
+        self.assertFalse(2**40 + 1 in keys)
+        self.assertEquals([5, 2**40], list(keys))
+        keys.add(2**45)
+        self.assertEquals(3, len(keys))
+        self.assertEquals([2**40], list(keys & KeySet([2**40, 2**50])))
+        self.assertEquals(5, len(keys | KeySet([2**40, 2**50, 7])))
+
+    def testDenseContainers(self):
+        keys = KeySet(xrange(100000))
+        self.assertEquals(100000, len(keys))
+        self.assertTrue(99999 in keys)
+        self.assertFalse(100000 in keys)
+        other = KeySet(xrange(50000, 150000))
+        self.assertEquals(KeySet(xrange(50000, 100000)), keys & other)
+        self.assertEquals(range(150000), list(keys | other))
+        self.assertEquals(KeySet([70000]), (keys & other) & KeySet([70000, 200000]))
+        copy = keys.copy()
+        copy.add(200000)
+        self.assertFalse(200000 in keys)
+        self.assertTrue(200000 in copy)
+
+    def testReadOpenBitSetFormat(self):
+        words = [2 | 1 << 63, 0, 1]
+        data = pack('>ii', 3, 4) + ''.join(pack('>Q', word) for word in words + [0])
+        self.assertEquals([-2**63 + 2, 0, 1, 0], readWords(data, 8))
+        self.assertEquals([1, 63, 128], list(readKeySet(data)))
+        bitSet = readOpenBitSet(data)
+        self.assertEquals(3, bitSet.cardinality())
+        self.assertTrue(bitSet.get(63))
+
+    def testReadRoaringFormat(self):
+        data = pack('>i', 2)
+        data += pack('>Hi', 0, 2) + pack('>2H', 1, 65535)
+        bitmap = [0] * 1024
+        for low in xrange(5000):
+            bitmap[low >> 6] |= 1 << (low & 63)
+        data += pack('>Hi', 3, 5000) + ''.join(pack('>Q', word) for word in bitmap)
+        keys = readRoaringKeySet(data)
+        self.assertEquals(5002, len(keys))
+        self.assertEquals([1, 65535, 3 << 16, (3 << 16) + 1], list(keys)[:4])
+        self.assertTrue((3 << 16) + 4999 in keys)
+        self.assertFalse((3 << 16) + 5000 in keys)
+        self.assertEquals(KeySet(), readRoaringKeySet(pack('>i', 0)))
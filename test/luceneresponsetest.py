@@ -36,3 +36,17 @@ class LuceneResponseTest(SeecrTestCase):
         self.assertEquals(['1','2','3'], response2.hits)
         self.assertEquals([{'terms':[], 'fieldname':'field'}], response2.drilldownData)
 
+    def testInfoComputedOnFirstAccess(self):
+        calls = []
+        def info():
+            calls.append(True)
+            return {'type': 'Query'}
+        response = LuceneResponse(total=3, hits=[])
+        self.assertFalse(hasattr(response, 'info'))
+        response.info = info
+        self.assertEquals([], calls)
+        self.assertEquals({'type': 'Query'}, response.info)
+        self.assertEquals({'type': 'Query'}, response.info)
+        self.assertEquals(1, len(calls))
+        response.info = lambda: {'type': 'ComposedQuery'}
+        self.assertEquals({'type': 'ComposedQuery'}, LuceneResponse.fromJson(response.asJson()).info)
@@ -38,6 +38,18 @@ class LuceneSettingsTest(SeecrTestCase):
         self.assertTrue(settings.verbose)
         self.assertFalse(newSettings.verbose)
 
+    def testJavaDefaultsCreatedOnFirstUse(self):
+        settings = LuceneSettings()
+        self.assertFalse('analyzer' in vars(settings))
+        self.assertFalse('similarity' in vars(settings))
+        clone = settings.clone()
+        self.assertFalse('analyzer' in vars(clone))
+        self.assertEquals('MerescoStandardAnalyzer', settings.analyzer.getClass().getSimpleName())
+        self.assertTrue(settings.analyzer is clone.analyzer)
+        self.assertEquals('BM25Similarity', settings.similarity.getClass().getSimpleName())
+        analyzer = object()
+        self.assertTrue(LuceneSettings(analyzer=analyzer).clone().analyzer is analyzer)
+
     def testAsPostDict(self):
         settings = LuceneSettings()
         self.assertEqual({
@@ -45,11 +57,19 @@ class LuceneSettingsTest(SeecrTestCase):
                 'maxMergeAtOnce': 2,
                 'similarity': {'type': 'BM25Similarity'},
                 'numberOfConcurrentTasks': 6,
+                'indexingThreads': 1,
+                'indexingQueueSize': 1000,
+                'queryResultCacheSize': 100,
+                'queryResultCacheMaxBytes': 33554432,
+                'warmKeyFields': [],
+                'warmQueries': [],
                 'segmentsPerTier': 8.0,
                 'analyzer': {'type': 'MerescoStandardAnalyzer'},
                 'drilldownFields': [],
                 'commitCount': 100000,
-                'commitTimeout': 10
+                'commitTimeout': 10,
+                'refreshInterval': 0.0,
+                'groupCommitWindow': 0.0
             }, settings.asPostDict())
 
     def testPostDictWithDrilldownFields(self):
@@ -62,11 +82,19 @@ class LuceneSettingsTest(SeecrTestCase):
                 'maxMergeAtOnce': 2,
                 'similarity': {'type': 'BM25Similarity'},
                 'numberOfConcurrentTasks': 6,
+                'indexingThreads': 1,
+                'indexingQueueSize': 1000,
+                'queryResultCacheSize': 100,
+                'queryResultCacheMaxBytes': 33554432,
+                'warmKeyFields': [],
+                'warmQueries': [],
                 'segmentsPerTier': 8.0,
                 'analyzer': {'type': 'MerescoStandardAnalyzer'},
                 'drilldownFields': [
                     {'dim': 'field0', 'hierarchical': True, 'fieldname': None, 'multiValued': False},
                     {'dim': 'field1', 'hierarchical': True, 'fieldname': '$facets_2', 'multiValued': True}],
                 'commitCount': 100000,
-                'commitTimeout': 10
+                'commitTimeout': 10,
+                'refreshInterval': 0.0,
+                'groupCommitWindow': 0.0
             }, settings.asPostDict())
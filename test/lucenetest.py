@@ -31,6 +31,7 @@ from meresco.lucene.queryexpressiontolucenequerydict import QueryExpressionToLuc
 from weightless.core import consume, retval
 from cqlparser import cqlToExpression
 from simplejson import loads
+from zlib import compressobj, DEFLATED, MAX_WBITS
 
 
 class LuceneTest(SeecrTestCase):
@@ -58,14 +59,50 @@ class LuceneTest(SeecrTestCase):
         self._lucene.observer_init()
         self.assertEqual(1, len(self.post))
         self.assertEqual('/lucene/settings/', self.post[0]['path'])
-        self.assertEqual('{"lruTaxonomyWriterCacheSize": 4000, "maxMergeAtOnce": 2, "similarity": {"type": "BM25Similarity"}, "numberOfConcurrentTasks": 6, "segmentsPerTier": 8.0, "analyzer": {"type": "MerescoStandardAnalyzer"}, "drilldownFields": [], "commitCount": 100000, "commitTimeout": 10}', self.post[0]['data'])
+        self.assertEqual({
+                "lruTaxonomyWriterCacheSize": 4000,
+                "maxMergeAtOnce": 2,
+                "similarity": {"type": "BM25Similarity"},
+                "numberOfConcurrentTasks": 6,
+                "indexingThreads": 1,
+                "indexingQueueSize": 1000,
+                "queryResultCacheSize": 100,
+                "queryResultCacheMaxBytes": 33554432,
+                "warmKeyFields": [],
+                "warmQueries": [],
+                "segmentsPerTier": 8.0,
+                "analyzer": {"type": "MerescoStandardAnalyzer"},
+                "drilldownFields": [],
+                "commitCount": 100000,
+                "commitTimeout": 10,
+                "refreshInterval": 0.0,
+                "groupCommitWindow": 0.0
+            }, loads(self.post[0]['data']))
 
     def testInitialize(self):
         self.assertEqual([], self.post)
         consume(self._lucene.initialize())
         self.assertEqual(1, len(self.post))
         self.assertEqual('/lucene/settings/', self.post[0]['path'])
-        self.assertEqual('{"lruTaxonomyWriterCacheSize": 4000, "maxMergeAtOnce": 2, "similarity": {"type": "BM25Similarity"}, "numberOfConcurrentTasks": 6, "segmentsPerTier": 8.0, "analyzer": {"type": "MerescoStandardAnalyzer"}, "drilldownFields": [], "commitCount": 100000, "commitTimeout": 10}', self.post[0]['data'])
+        self.assertEqual({
+                "lruTaxonomyWriterCacheSize": 4000,
+                "maxMergeAtOnce": 2,
+                "similarity": {"type": "BM25Similarity"},
+                "numberOfConcurrentTasks": 6,
+                "indexingThreads": 1,
+                "indexingQueueSize": 1000,
+                "queryResultCacheSize": 100,
+                "queryResultCacheMaxBytes": 33554432,
+                "warmKeyFields": [],
+                "warmQueries": [],
+                "segmentsPerTier": 8.0,
+                "analyzer": {"type": "MerescoStandardAnalyzer"},
+                "drilldownFields": [],
+                "commitCount": 100000,
+                "commitTimeout": 10,
+                "refreshInterval": 0.0,
+                "groupCommitWindow": 0.0
+            }, loads(self.post[0]['data']))
 
     def testAdd(self):
         registry = FieldRegistry()
@@ -83,6 +120,24 @@ class LuceneTest(SeecrTestCase):
         self.assertEqual('/lucene/update/?', self.post[0]['path'])
         self.assertEqual('[{"type": "TextField", "name": "id", "value": "id1"}]', self.post[0]['data'])
 
+    def testAddDocuments(self):
+        registry = FieldRegistry()
+        self.response = '[{"identifier": "id1", "status": "OK"}, {"identifier": "id2", "status": "ERROR", "error": "Oops"}]'
+        result = retval(self._lucene.addDocuments([
+                dict(identifier='id1', fields=[registry.createField("id", "id1")]),
+                dict(identifier='id2', delete=True),
+            ]))
+        self.assertEqual(1, len(self.post))
+        self.assertEqual('/lucene/bulkUpdate/', self.post[0]['path'])
+        self.assertEqual([
+                {"identifier": "id1", "fields": [{"type": "TextField", "name": "id", "value": "id1"}]},
+                {"identifier": "id2", "delete": True},
+            ], [loads(line) for line in self.post[0]['data'].split('\n')])
+        self.assertEqual([
+                {"identifier": "id1", "status": "OK"},
+                {"identifier": "id2", "status": "ERROR", "error": "Oops"},
+            ], result)
+
     def testDelete(self):
         consume(self._lucene.delete(identifier='id1'))
         self.assertEqual(1, len(self.post))
@@ -104,7 +159,9 @@ class LuceneTest(SeecrTestCase):
                 ],
                 "suggestions": {
                     "valeu": ["value"]
-                }
+                },
+                "passes": 1,
+                "hitsCollected": 887,
             }).dumps()
         query = QueryExpressionToLuceneQueryDict([], LuceneSettings()).convert(cqlToExpression("field=value"))
         response = retval(self._lucene.executeQuery(
@@ -140,6 +197,62 @@ class LuceneTest(SeecrTestCase):
                 {"fieldname": "facet", "path": [], "terms": [{"term": "term", "count": 1}]}
             ], response.drilldownData)
         self.assertEqual({'valeu': ['value']}, response.suggestions)
+        self.assertEqual(1, response.passes)
+        self.assertEqual(887, response.hitsCollected)
+
+    def testExecuteQueryWithTimeAllowed(self):
+        self.response = JsonDict({
+                "total": 887,
+                "queryTime": 6,
+                "partial": True,
+                "cursor": "bGFzdEhpdA==",
+                "hits": [],
+            }).dumps()
+        query = QueryExpressionToLuceneQueryDict([], LuceneSettings()).convert(cqlToExpression("field=value"))
+        response = retval(self._lucene.executeQuery(luceneQuery=query, timeAllowed=250, cursor="Y3Vyc29y"))
+        self.assertEqual(250, loads(self.post[0]['data'])['timeAllowed'])
+        self.assertEqual("Y3Vyc29y", loads(self.post[0]['data'])['cursor'])
+        self.assertEqual(True, response.partial)
+        self.assertEqual("bGFzdEhpdA==", response.cursor)
+
+    def testExecuteQueries(self):
+        self.response = JsonList([
+                {"total": 887, "queryTime": 6, "hits": [{"id": "record:1", "score": 0.1234}]},
+                {"total": 3, "queryTime": 2, "hits": []},
+            ]).dumps()
+        query = QueryExpressionToLuceneQueryDict([], LuceneSettings()).convert(cqlToExpression("field=value"))
+        responses = retval(self._lucene.executeQueries([
+                dict(luceneQuery=query, stop=5),
+                dict(luceneQuery=query, stop=0, facets=[dict(maxTerms=10, fieldname='facet')]),
+            ]))
+        self.assertEqual(1, len(self.post))
+        self.assertEqual('/lucene/multiQuery/', self.post[0]['path'])
+        requests = loads(self.post[0]['data'])
+        self.assertEqual(2, len(requests))
+        self.assertEqual(5, requests[0]['stop'])
+        self.assertEqual([{"fieldname": "facet", "maxTerms": 10}], requests[1]['facets'])
+        self.assertEqual([887, 3], [response.total for response in responses])
+        self.assertEqual("record:1", responses[0].hits[0].id)
+        self.assertEqual(0, responses[1].info['query']['stop'])
+
+    def testExecuteNoQueries(self):
+        self.assertEqual([], retval(self._lucene.executeQueries([])))
+        self.assertEqual([], self.post)
+
+    def testExecuteQueryWithGzipCompression(self):
+        requests = []
+        class HttpRequest(object):
+            def httprequest1_1(self, **kwargs):
+                requests.append(kwargs)
+                body = compressobj(9, DEFLATED, 16 + MAX_WBITS)
+                raise StopIteration(({'StatusCode': '200', 'Headers': {'Content-Encoding': 'gzip'}}, body.compress('{"total": 3, "queryTime": 1, "hits": []}') + body.flush()))
+                yield
+        lucene = Lucene(host="localhost", port=1234, name='lucene', settings=LuceneSettings(), compress=True)
+        lucene.addObserver(HttpRequest())
+        query = QueryExpressionToLuceneQueryDict([], LuceneSettings()).convert(cqlToExpression("field=value"))
+        response = retval(lucene.executeQuery(luceneQuery=query))
+        self.assertEqual(3, response.total)
+        self.assertEqual({'Accept-Encoding': 'gzip'}, requests[0]['headers'])
 
     def testPrefixSearch(self):
         self.response = JsonList([["value0", 1], ["value1", 2]]).dumps()
@@ -155,6 +268,12 @@ class LuceneTest(SeecrTestCase):
         self.assertEqual(150, result)
         self.assertEqual([{'data': None, 'path': '/lucene/numDocs/'}], self.post)
 
+    def testStats(self):
+        self.response = '{"indexing": {"threads": 1, "queueSize": 1000, "queueDepth": 0, "documentsIndexed": 3, "documentsPerSecond": 1.5}}'
+        result = retval(self._lucene.stats())
+        self.assertEqual({'threads': 1, 'queueSize': 1000, 'queueDepth': 0, 'documentsIndexed': 3, 'documentsPerSecond': 1.5}, result['indexing'])
+        self.assertEqual([{'data': None, 'path': '/lucene/stats/'}], self.post)
+
     def testFieldnames(self):
         self.response = '["field1", "field2"]'
         result = retval(self._lucene.fieldnames())
@@ -208,6 +327,14 @@ class LuceneTest(SeecrTestCase):
                 "numberOfConcurrentTasks": 5,
             }, loads(self.post[1]['data']))
 
+        consume(self._lucene.setSettings(commitTimeout=300, commitCount=1000000, refreshInterval=0.5))
+        self.assertEqual(3, len(self.post))
+        self.assertEqual({
+                "commitTimeout": 300,
+                "commitCount": 1000000,
+                "refreshInterval": 0.5,
+            }, loads(self.post[2]['data']))
+
     def testSimilarDocs(self):
         self.response = JsonDict({
                 "total": 887,
@@ -24,7 +24,7 @@
 ## end license ##
 
 from seecr.test import SeecrTestCase, CallTrace
-from meresco.lucene import LuceneSettings, VM, Lucene
+from meresco.lucene import LuceneSettings, getJVM, Lucene
 from meresco.lucene.fieldregistry import FieldRegistry
 from os.path import join
 import gc
@@ -57,7 +57,7 @@ class LuceneTestCase(SeecrTestCase):
             SeecrTestCase.tearDown(self)
 
     def _getJavaObjects(self):
-        refs = VM._dumpRefs(classes=True)
+        refs = getJVM()._dumpRefs(classes=True)
         return set(
                 [(c, refs[c])
                 for c in refs.keys()
@@ -25,7 +25,7 @@
 ## end license ##
 
 from cqlparser import cqlToExpression
-from meresco.components.json import JsonDict
+from meresco.components.json import JsonDict, JsonList
 from meresco.lucene import LuceneSettings, Lucene
 from meresco.lucene.composedquery import ComposedQuery
 from meresco.lucene.fieldregistry import FieldRegistry
@@ -108,6 +108,28 @@ class MultiLuceneTest(SeecrTestCase):
                 "_filterQueries": {}
             }, loads(self.post[0]['data']))
 
+    def testExecuteQueries(self):
+        self.response = JsonList([
+                {"total": 887, "queryTime": 6, "hits": [{"id": "record:1", "score": 0.1234}]},
+                {"total": 3, "queryTime": 2, "hits": []},
+            ]).dumps()
+
+        cq1 = ComposedQuery('coreA')
+        cq1.setCoreQuery("coreA", QueryExpressionToLuceneQueryDict([], LuceneSettings()).convert(cqlToExpression("field=value")))
+        cq2 = ComposedQuery('coreA')
+        cq2.stop = 0
+        responses = retval(self._multiLucene.executeQueries([cq1, cq2]))
+        self.assertEqual(1, len(self.post))
+        self.assertEqual("/multiQuery/", self.post[0]['path'])
+        self.assertEqual([cq1.asDict(), cq2.asDict()], loads(self.post[0]['data']))
+        self.assertEqual([887, 3], [response.total for response in responses])
+        self.assertEqual("record:1", responses[0].hits[0].id)
+        self.assertEqual('ComposedQuery', responses[1].info['type'])
+
+    def testExecuteNoQueries(self):
+        self.assertEqual([], retval(self._multiLucene.executeQueries([])))
+        self.assertEqual([], self.post)
+
     def testAddTypeAndMissingValueToSortField(self):
         self.response = JsonDict({
                 "total": 887,
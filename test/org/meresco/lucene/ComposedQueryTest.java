@@ -39,8 +39,10 @@ import javax.json.JsonObject;
 
 import org.apache.lucene.facet.FacetsConfig;
 import org.apache.lucene.index.Term;
+import org.apache.lucene.search.FieldDoc;
 import org.apache.lucene.search.Query;
 import org.apache.lucene.search.TermQuery;
+import org.apache.lucene.util.BytesRef;
 import org.junit.Test;
 import org.meresco.lucene.ClusterConfig.ClusterField;
 import org.meresco.lucene.ComposedQuery.Unite;
@@ -133,6 +135,8 @@ public class ComposedQueryTest {
                 					.add("fieldname", "dcterms:title")
                 					.add("filterValue", "a")
                 					.add("weight", 0.3))))
+                .add("_timeAllowed", 250)
+                .add("_cursor", SearchCursor.encode(new FieldDoc(5, 1.5f, new Object[] {1.5f, new BytesRef("id5")})))
                 .build();
         Map<String, QueryConverter> queryConverters = new HashMap<String, QueryConverter>() {{
             put("coreA", new QueryConverter(new FacetsConfig()));
@@ -142,6 +146,8 @@ public class ComposedQueryTest {
         assertEquals("coreA", q.resultsFrom);
         assertEquals(1, q.queryData.start);
         assertEquals(10, q.queryData.stop);
+        assertEquals(250, q.queryData.timeAllowed);
+        assertArrayEquals(new Object[] {1.5f, new BytesRef("id5")}, ((FieldDoc) q.queryData.searchAfter).fields);
         assertEquals(new HashSet<String>() {{add("coreA"); add("coreB");}}, q.cores);
         assertEquals(new TermQuery(new Term("field", "value0")), q.queryFor("coreA"));
         assertEquals(new TermQuery(new Term("field", "value1")), q.queryFor("coreB"));
@@ -37,6 +37,7 @@ import java.io.StringReader;
 
 import javax.json.Json;
 import javax.json.JsonArray;
+import javax.json.stream.JsonParsingException;
 
 import org.apache.lucene.document.Document;
 import org.apache.lucene.document.DoubleField;
@@ -217,6 +218,36 @@ public class DocumentStringToDocumentTest {
         assertArrayEquals(new String[] { "path", "sub"}, field.path);
     }
 
+    @Test
+    public void testStreamingAndJsonArrayGiveSameDocument() throws Exception {
+        JsonArray json = Json.createArrayBuilder()
+                .add(Json.createObjectBuilder()
+                    .add("type", "TextField")
+                    .add("name", "text")
+                    .add("value", "some text")
+                    .add("termVectors", true))
+                .add(Json.createObjectBuilder()
+                    .add("type", "FacetField")
+                    .add("name", "facet")
+                    .add("path", Json.createArrayBuilder().add("a").add("b")))
+                .add(Json.createObjectBuilder()
+                    .add("type", "NumericField")
+                    .add("name", "number")
+                    .add("value", 12345678901L))
+                .build();
+        Document streamed = convert(json.toString());
+        Document fromTree = new DocumentStringToDocument(json, mockTermNumerator).convert();
+        assertEquals(fromTree.getFields().size(), streamed.getFields().size());
+        assertTrue(streamed.getField("text").fieldType().storeTermVectors());
+        assertArrayEquals(((FacetField) fromTree.getFields().get(1)).path, ((FacetField) streamed.getFields().get(1)).path);
+        assertEquals(12345678901L, streamed.getField("number").numericValue().longValue());
+    }
+
+    @Test(expected=JsonParsingException.class)
+    public void testStreamingRejectsNonList() {
+        convert("{\"type\": \"StringField\"}");
+    }
+
     private Document convert(String documentString) {
         Reader reader = new StringReader(documentString);
         try {
@@ -31,6 +31,7 @@ import static org.junit.Assert.assertTrue;
 
 import java.io.StringReader;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.List;
 
 import org.apache.lucene.analysis.core.WhitespaceAnalyzer;
@@ -56,6 +57,14 @@ public class LuceneSettingsTest {
                 + "\"numberOfConcurrentTasks\":6,"
                 + "\"commitCount\":100000,"
                 + "\"commitTimeout\":10,"
+                + "\"refreshInterval\":0.0,"
+                + "\"groupCommitWindow\":0.0,"
+                + "\"indexingThreads\":1,"
+                + "\"indexingQueueSize\":1000,"
+                + "\"queryResultCacheSize\":100,"
+                + "\"queryResultCacheMaxBytes\":33554432,"
+                + "\"warmKeyFields\":[],"
+                + "\"warmQueries\":[],"
                 + "\"clustering\":{"
                 + "\"clusteringEps\":0.4,"
                 + "\"clusteringMinPoints\":1,"
@@ -66,7 +75,7 @@ public class LuceneSettingsTest {
     @Test
     public void testSettingsFromJson() throws Exception {
         LuceneSettings settings = new LuceneSettings();
-        String json = "{\"commitCount\": 1, \"commitTimeout\": 1, \"lruTaxonomyWriterCacheSize\": 1, \"maxMergeAtOnce\": 1, \"segmentsPerTier\": 1.0, \"numberOfConcurrentTasks\": 1}";
+        String json = "{\"commitCount\": 1, \"commitTimeout\": 1, \"lruTaxonomyWriterCacheSize\": 1, \"maxMergeAtOnce\": 1, \"segmentsPerTier\": 1.0, \"numberOfConcurrentTasks\": 1, \"indexingThreads\": 4, \"indexingQueueSize\": 10, \"refreshInterval\": 0.5, \"groupCommitWindow\": 0.01, \"queryResultCacheSize\": 5, \"queryResultCacheMaxBytes\": 1024}";
 
         settings.updateSettings(new StringReader(json));
         assertEquals(1, settings.commitCount);
@@ -75,6 +84,23 @@ public class LuceneSettingsTest {
         assertEquals(1, settings.maxMergeAtOnce);
         assertEquals(1.0, settings.segmentsPerTier, 0);
         assertEquals(1, settings.commitTimeout);
+        assertEquals(4, settings.indexingThreads);
+        assertEquals(10, settings.indexingQueueSize);
+        assertEquals(5, settings.queryResultCacheSize);
+        assertEquals(1024, settings.queryResultCacheMaxBytes);
+        assertEquals(0.5, settings.refreshInterval, 0);
+        assertEquals(0.01, settings.groupCommitWindow, 0);
+    }
+
+    @Test
+    public void testWarmSettingsFromJson() throws Exception {
+        LuceneSettings settings = new LuceneSettings();
+        String json = "{\"warmKeyFields\": [\"keyA\"], \"warmQueries\": [{\"type\": \"TermQuery\", \"term\": {\"field\": \"field\", \"value\": \"value\"}}]}";
+
+        settings.updateSettings(new StringReader(json));
+        assertEquals(Arrays.asList("keyA"), settings.warmKeyFields);
+        assertEquals(1, settings.warmQueries.size());
+        assertEquals("[\"keyA\"]", settings.asJson().getJsonArray("warmKeyFields").toString());
     }
 
     @SuppressWarnings("serial")
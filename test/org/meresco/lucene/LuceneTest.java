@@ -31,15 +31,21 @@ import static org.junit.Assert.assertFalse;
 import static org.junit.Assert.assertNotSame;
 import static org.junit.Assert.assertSame;
 import static org.junit.Assert.assertTrue;
+import static org.junit.Assert.fail;
 
+import java.io.File;
 import java.io.IOException;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.Collections;
 import java.util.HashMap;
 import java.util.HashSet;
 import java.util.List;
 import java.util.Map;
 import java.util.Set;
+import java.util.concurrent.Future;
+
+import javax.json.JsonObject;
 
 import org.apache.lucene.document.Document;
 import org.apache.lucene.document.Field;
@@ -51,9 +57,12 @@ import org.apache.lucene.document.StringField;
 import org.apache.lucene.document.TextField;
 import org.apache.lucene.facet.FacetField;
 import org.apache.lucene.facet.FacetsConfig;
+import org.apache.lucene.facet.taxonomy.OrdinalsReader;
+import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.index.Term;
 import org.apache.lucene.search.BooleanClause.Occur;
 import org.apache.lucene.search.BooleanQuery;
+import org.apache.lucene.search.DocIdSet;
 import org.apache.lucene.search.Filter;
 import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.search.Query;
@@ -61,7 +70,7 @@ import org.apache.lucene.search.QueryWrapperFilter;
 import org.apache.lucene.search.Sort;
 import org.apache.lucene.search.SortField;
 import org.apache.lucene.search.TermQuery;
-import org.apache.lucene.util.OpenBitSet;
+import org.apache.lucene.util.Bits;
 import org.junit.After;
 import org.junit.Before;
 import org.junit.Test;
@@ -75,6 +84,7 @@ import org.meresco.lucene.search.MerescoCluster.DocScore;
 import org.meresco.lucene.search.MerescoCluster.TermScore;
 import org.meresco.lucene.search.join.AggregateScoreSuperCollector;
 import org.meresco.lucene.search.join.KeySuperCollector;
+import org.meresco.lucene.search.join.RoaringBitSet;
 import org.meresco.lucene.search.join.ScoreSuperCollector;
 
 
@@ -128,6 +138,21 @@ public class LuceneTest extends SeecrTestCase {
         assertEquals(2, response.hits.size());
     }
 
+    @Test
+    public void testUpdateAndRemoveCountOnceTowardsCommitCount() throws Exception {
+        lucene.getSettings().commitCount = 3;
+        lucene.updateDocument("id1", new Document());
+        lucene.updateDocument("id2", new Document());
+        lucene.removeDocument("id1");
+        assertEquals(0, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        lucene.commit(2);
+        assertEquals(0, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        lucene.commit(1);
+        LuceneResponse response = lucene.executeQuery(new MatchAllDocsQuery());
+        assertEquals(1, response.total);
+        assertEquals("id2", response.hits.get(0).id);
+    }
+
     @Test
     public void testAddTwiceUpdatesDocument() throws Exception {
         Document doc1 = new Document();
@@ -313,6 +338,55 @@ public class LuceneTest extends SeecrTestCase {
         assertEquals("id1", result.hits.get(2).id);
     }
 
+    @Test
+    public void testCursorPaging() throws Exception {
+        for (int i = 0; i < 25; i++) {
+            Document doc = new Document();
+            doc.add(new StringField("field1", String.format("%02d", 24 - i), Store.NO));
+            lucene.addDocument("id" + i, doc);
+        }
+        for (Sort sort : new Sort[] {null, new Sort(new SortField("field1", SortField.Type.STRING))}) {
+            QueryData q = new QueryData();
+            q.sort = sort;
+            List<String> ids = new ArrayList<>();
+            LuceneResponse response = lucene.executeQuery(q);
+            while (true) {
+                assertEquals(25, response.total);
+                for (Hit hit : response.hits)
+                    ids.add(hit.id);
+                if (response.cursor == null)
+                    break;
+                q.searchAfter = SearchCursor.decode(response.cursor);
+                response = lucene.executeQuery(q);
+            }
+            assertEquals(25, ids.size());
+            assertEquals(25, new HashSet<>(ids).size());
+            // ties on score are broken by identifier
+            assertEquals(sort == null ? "id0" : "id24", ids.get(0));
+            assertEquals(sort == null ? "id9" : "id0", ids.get(24));
+        }
+    }
+
+    @Test
+    public void testExecuteQueries() throws Exception {
+        for (int i = 0; i < 5; i++) {
+            Document doc = new Document();
+            doc.add(new StringField("field1", i % 2 == 0 ? "even" : "odd", Store.NO));
+            lucene.addDocument("id" + i, doc);
+        }
+        List<QueryData> queries = new ArrayList<>();
+        for (String value : new String[] {"even", "odd", "none"}) {
+            QueryData q = new QueryData();
+            q.query = new TermQuery(new Term("field1", value));
+            queries.add(q);
+        }
+        List<LuceneResponse> responses = lucene.executeQueries(queries);
+        assertEquals(3, responses.size());
+        assertEquals(3, responses.get(0).total);
+        assertEquals(2, responses.get(1).total);
+        assertEquals(0, responses.get(2).total);
+    }
+
     @Test
     public void testCommitTimer() throws Exception {
         lucene.close();
@@ -341,6 +415,145 @@ public class LuceneTest extends SeecrTestCase {
         assertEquals(3, lucene.executeQuery(new MatchAllDocsQuery()).total);
     }
 
+    @Test
+    public void testRefreshIntervalShowsDocumentsBeforeCommit() throws Exception {
+        lucene.close();
+        LuceneSettings settings = new LuceneSettings();
+        settings.commitTimeout = 10;
+        settings.commitCount = 1000;
+        settings.refreshInterval = 0.1;
+        lucene = new Lucene(this.tmpDir, settings);
+        lucene.addDocument("id1", new Document());
+        assertEquals(0, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        Thread.sleep(300);
+        assertEquals(1, lucene.executeQuery(new MatchAllDocsQuery()).total);
+    }
+
+    @Test
+    public void testCommitStats() throws Exception {
+        lucene.addDocument("id1", new Document());
+        lucene.addDocument("id2", new Document());
+        JsonObject commitStats = lucene.stats().getJsonObject("commit");
+        assertEquals(2, commitStats.getInt("commits"));
+        assertEquals(1, commitStats.getInt("lastBatchSize"));
+        assertEquals(0, commitStats.getInt("pendingUpdates"));
+    }
+
+    @Test
+    public void testFailedCommitIsReportedAndRescheduled() throws Exception {
+        lucene.close();
+        lucene = new Lucene("failing", this.tmpDir);
+        final int[] failures = {1};
+        lucene.data = new Lucene.LuceneData() {
+            public void commit() throws Exception {
+                if (failures[0]-- > 0)
+                    throw new IOException("disk full");
+                super.commit();
+            }
+        };
+        LuceneSettings settings = new LuceneSettings();
+        settings.commitCount = 1;
+        settings.commitTimeout = 1;
+        lucene.initSettings(settings);
+        try {
+            lucene.addDocument("id1", new Document());
+            fail();
+        } catch (IOException e) {
+            assertEquals("disk full", e.getMessage());
+        }
+        JsonObject commitStats = lucene.stats().getJsonObject("commit");
+        assertEquals(0, commitStats.getInt("commits"));
+        assertEquals(1, commitStats.getInt("failedCommits"));
+        assertEquals("java.io.IOException: disk full", commitStats.getString("lastCommitError"));
+        assertEquals(1, commitStats.getInt("pendingUpdates"));
+
+        Thread.sleep(1500);
+        commitStats = lucene.stats().getJsonObject("commit");
+        assertEquals(1, commitStats.getInt("commits"));
+        assertEquals(0, commitStats.getInt("pendingUpdates"));
+        assertEquals(1, lucene.executeQuery(new MatchAllDocsQuery()).total);
+    }
+
+    @Test
+    public void testConcurrentUpdatesShareCommits() throws Exception {
+        lucene.getSettings().groupCommitWindow = 0.05;
+        List<Thread> threads = new ArrayList<Thread>();
+        for (int i = 0; i < 10; i++) {
+            final String identifier = "id" + i;
+            threads.add(new Thread() {
+                public void run() {
+                    try {
+                        lucene.addDocument(identifier, new Document());
+                    } catch (Exception e) {
+                        throw new RuntimeException(e);
+                    }
+                }
+            });
+        }
+        for (Thread thread : threads)
+            thread.start();
+        for (Thread thread : threads)
+            thread.join();
+        assertEquals(10, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        assertTrue(lucene.stats().getJsonObject("commit").getInt("commits") < 10);
+    }
+
+    @Test
+    public void testOrdinalsReaderNotBlockedByCommitOrRefresh() throws Exception {
+        final OrdinalsReader[] result = new OrdinalsReader[1];
+        Thread thread = new Thread() {
+            public void run() {
+                result[0] = lucene.getOrdinalsReader("$facets");
+            }
+        };
+        synchronized (lucene) {
+            thread.start();
+            thread.join(5000);
+            assertTrue(result[0] != null);
+        }
+        assertSame(result[0], lucene.getOrdinalsReader("$facets"));
+    }
+
+    @Test
+    public void testQueryResultCache() throws Exception {
+        lucene.addDocument("id1", new Document());
+        assertEquals(1, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        assertEquals(1, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        assertEquals(1, lucene.executeQuery(new MatchAllDocsQuery(), 0, 5).total);
+        JsonObject cacheStats = lucene.stats().getJsonObject("queryResultCache");
+        assertEquals(1, cacheStats.getInt("hits"));
+        assertEquals(2, cacheStats.getInt("misses"));
+        assertEquals(2, cacheStats.getInt("size"));
+
+        LuceneResponse first = lucene.executeQuery(new MatchAllDocsQuery(), 0, 3);
+        LuceneResponse cached = lucene.executeQuery(new MatchAllDocsQuery(), 0, 3);
+        assertEquals(1, cached.passes);
+        assertEquals(first.passes, cached.passes);
+        assertEquals(first.hitsCollected, cached.hitsCollected);
+        assertEquals(first.partial, cached.partial);
+        assertEquals(first.cursor, cached.cursor);
+        assertEquals(first.times, cached.times);
+
+        lucene.addDocument("id2", new Document());
+        assertEquals(2, lucene.executeQuery(new MatchAllDocsQuery()).total);
+        assertEquals(3, lucene.stats().getJsonObject("queryResultCache").getInt("misses"));
+    }
+
+    @Test
+    public void testTimeAllowed() throws Exception {
+        for (int i = 0; i < 20; i++)
+            lucene.addDocument("id" + i, new Document());
+        QueryData q = new QueryData();
+        q.timeAllowed = 10000;
+        LuceneResponse response = lucene.executeQuery(q);
+        assertEquals(20, response.total);
+        assertFalse(response.partial);
+        assertFalse(response.toJson().containsKey("partial"));
+
+        response.partial = true;
+        assertTrue(response.toJson().getBoolean("partial"));
+    }
+
     @Test
     public void testStartStop() throws Exception {
         Document doc1 = new Document();
@@ -422,7 +635,7 @@ public class LuceneTest extends SeecrTestCase {
         final KeySuperCollector k = new KeySuperCollector("field1");
         assertEquals(2, lucene.executeQuery(new QueryData(), null, null, null, null, new ArrayList<KeySuperCollector>() {{ add(k); }}).total);
 
-        OpenBitSet collectedKeys = k.getCollectedKeys();
+        RoaringBitSet collectedKeys = k.getCollectedKeys();
         assertEquals(false, collectedKeys.get(0));
         assertEquals(true, collectedKeys.get(1));
         assertEquals(true, collectedKeys.get(2));
@@ -435,7 +648,7 @@ public class LuceneTest extends SeecrTestCase {
         q.query = field0Query;
         assertEquals(1, lucene.executeQuery(q, null, null, null, null, new ArrayList<KeySuperCollector>() {{ add(k1); }}).total);
 
-        OpenBitSet keysWithFilter = k1.getCollectedKeys();
+        RoaringBitSet keysWithFilter = k1.getCollectedKeys();
         assertEquals(false, keysWithFilter.get(0));
         assertEquals(true, keysWithFilter.get(1));
         assertEquals(false, keysWithFilter.get(2));
@@ -657,6 +870,54 @@ public class LuceneTest extends SeecrTestCase {
         assertEquals(5, result.hits.size());
     }
 
+    @SuppressWarnings({ "serial", "rawtypes", "unchecked" })
+    @Test
+    public void testGroupingInOnePass() throws Exception {
+        for (int i=0; i<30; i++)
+            addDocument(lucene, "urn:" + i, new HashMap() {{put("__key__", 42);}}, new HashMap() {{put("field0", "v0");}});
+        for (int i=30; i<35; i++)
+            addDocument(lucene, "urn:" + i, null, new HashMap() {{put("field0", "v0");}});
+
+        QueryData q = new QueryData();
+        q.groupingField = "__key__";
+        q.stop = 3;
+        LuceneResponse result = lucene.executeQuery(q);
+        assertEquals(35, result.total);
+        assertEquals(3, result.hits.size());
+        assertEquals(1, result.passes);
+        assertEquals(35, result.hitsCollected);
+        assertEquals(30, ((GroupingHit) result.hits.get(0)).duplicates.size());
+        assertEquals("urn:0", result.hits.get(0).id);
+        assertEquals("urn:30", result.hits.get(1).id);
+        assertEquals("urn:31", result.hits.get(2).id);
+    }
+
+    @Test
+    public void testSortedGroupingInOnePass() throws Exception {
+        for (int i = 0; i < 30; i++) {
+            Document doc = new Document();
+            doc.add(new NumericDocValuesField("__key__", 42L));
+            doc.add(new IntField("sort", i, Field.Store.NO));
+            lucene.addDocument("urn:" + i, doc);
+        }
+        for (int i = 30; i < 35; i++) {
+            Document doc = new Document();
+            doc.add(new IntField("sort", i - 20, Field.Store.NO));
+            lucene.addDocument("urn:" + i, doc);
+        }
+
+        QueryData q = new QueryData();
+        q.groupingField = "__key__";
+        q.stop = 3;
+        q.sort = new Sort(new SortField("sort", SortField.Type.INT, true));
+        LuceneResponse result = lucene.executeQuery(q);
+        assertEquals(35, result.total);
+        assertEquals(1, result.passes);
+        assertEquals(35, result.hitsCollected);
+        assertEquals(Arrays.asList("urn:29", "urn:34", "urn:33"), hitIds(result));
+        assertEquals(30, ((GroupingHit) result.hits.get(0)).duplicates.size());
+    }
+
     @Test
     public void testInterpolateEps() throws Exception {
     	ClusterConfig clusterConfig = lucene.getSettings().clusterConfig;
@@ -1030,9 +1291,9 @@ public class LuceneTest extends SeecrTestCase {
         }
         lucene.realCommit();
         long t0 = System.currentTimeMillis();
-        OpenBitSet keys1 = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
+        RoaringBitSet keys1 = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
         long t1 = System.currentTimeMillis();
-        OpenBitSet keys2 = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
+        RoaringBitSet keys2 = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
         long t2 = System.currentTimeMillis();
         assertTrue(t2 - t1 <= t1 - t0);
         assertTrue(t2 - t1 < 2);
@@ -1052,23 +1313,69 @@ public class LuceneTest extends SeecrTestCase {
         assertNotSame(keys1, keys2);
     }
 
+    @Test
+    public void testSearcherWarmingOnRefresh() throws Exception {
+        lucene.getSettings().warmKeyFields.add("field1");
+        int warmCount = lucene.stats().getJsonObject("warming").getInt("warmCount");
+        Document doc = new Document();
+        doc.add(new NumericDocValuesField("field1", 1));
+        lucene.addDocument("id1", doc);
+        JsonObject warming = lucene.stats().getJsonObject("warming");
+        assertEquals(warmCount + 1, warming.getInt("warmCount"));
+
+        lucene.collectKeys(new MatchAllDocsQuery(), "field2", null);
+        assertEquals(1, lucene.stats().getJsonObject("warming").getInt("keyFields"));
+    }
+
+    @Test
+    public void testKeyValuesCacheMemoryPerField() throws Exception {
+        lucene.getSettings().warmKeyFields.add("kvcField");
+        Document doc = new Document();
+        doc.add(new NumericDocValuesField("kvcField", 5));
+        lucene.addDocument("id1", doc);
+        JsonObject usage = lucene.stats().getJsonObject("keyValuesCache").getJsonObject("kvcField");
+        assertEquals(1, usage.getInt("loadedSegments"));
+        assertTrue(usage.getInt("bytes") > 0);
+        assertTrue(lucene.collectKeys(new MatchAllDocsQuery(), "kvcField", null).get(5));
+    }
+
+    @Test
+    public void testKeyAndScoreCollectorCachingHonoursDeletes() throws Exception {
+        for (int i=1; i<=3; i++) {
+            Document doc = new Document();
+            doc.add(new NumericDocValuesField("field1", i));
+            lucene.addDocument("id" + i, doc);
+        }
+        RoaringBitSet keys = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
+        assertTrue(keys.get(2));
+        assertEquals(1.0, this.lucene.scoreCollector("field1", new MatchAllDocsQuery()).score(2), 0);
+
+        lucene.deleteDocument("id2");
+        keys = this.lucene.collectKeys(new MatchAllDocsQuery(), "field1", null);
+        assertTrue(keys.get(1));
+        assertFalse(keys.get(2));
+        assertTrue(keys.get(3));
+        assertEquals(0, this.lucene.scoreCollector("field1", new MatchAllDocsQuery()).score(2), 0);
+        assertEquals(1.0, this.lucene.scoreCollector("field1", new MatchAllDocsQuery()).score(3), 0);
+    }
+
     @Test
     public void testDontClearCachesIfNothingChanged() throws Exception {
         Document doc1 = new Document();
         doc1.add(new NumericDocValuesField("keyfield", 1));
         lucene.addDocument("id1", doc1);
         ScoreSuperCollector scoreCollector1 = lucene.scoreCollector("keyfield", new MatchAllDocsQuery());
-        OpenBitSet keys1 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
+        RoaringBitSet keys1 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
         lucene.realCommit();
         lucene.realCommit();
         ScoreSuperCollector scoreCollector2 = lucene.scoreCollector("keyfield", new MatchAllDocsQuery());
-        OpenBitSet keys2 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
+        RoaringBitSet keys2 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
         assertSame(scoreCollector1, scoreCollector2);
         assertSame(keys1, keys2);
         lucene.addDocument("id1", new Document());
         lucene.realCommit();
         ScoreSuperCollector scoreCollector3 = lucene.scoreCollector("keyfield", new MatchAllDocsQuery());
-        OpenBitSet keys3 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
+        RoaringBitSet keys3 = lucene.collectKeys(new MatchAllDocsQuery(), "keyfield", null);
         assertNotSame(scoreCollector1, scoreCollector3);
         assertNotSame(keys1, keys3);
     }
@@ -1134,6 +1441,135 @@ public class LuceneTest extends SeecrTestCase {
         assertEquals(expectedHitIds, responseHitIds);
     }
 
+    @Test
+    public void testTiedScoresGiveSamePagesWithMultipleTasks() throws Exception {
+        Lucene multiTaskLucene = tiedScoresLucene(new File(this.tmpDir, "tied"), 12000);
+        try {
+            Query query = new TermQuery(new Term("field", "value"));
+            Set<String> seen = new HashSet<String>();
+            for (int start = 0; start < 12000; start += 1000) {
+                List<String> page = hitIds(multiTaskLucene.executeQuery(query, start, start + 1000));
+                assertEquals(1000, page.size());
+                assertEquals(page, hitIds(multiTaskLucene.executeQuery(query, start, start + 1000)));
+                seen.addAll(page);
+            }
+            assertEquals(12000, seen.size());
+        } finally {
+            multiTaskLucene.close();
+        }
+    }
+
+    @Test
+    public void testCursorWithTiedScoresAndMultipleTasks() throws Exception {
+        Lucene multiTaskLucene = tiedScoresLucene(new File(this.tmpDir, "cursor"), 12000);
+        try {
+            QueryData q = new QueryData();
+            q.query = new TermQuery(new Term("field", "value"));
+            q.stop = 1000;
+            List<String> ids = new ArrayList<String>();
+            LuceneResponse response = multiTaskLucene.executeQuery(q);
+            while (true) {
+                ids.addAll(hitIds(response));
+                if (response.cursor == null)
+                    break;
+                q.searchAfter = SearchCursor.decode(response.cursor);
+                response = multiTaskLucene.executeQuery(q);
+            }
+            assertEquals(12000, ids.size());
+            assertEquals(12000, new HashSet<String>(ids).size());
+        } finally {
+            multiTaskLucene.close();
+        }
+    }
+
+    @Test
+    public void testCursorPagingAcrossCommit() throws Exception {
+        for (int i = 0; i < 25; i++)
+            lucene.addDocument(String.format("id%02d", i), new Document());
+        QueryData q = new QueryData();
+        LuceneResponse response = lucene.executeQuery(q);
+        List<String> ids = new ArrayList<>(hitIds(response));
+        assertEquals(Arrays.asList("id00", "id01", "id02", "id03", "id04", "id05", "id06", "id07", "id08", "id09"), ids);
+
+        lucene.addDocument("id03", new Document());
+        lucene.deleteDocument("id15");
+        lucene.addDocument("id04a", new Document());
+        lucene.addDocument("id30", new Document());
+        lucene.realCommit();
+
+        while (response.cursor != null) {
+            q.searchAfter = SearchCursor.decode(response.cursor);
+            response = lucene.executeQuery(q);
+            ids.addAll(hitIds(response));
+        }
+        assertEquals(25, ids.size());
+        assertEquals(25, new HashSet<String>(ids).size());
+        assertEquals("id10", ids.get(10));
+        assertFalse(ids.contains("id15"));
+        assertFalse(ids.contains("id04a"));
+        assertEquals("id30", ids.get(24));
+    }
+
+    @Test
+    public void testTimeAllowedStopsSearch() throws Exception {
+        Lucene multiTaskLucene = tiedScoresLucene(new File(this.tmpDir, "slow"), 12000);
+        try {
+            Filter slowFilter = new QueryWrapperFilter(new TermQuery(new Term("field", "value"))) {
+                @Override
+                public DocIdSet getDocIdSet(AtomicReaderContext context, Bits acceptDocs) throws IOException {
+                    try {
+                        Thread.sleep(100);
+                    } catch (InterruptedException e) {
+                        throw new RuntimeException(e);
+                    }
+                    return super.getDocIdSet(context, acceptDocs);
+                }
+            };
+            QueryData q = new QueryData();
+            q.timeAllowed = 50;
+            LuceneResponse response = multiTaskLucene.executeQuery(q, null, null, Collections.singletonList(slowFilter), null, null);
+            assertTrue(response.partial);
+            assertTrue(response.total > 0);
+            assertTrue(response.total < 12000);
+            assertEquals(1, response.passes);
+
+            q.timeAllowed = 0;
+            response = multiTaskLucene.executeQuery(q, null, null, Collections.singletonList(slowFilter), null, null);
+            assertFalse(response.partial);
+            assertEquals(12000, response.total);
+        } finally {
+            multiTaskLucene.close();
+        }
+    }
+
+    /**
+     * Lucene, without query result cache and with several search tasks, with
+     * count docs that all score the same for field:value.
+     */
+    static Lucene tiedScoresLucene(File stateDir, int count) throws Exception {
+        LuceneSettings settings = new LuceneSettings();
+        settings.queryResultCacheSize = 0;
+        settings.numberOfConcurrentTasks = 4;
+        Lucene lucene = new Lucene(stateDir, settings);
+        List<Future<Void>> futures = new ArrayList<Future<Void>>();
+        for (int i = 0; i < count; i++) {
+            Document doc = new Document();
+            doc.add(new StringField("field", "value", Store.NO));
+            futures.add(lucene.submitUpdateDocument("id" + i, doc));
+        }
+        for (Future<Void> future : futures)
+            IndexingPipeline.waitFor(future);
+        lucene.realCommit();
+        return lucene;
+    }
+
+    static List<String> hitIds(LuceneResponse response) {
+        List<String> ids = new ArrayList<String>();
+        for (Hit hit : response.hits)
+            ids.add(hit.id);
+        return ids;
+    }
+
     public static void compareHitsOrdered(LuceneResponse response, String... hitIds) {
         List<String> responseHitIds = new ArrayList<String>();
         for (Hit hit : response.hits)
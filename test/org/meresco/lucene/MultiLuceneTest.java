@@ -26,13 +26,16 @@
 package org.meresco.lucene;
 
 import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
 import static org.junit.Assert.assertTrue;
 
 import java.io.File;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.Collections;
 import java.util.Comparator;
 import java.util.HashMap;
+import java.util.List;
 import java.util.Map;
 
 import org.apache.lucene.index.Term;
@@ -42,13 +45,13 @@ import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.search.Sort;
 import org.apache.lucene.search.SortField;
 import org.apache.lucene.search.TermQuery;
-import org.apache.lucene.util.OpenBitSet;
 import org.junit.After;
 import org.junit.Before;
 import org.junit.Test;
 import org.meresco.lucene.LuceneResponse.DrilldownData;
 import org.meresco.lucene.QueryConverter.FacetRequest;
 import org.meresco.lucene.search.TermFrequencySimilarity;
+import org.meresco.lucene.search.join.RoaringBitSet;
 
 public class MultiLuceneTest extends SeecrTestCase {
 
@@ -131,6 +134,18 @@ public class MultiLuceneTest extends SeecrTestCase {
         LuceneTest.compareHits(result, "A-Q", "A-QU", "A-MQ", "A-MQU");
     }
 
+    @Test
+    public void testExecuteQueries() throws Exception {
+        ComposedQuery q1 = new ComposedQuery("coreA", new TermQuery(new Term("Q", "true")));
+        ComposedQuery q2 = new ComposedQuery("coreA", new MatchAllDocsQuery());
+        q2.setCoreQuery("coreB", new TermQuery(new Term("N", "true")));
+        q2.addMatch("coreA", "coreB", "A", "B");
+        List<LuceneResponse> results = multiLucene.executeQueries(Arrays.asList(q1, q2));
+        assertEquals(2, results.size());
+        LuceneTest.compareHits(results.get(0), "A-Q", "A-QU", "A-MQ", "A-MQU");
+        LuceneTest.compareHits(results.get(1), "A-M", "A-MU", "A-MQ", "A-MQU");
+    }
+
     @Test
     public void testJoinQuery() throws Exception {
         ComposedQuery q = new ComposedQuery("coreA", new MatchAllDocsQuery());
@@ -623,6 +638,11 @@ public class MultiLuceneTest extends SeecrTestCase {
         assertEquals(1, result.drilldownData.get(2).terms.size());
         assertEquals("true", result.drilldownData.get(2).terms.get(0).label);
         assertEquals(1, result.drilldownData.get(2).terms.get(0).count);
+        for (String core : new String[] {"coreB", "coreC"}) {
+            assertTrue(result.times.containsKey("collectKeysTime_" + core));
+            assertTrue(result.times.containsKey("facetTime_" + core));
+        }
+        assertFalse(result.times.containsKey("collectKeysTime_coreA"));
     }
 
     @Test
@@ -808,7 +828,7 @@ public class MultiLuceneTest extends SeecrTestCase {
         q.addMatch("coreA", "coreB", "A", "B");
         LuceneResponse result = multiLucene.executeComposedQuery(q, "A");
         assertEquals(4, result.total);
-        OpenBitSet expected = new OpenBitSet();
+        RoaringBitSet expected = new RoaringBitSet();
         expected.set(5);
         expected.set(6);
         expected.set(7);
@@ -816,13 +836,27 @@ public class MultiLuceneTest extends SeecrTestCase {
         assertEquals(expected, result.keys);
     }
     
+    @SuppressWarnings({ "unchecked", "serial", "rawtypes" })
+    @Test
+    public void testIndexGeneration() throws Exception {
+        ComposedQuery q = new ComposedQuery("coreA");
+        q.setCoreQuery("coreB", new MatchAllDocsQuery());
+        String generation = multiLucene.indexGeneration(q);
+        assertTrue(generation, generation.matches("coreA:\\d+,coreB:\\d+"));
+        assertEquals(generation, multiLucene.indexGeneration(q));
+        LuceneTest.addDocument(luceneC, "C-T", new HashMap() {{put("C", 9);}}, new HashMap());
+        assertEquals(generation, multiLucene.indexGeneration(q));
+        LuceneTest.addDocument(luceneB, "B-Q", new HashMap() {{put("B", 12);}}, new HashMap());
+        assertFalse(generation.equals(multiLucene.indexGeneration(q)));
+    }
+
     @Test
     public void testExportKeysSingleCore() throws Exception {
         ComposedQuery q = new ComposedQuery("coreA");
         q.setCoreQuery("coreA", new TermQuery(new Term("M", "true")));
         LuceneResponse result = multiLucene.executeComposedQuery(q, "A");
         assertEquals(4, result.total);
-        OpenBitSet expected = new OpenBitSet();
+        RoaringBitSet expected = new RoaringBitSet();
         expected.set(5);
         expected.set(6);
         expected.set(7);
@@ -0,0 +1,66 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertTrue;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.Callable;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
+
+import org.junit.Test;
+
+public class ParallelTasksTest {
+
+    @Test
+    public void testMoreTasksThanThreadsRunInCaller() throws Exception {
+        int count = 64;
+        final CountDownLatch started = new CountDownLatch(count);
+        List<Callable<String>> tasks = new ArrayList<>();
+        for (int i = 0; i < count; i++) {
+            final int n = i;
+            tasks.add(new Callable<String>() {
+                public String call() throws Exception {
+                    started.countDown();
+                    started.await(10, TimeUnit.MILLISECONDS);
+                    return Thread.currentThread().getName() + ":" + n;
+                }
+            });
+        }
+        List<String> results = ParallelTasks.invokeAll(tasks);
+        assertEquals(count, results.size());
+        int inCaller = 0;
+        for (int i = 0; i < count; i++) {
+            assertEquals(":" + i, results.get(i).substring(results.get(i).lastIndexOf(':')));
+            if (results.get(i).startsWith(Thread.currentThread().getName() + ":"))
+                inCaller++;
+        }
+        assertTrue(inCaller > 1);
+    }
+}
@@ -0,0 +1,96 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertNull;
+import static org.junit.Assert.assertSame;
+import static org.junit.Assert.assertTrue;
+
+import java.util.Arrays;
+import java.util.List;
+
+import javax.json.JsonObject;
+
+import org.junit.Test;
+import org.meresco.lucene.LuceneResponse.Hit;
+
+public class QueryResultCacheTest {
+
+    @Test
+    public void testEvictsLeastRecentlyUsedByBytes() throws Exception {
+        long size = QueryResultCache.sizeOf(response(10));
+        QueryResultCache cache = new QueryResultCache(100, size * 10 + size / 2);
+        LuceneResponse first = response(10);
+        cache.put(key(1), first);
+        for (int i = 2; i <= 10; i++)
+            cache.put(key(i), response(10));
+        assertEquals(10, cache.size());
+        assertEquals(10 * size, cache.bytes());
+        assertSame(first, cache.get(key(1)));
+
+        cache.put(key(11), response(10));
+        assertEquals(10, cache.size());
+        assertEquals(10 * size, cache.bytes());
+        assertSame(first, cache.get(key(1)));
+        assertNull(cache.get(key(2)));
+    }
+
+    @Test
+    public void testDoesNotCacheLargeResponses() throws Exception {
+        QueryResultCache cache = new QueryResultCache(100, 10 * QueryResultCache.sizeOf(response(10)));
+        cache.put(key(1), response(11));
+        cache.put(key(2), response(10));
+        assertEquals(1, cache.size());
+        assertNull(cache.get(key(1)));
+
+        JsonObject stats = cache.stats();
+        assertEquals(1, stats.getInt("rejected"));
+        assertEquals(QueryResultCache.sizeOf(response(10)), stats.getJsonNumber("bytes").longValue());
+    }
+
+    @Test
+    public void testSizeOf() throws Exception {
+        long empty = QueryResultCache.sizeOf(response(0));
+        assertTrue(QueryResultCache.sizeOf(response(100)) > empty + 100 * 64);
+
+        LuceneResponse response = response(0);
+        response.drilldownData.add(new LuceneResponse.DrilldownData("field"));
+        response.drilldownData.get(0).terms = Arrays.asList(new LuceneResponse.DrilldownData.Term("term", 1));
+        assertTrue(QueryResultCache.sizeOf(response) > empty);
+    }
+
+    private static LuceneResponse response(int hits) {
+        LuceneResponse response = new LuceneResponse(hits);
+        for (int i = 0; i < hits; i++)
+            response.addHit(new Hit("id" + i, 1.0f));
+        return response;
+    }
+
+    private static List<Object> key(int n) {
+        return Arrays.<Object>asList(n);
+    }
+}
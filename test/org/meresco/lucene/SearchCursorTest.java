@@ -0,0 +1,70 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene;
+
+import static org.junit.Assert.assertArrayEquals;
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertNull;
+
+import javax.xml.bind.DatatypeConverter;
+
+import org.apache.lucene.search.FieldDoc;
+import org.apache.lucene.search.ScoreDoc;
+import org.apache.lucene.util.BytesRef;
+import org.junit.Test;
+
+public class SearchCursorTest {
+
+    @Test
+    public void testScoreDocHasNoCursor() {
+        assertNull(SearchCursor.encode(new ScoreDoc(42, 0.1f)));
+    }
+
+    @Test
+    public void testFieldDoc() {
+        Object[] fields = new Object[] {new BytesRef("ab\u00e9"), null, 3, 4L, 0.5f, 1.0 / 3};
+        FieldDoc fieldDoc = SearchCursor.decode(SearchCursor.encode(new FieldDoc(7, 1.5f, fields)));
+        assertArrayEquals(fields, fieldDoc.fields);
+    }
+
+    @Test
+    public void testDocIdIsNotPartOfTheCursor() {
+        Object[] fields = new Object[] {0.5f, new BytesRef("id1")};
+        String cursor = SearchCursor.encode(new FieldDoc(7, 0.5f, fields));
+        assertEquals(cursor, SearchCursor.encode(new FieldDoc(8, 0.5f, fields)));
+        assertEquals(Integer.MAX_VALUE, SearchCursor.decode(cursor).doc);
+    }
+
+    @Test(expected=IllegalArgumentException.class)
+    public void testCursorWithoutSortValues() {
+        SearchCursor.decode(DatatypeConverter.printBase64Binary("{\"doc\": 42, \"score\": 0, \"fields\": []}".getBytes()));
+    }
+
+    @Test(expected=IllegalArgumentException.class)
+    public void testInvalidCursor() {
+        SearchCursor.decode("bm90IGpzb24=");
+    }
+}
@@ -32,10 +32,12 @@ import java.util.List;
 import java.util.concurrent.ExecutorService;
 import java.util.concurrent.Executors;
 
+import org.apache.lucene.document.Document;
 import org.apache.lucene.index.AtomicReaderContext;
 import org.apache.lucene.index.DirectoryReader;
 import org.apache.lucene.index.IndexWriter;
 import org.apache.lucene.index.IndexWriterConfig;
+import org.apache.lucene.search.MatchAllDocsQuery;
 import org.apache.lucene.store.Directory;
 import org.apache.lucene.store.SimpleFSDirectory;
 import org.apache.lucene.util.Version;
@@ -44,6 +46,8 @@ import org.junit.Before;
 import org.junit.Test;
 import org.meresco.lucene.analysis.MerescoStandardAnalyzer;
 import org.meresco.lucene.search.SuperIndexSearcher;
+import org.meresco.lucene.search.SuperIndexSearcher.Slice;
+import org.meresco.lucene.search.TotalHitCountSuperCollector;
 import org.meresco.lucene.test.DummyIndexReader;
 
 public class SuperIndexSearcherTest extends SeecrTestCase {
@@ -73,80 +77,84 @@ public class SuperIndexSearcherTest extends SeecrTestCase {
     }
 
     @Test
-    public void testGroupLeaves() {
+    public void testSlicesSingleSegment() {
         List<AtomicReaderContext> contexts = new ArrayList<AtomicReaderContext>();
         contexts.add(DummyIndexReader.dummyIndexReader(10).getContext());
-        List<List<AtomicReaderContext>> result = this.sis.group_leaves_test(contexts, 5);
+        List<List<Slice>> result = this.sis.slices_test(contexts, 5, 10);
         assertEquals(1, result.size());
-        List<AtomicReaderContext> firstContext = result.get(0);
-        assertEquals(1, firstContext.size());
+        assertSlices(result.get(0), 10, 0, 10);
     }
 
     @Test
-    public void testGroupLeaves1ForEach() {
+    public void testSlicesConsecutiveDocsPerRange() {
         ArrayList<AtomicReaderContext> contexts = new ArrayList<AtomicReaderContext>();
-        contexts.add(DummyIndexReader.dummyIndexReader(10).getContext());
+        contexts.add(DummyIndexReader.dummyIndexReader(6).getContext());
         contexts.add(DummyIndexReader.dummyIndexReader(9).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(8).getContext());
         contexts.add(DummyIndexReader.dummyIndexReader(7).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(6).getContext());
-        List<List<AtomicReaderContext>> result = this.sis.group_leaves_test(contexts, 5);
-        assertEquals(5, result.size());
-        for (int i = 0; i < 5; i++) {
-            List<AtomicReaderContext> context = result.get(i);
-            assertEquals(1, context.size());
-        }
+        List<List<Slice>> result = this.sis.slices_test(contexts, 5, 5);
+        assertEquals(4, result.size());
+        assertSlices(result.get(0), 6, 0, 6);
+        assertSlices(result.get(1), 9, 0, 5);
+        assertSlices(result.get(2), 9, 5, 9, 7, 0, 2);
+        assertSlices(result.get(3), 7, 2, 7);
     }
 
     @Test
-    public void testGroupLeaves1TooMuch() {
+    public void testSlicesKeepSegmentOrderForOneRange() {
         ArrayList<AtomicReaderContext> contexts = new ArrayList<AtomicReaderContext>();
-        contexts.add(DummyIndexReader.dummyIndexReader(10).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(9).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(8).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(7).getContext());
         contexts.add(DummyIndexReader.dummyIndexReader(6).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(5).getContext());
-        List<List<AtomicReaderContext>> result = this.sis.group_leaves_test(contexts, 5);
-        assertEquals(5, result.size());
-        for (int i = 0; i < 4; i++) {
-            List<AtomicReaderContext> context = result.get(i);
-            assertEquals(1, context.size());
-        }
-        List<AtomicReaderContext> context = result.get(4);
-        assertEquals(2, context.size());
+        contexts.add(DummyIndexReader.dummyIndexReader(900).getContext());
+        List<List<Slice>> result = this.sis.slices_test(contexts, 1, 10);
+        assertEquals(1, result.size());
+        assertSlices(result.get(0), 6, 0, 6, 900, 0, 900);
     }
 
     @Test
-    public void testGroupLeavesAllDouble() {
+    public void testSlicesSplitLargeSegment() {
         ArrayList<AtomicReaderContext> contexts = new ArrayList<AtomicReaderContext>();
+        contexts.add(DummyIndexReader.dummyIndexReader(100).getContext());
         contexts.add(DummyIndexReader.dummyIndexReader(10).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(9).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(8).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(7).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(6).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(5).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(4).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(3).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(2).getContext());
-        contexts.add(DummyIndexReader.dummyIndexReader(1).getContext());
-        List<List<AtomicReaderContext>> result = this.sis.group_leaves_test(contexts, 5);
-        assertEquals(5, result.size());
-        for (int i = 0; i < 4; i++) {
-            List<AtomicReaderContext> context = result.get(i);
-            assertEquals(2, context.size());
-            int totalDocs = context.get(0).reader().numDocs() + context.get(1).reader().numDocs();
-            assertEquals(11, totalDocs);
-        }
+        List<List<Slice>> result = this.sis.slices_test(contexts, 4, 10);
+        assertEquals(4, result.size());
+        assertSlices(result.get(0), 100, 0, 28);
+        assertSlices(result.get(1), 100, 28, 55);
+        assertSlices(result.get(2), 100, 55, 83);
+        assertSlices(result.get(3), 100, 83, 100, 10, 0, 10);
+    }
 
+    @Test
+    public void testSlicesAtLeastMinSliceDocs() {
+        ArrayList<AtomicReaderContext> contexts = new ArrayList<AtomicReaderContext>();
+        contexts.add(DummyIndexReader.dummyIndexReader(100).getContext());
+        List<List<Slice>> result = this.sis.slices_test(contexts, 4, 40);
+        assertEquals(2, result.size());
+        assertSlices(result.get(0), 100, 0, 50);
+        assertSlices(result.get(1), 100, 50, 100);
     }
 
     @Test
-    public void testFindSmallestSlice() {
-        assertEquals(0, this.sis.find_smallest_slice_test(new int[] {0, 0, 0, 0, 0}));
-        assertEquals(1, this.sis.find_smallest_slice_test(new int[] {1, 0, 0, 0, 0}));
-        assertEquals(1, this.sis.find_smallest_slice_test(new int[] {1, 0, 1, 0, 0}));
-        assertEquals(0, this.sis.find_smallest_slice_test(new int[] {1, 1, 1, 1, 1}));
-        assertEquals(4, this.sis.find_smallest_slice_test(new int[] {2, 1, 1, 1, 0}));
+    public void testSearchMoreRangesThanTasks() throws Exception {
+        for (int i = 0; i < 12000; i++)
+            this.writer.addDocument(new Document());
+        DirectoryReader reader = DirectoryReader.open(this.writer, true);
+        try {
+            SuperIndexSearcher searcher = new SuperIndexSearcher(reader, this.executor, 2);
+            assertEquals(6, searcher.slices_test(reader.leaves(), 2 * 4, 2000).size());
+            TotalHitCountSuperCollector collector = new TotalHitCountSuperCollector();
+            searcher.search(new MatchAllDocsQuery(), null, collector);
+            assertEquals(12000, collector.getTotalHits());
+        } finally {
+            reader.close();
+        }
+    }
+
+    private void assertSlices(List<Slice> slices, int... maxDocMinDocMaxDoc) {
+        assertEquals(maxDocMinDocMaxDoc.length / 3, slices.size());
+        for (int i = 0; i < slices.size(); i++) {
+            Slice slice = slices.get(i);
+            assertEquals(maxDocMinDocMaxDoc[i * 3], slice.context.reader().maxDoc());
+            assertEquals(maxDocMinDocMaxDoc[i * 3 + 1], slice.minDoc);
+            assertEquals(maxDocMinDocMaxDoc[i * 3 + 2], slice.maxDoc);
+        }
     }
 }
@@ -0,0 +1,52 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2015 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2015-2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.http;
+
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertTrue;
+
+import org.junit.Test;
+
+public class AbstractMerescoLuceneHandlerTest {
+
+    @Test
+    public void testAcceptsGzip() {
+        assertTrue(AbstractMerescoLuceneHandler.acceptsGzip("gzip"));
+        assertTrue(AbstractMerescoLuceneHandler.acceptsGzip("deflate, GZIP"));
+        assertTrue(AbstractMerescoLuceneHandler.acceptsGzip("gzip;q=0.5, identity"));
+        assertTrue(AbstractMerescoLuceneHandler.acceptsGzip("x-gzip"));
+    }
+
+    @Test
+    public void testDoesNotAcceptGzip() {
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip(null));
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip(""));
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip("deflate"));
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip("gzip;q=0"));
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip("identity, gzip; q=0.0"));
+        assertFalse(AbstractMerescoLuceneHandler.acceptsGzip("x-gzip-foo"));
+    }
+}
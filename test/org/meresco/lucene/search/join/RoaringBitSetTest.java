@@ -0,0 +1,169 @@
+/* begin license *
+ *
+ * "Meresco Lucene" is a set of components and tools to integrate Lucene (based on PyLucene) into Meresco
+ *
+ * Copyright (C) 2016 Koninklijke Bibliotheek (KB) http://www.kb.nl
+ * Copyright (C) 2016 Seecr (Seek You Too B.V.) http://seecr.nl
+ *
+ * This file is part of "Meresco Lucene"
+ *
+ * "Meresco Lucene" is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * "Meresco Lucene" is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with "Meresco Lucene"; if not, write to the Free Software
+ * Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+ *
+ * end license */
+
+package org.meresco.lucene.search.join;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertNotEquals;
+import static org.junit.Assert.assertTrue;
+
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+
+import org.apache.lucene.search.DocIdSetIterator;
+import org.apache.lucene.util.OpenBitSet;
+import org.junit.Test;
+
+public class RoaringBitSetTest {
+
+    @Test
+    public void testSetAndGet() {
+        RoaringBitSet keys = new RoaringBitSet();
+        assertEquals(0, keys.length());
+        assertFalse(keys.get(1));
+        keys.set(3);
+        keys.set(1);
+        keys.set(20000000);
+        keys.set(3);
+        assertTrue(keys.get(1));
+        assertTrue(keys.get(3));
+        assertTrue(keys.get(20000000));
+        assertFalse(keys.get(2));
+        assertFalse(keys.get(20000001));
+        assertFalse(keys.get(-1));
+        assertEquals(3, keys.cardinality());
+        assertEquals(20000001, keys.length());
+        assertTrue(keys.ramBytesUsed() < 1024);
+    }
+
+    @Test
+    public void testDenseContainer() {
+        RoaringBitSet keys = new RoaringBitSet();
+        for (int i = 0; i < 65536; i += 2)
+            keys.set(i);
+        assertEquals(32768, keys.cardinality());
+        assertTrue(keys.get(65534));
+        assertFalse(keys.get(65535));
+        assertEquals(65534, keys.nextSetBit(65533));
+        assertEquals(-1, keys.nextSetBit(65535));
+        assertEquals(65535, keys.length());
+    }
+
+    @Test
+    public void testIterator() throws Exception {
+        RoaringBitSet keys = new RoaringBitSet();
+        keys.set(5);
+        keys.set(70000);
+        keys.set(65535);
+        DocIdSetIterator iterator = keys.iterator();
+        assertEquals(5, iterator.nextDoc());
+        assertEquals(65535, iterator.nextDoc());
+        assertEquals(70000, iterator.nextDoc());
+        assertEquals(DocIdSetIterator.NO_MORE_DOCS, iterator.nextDoc());
+        assertEquals(65535, keys.iterator().advance(6));
+        assertTrue(keys.bits() == keys);
+    }
+
+    @Test
+    public void testAnd() {
+        RoaringBitSet a = keys(1, 2, 3, 70000, 140000);
+        RoaringBitSet b = keys(2, 3, 4, 140000, 200000);
+        a.and(b);
+        assertEquals(keys(2, 3, 140000), a);
+        assertEquals(keys(2, 3, 4, 140000, 200000), b);
+    }
+
+    @Test
+    public void testOr() {
+        RoaringBitSet a = keys(1, 70000);
+        RoaringBitSet b = keys(2, 140000);
+        a.or(b);
+        assertEquals(keys(1, 2, 70000, 140000), a);
+        a.set(140001);
+        assertFalse(b.get(140001));
+    }
+
+    @Test
+    public void testAndOrDenseAndSparse() {
+        RoaringBitSet dense = new RoaringBitSet();
+        for (int i = 0; i < 10000; i++)
+            dense.set(i);
+        RoaringBitSet sparse = keys(5, 9999, 10000);
+
+        RoaringBitSet intersection = dense.clone();
+        intersection.and(sparse);
+        assertEquals(keys(5, 9999), intersection);
+
+        RoaringBitSet union = sparse.clone();
+        union.or(dense);
+        assertEquals(10001, union.cardinality());
+        union.and(keys(3, 10000));
+        assertEquals(keys(3, 10000), union);
+        assertEquals(10000, dense.cardinality());
+    }
+
+    @Test
+    public void testClone() {
+        RoaringBitSet a = keys(1, 2);
+        RoaringBitSet b = a.clone();
+        b.set(3);
+        assertEquals(keys(1, 2), a);
+        assertNotEquals(a, b);
+    }
+
+    @Test
+    public void testWriteAndRead() throws Exception {
+        RoaringBitSet keys = keys(1, 2, 20000000);
+        for (int i = 100000; i < 110000; i++)
+            keys.set(i);
+        ByteArrayOutputStream bos = new ByteArrayOutputStream();
+        keys.write(new DataOutputStream(bos));
+        RoaringBitSet read = RoaringBitSet.read(new DataInputStream(new ByteArrayInputStream(bos.toByteArray())));
+        assertEquals(keys, read);
+        assertEquals(keys.cardinality(), read.cardinality());
+        read.set(3);
+        assertTrue(read.get(3));
+    }
+
+    @Test
+    public void testOpenBitSetConversion() {
+        OpenBitSet bitSet = new OpenBitSet();
+        bitSet.set(1);
+        bitSet.set(70000);
+        RoaringBitSet keys = RoaringBitSet.fromOpenBitSet(bitSet);
+        assertEquals(keys(1, 70000), keys);
+        assertEquals(bitSet, keys.toOpenBitSet());
+    }
+
+    private static RoaringBitSet keys(int... values) {
+        RoaringBitSet keys = new RoaringBitSet();
+        for (int value : values)
+            keys.set(value);
+        return keys;
+    }
+}
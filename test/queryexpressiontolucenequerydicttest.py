@@ -413,6 +413,54 @@ class QueryExpressionToLuceneQueryDictTest(SeecrTestCase):
             except UnsupportedCQL:
                 pass
 
+    def testAnalyzeCache(self):
+        converter = QueryExpressionToLuceneQueryDict([("unqualified", 1.0)], luceneSettings=LuceneSettings())
+        expected = {'boost': 1.0, 'term': {'field': 'unqualified', 'value': 'cat'}, 'type': 'TermQuery'}
+        self.assertEquals(expected, converter.convert(QueryExpression.searchterm(term="CaT")))
+        self.assertEquals(expected, converter.convert(QueryExpression.searchterm(term="CaT")))
+        info = converter.analyzeCacheInfo()
+        self.assertEquals(dict(size=1, maxSize=10000, hits=1, misses=1, hitRate=0.5), info['preAnalyze'])
+        self.assertEquals(dict(size=1, maxSize=10000, hits=1, misses=1, hitRate=0.5), info['postAnalyze'])
+
+        converter.updateIgnoreStemmingForWords(set(['cat']))
+        self.assertEquals(0, converter.analyzeCacheInfo()['postAnalyze']['size'])
+        self.assertEquals(1, converter.analyzeCacheInfo()['preAnalyze']['size'])
+
+    def testAnalyzeCacheIsBounded(self):
+        converter = QueryExpressionToLuceneQueryDict([("unqualified", 1.0)], luceneSettings=LuceneSettings(), analyzeCacheSize=2)
+        for term in ['aap', 'noot', 'mies', 'aap']:
+            converter.convert(QueryExpression.searchterm(term=term))
+        info = converter.analyzeCacheInfo()['preAnalyze']
+        self.assertEquals(2, info['size'])
+        self.assertEquals(0, info['hits'])
+
+    def testConvertCache(self):
+        converter = QueryExpressionToLuceneQueryDict([("unqualified", 1.0)], luceneSettings=LuceneSettings(), convertCacheSize=10)
+        expected = {'boost': 1.0, 'term': {'field': 'unqualified', 'value': 'cat'}, 'type': 'TermQuery'}
+        result = converter.convert(cqlToExpression("CaT"))
+        self.assertEquals(expected, result)
+        result['boost'] = 2.0
+        self.assertEquals(expected, converter.convert(cqlToExpression("CaT")))
+        self.assertEquals(dict(size=1, maxSize=10, hits=1, misses=1, hitRate=0.5), converter.convertCacheInfo())
+
+        converter.updateUnqualifiedTermFields([("other", 1.0)])
+        self.assertEquals(0, converter.convertCacheInfo()['size'])
+        self.assertEquals({'boost': 1.0, 'term': {'field': 'other', 'value': 'cat'}, 'type': 'TermQuery'}, converter.convert(cqlToExpression("CaT")))
+
+    def testConvertCacheHitsOnRepeatedConvert(self):
+        fields = [("field%s" % i, 1.0) for i in xrange(10)]
+        cached = QueryExpressionToLuceneQueryDict(fields, luceneSettings=LuceneSettings(), convertCacheSize=10)
+        uncached = QueryExpressionToLuceneQueryDict(fields, luceneSettings=LuceneSettings())
+        expression = cqlToExpression("aap AND noot AND (mies OR vuur) NOT boom")
+        self.assertEquals(uncached.convert(expression), cached.convert(expression))
+        for i in xrange(200):
+            self.assertEquals(uncached.convert(expression), cached.convert(expression))
+        self.assertEquals(200, cached.convertCacheInfo()['hits'])
+
+    def testNoConvertCacheByDefault(self):
+        converter = QueryExpressionToLuceneQueryDict([("unqualified", 1.0)], luceneSettings=LuceneSettings())
+        self.assertEquals(None, converter.convertCacheInfo())
+
     def convert(self, expression=None, cql=None):
         if expression is None:
             expression = cqlToExpression(parseCql(cql))